@@ -0,0 +1,114 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 동시 실행 제한 (admission control) + 부하 차단
+# 사용자가 몰리는 시간에는 검색/yt-dlp 추출/시트 업로드가 한 서버에서 한꺼번에 돌아 전부 같이 느려진다.
+#   - 작업 종류(gate)마다 동시 실행 수(limit)를 따로 제한
+#   - 넘친 요청은 도착 순서대로 대기열에서 기다리되 max_wait 초까지만
+#   - 대기열이 가득 찼거나(max_queue) 기다리다 시간이 다 되면 Overloaded -> 화면에 '잠시 후 다시' 안내 (부하 차단)
+# 제한은 프로세스 단위 (Streamlit 앱 1개 = 프로세스 1개, 모든 세션이 같은 게이트를 쓴다).
+# 지표: admission_active / admission_queue_depth (게이지), admission_wait_seconds (히스토그램), admission_total{outcome}
+# ============================================================================
+
+import threading
+import time
+from contextlib import contextmanager
+
+from telemetry import METRICS, LATENCY_BUCKETS
+
+# gate -> 동시 실행 수 / 대기열 길이 / 최대 대기(초)
+DEFAULT_LIMITS = {
+    'search': {'limit': 4, 'max_queue': 16, 'max_wait': 30.0},
+    'transcript': {'limit': 2, 'max_queue': 6, 'max_wait': 20.0},
+    'sheets': {'limit': 2, 'max_queue': 8, 'max_wait': 30.0},
+}
+LABELS = {'search': "검색", 'transcript': "대본 추출", 'sheets': "시트 업로드"}
+
+
+class Overloaded(Exception):
+    """대기열 초과(queue_full) 또는 대기 시간 초과(timeout) -> message 를 그대로 사용자에게 보여준다"""
+    def __init__(self, gate, reason, waiting):
+        self.gate, self.reason, self.waiting = gate, reason, waiting
+        self.message = f"🚦 지금 {LABELS.get(gate, gate)} 요청이 몰려 있습니다 (대기 {waiting}건). 잠시 후 다시 시도해주세요."
+        super().__init__(self.message)
+
+
+class Gate:
+    """동시 실행 limit 개 + 도착 순서(FIFO) 대기열"""
+    def __init__(self, name, limit, max_queue, max_wait):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cv = threading.Condition()
+        self._active = 0
+        self._waiters = []          # 대기 순서 (차례가 된 맨 앞만 들어간다)
+        self._admitted = 0
+        self._shed = 0
+
+    def _publish(self):
+        METRICS.set('admission_active', self._active, gate=self.name)
+        METRICS.set('admission_queue_depth', len(self._waiters), gate=self.name)
+
+    def _reject(self, reason):
+        self._shed += 1
+        METRICS.inc('admission_total', gate=self.name, outcome=f"shed_{reason}")
+        return Overloaded(self.name, reason, len(self._waiters))
+
+    @contextmanager
+    def admit(self, max_wait=None):
+        """with gate.admit(): ...  차례가 안 오면 Overloaded. max_wait=0 이면 기다리지 않음 (미리 받기 등 양보용)"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        t0 = time.monotonic()
+        with self._cv:
+            if self._active >= self.limit or self._waiters:
+                if len(self._waiters) >= self.max_queue or max_wait <= 0:
+                    raise self._reject('queue_full')
+                me = object()
+                self._waiters.append(me)
+                self._publish()
+                try:
+                    while self._active >= self.limit or self._waiters[0] is not me:
+                        left = t0 + max_wait - time.monotonic()
+                        if left <= 0: raise self._reject('timeout')
+                        self._cv.wait(left)
+                finally:
+                    self._waiters.remove(me)
+                    self._publish()
+                    self._cv.notify_all()   # 맨 앞이 빠졌으면 다음 차례를 깨운다
+            self._active += 1
+            self._admitted += 1
+            self._publish()
+        waited = time.monotonic() - t0
+        METRICS.observe('admission_wait_seconds', waited, LATENCY_BUCKETS, gate=self.name)
+        METRICS.inc('admission_total', gate=self.name, outcome='admitted')
+        try:
+            yield waited
+        finally:
+            with self._cv:
+                self._active -= 1
+                self._publish()
+                self._cv.notify_all()
+
+    def saturated(self):
+        """지금 들어오면 기다려야 하는지 (화면 안내용)"""
+        with self._cv: return self._active >= self.limit or bool(self._waiters)
+
+    def stats(self):
+        with self._cv:
+            return {'gate': self.name, 'active': self._active, 'waiting': len(self._waiters), 'limit': self.limit,
+                    'max_queue': self.max_queue, 'admitted': self._admitted, 'shed': self._shed}
+
+
+class AdmissionController:
+    """작업 종류별 Gate 모음. config = {'search': {'limit': 6}, ...} 로 기본값 일부만 덮어쓸 수 있다"""
+    def __init__(self, config=None):
+        config = config or {}
+        self.gates = {name: Gate(name, **{**limits, **dict(config.get(name, {}))}) for name, limits in DEFAULT_LIMITS.items()}
+
+    def admit(self, gate, max_wait=None):
+        return self.gates[gate].admit(max_wait)
+
+    def saturated(self, gate):
+        return self.gates[gate].saturated()
+
+    def stats(self):
+        return [g.stats() for g in self.gates.values()]
@@ -0,0 +1,79 @@
+# ============================================================================
+# [측정] fields 마스크 적용 전/후 응답 크기 & 파싱 시간 비교
+#
+#   python benchmarks/field_masks.py --api-key <KEY> --keyword "60대 후회 사연"
+#   (로컬 목 서버에 대고 돌릴 때: --base-url http://127.0.0.1:8000/youtube/v3)
+#
+# 쿼터 사용량: search 2회(200) + videos/channels/commentThreads 각 2회(6)
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from youtube_core import (  # noqa: E402
+    SEARCH_FIELDS, VIDEO_FIELDS, CHANNEL_FIELDS, COMMENT_FIELDS, build_search_params,
+)
+from youtube_async import API_BASE_URL  # noqa: E402
+
+
+def measure(client, base_url, api_key, endpoint, params, repeat):
+    """요청 1회 -> (압축 전송 바이트, 본문 바이트, 평균 파싱 ms, 파싱 결과)"""
+    r = client.get(f"{base_url}/{endpoint}", params={**params, 'key': api_key})
+    r.raise_for_status()
+    body = r.content
+    t0 = time.perf_counter()
+    for _ in range(repeat): data = json.loads(body)
+    parse_ms = (time.perf_counter() - t0) / repeat * 1000
+    return r.num_bytes_downloaded, len(body), parse_ms, data
+
+
+def main():
+    ap = argparse.ArgumentParser(description="fields 마스크 전/후 응답 크기 비교")
+    ap.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY", ""))
+    ap.add_argument("--keyword", default="60대 후회 사연")
+    ap.add_argument("--base-url", default=API_BASE_URL)
+    ap.add_argument("--repeat", type=int, default=50, help="파싱 시간 측정 반복 횟수")
+    args = ap.parse_args()
+    if not args.api_key: ap.error("--api-key 또는 YOUTUBE_API_KEY 필요")
+
+    with httpx.Client(headers={'Accept-Encoding': 'gzip'}, timeout=30) as client:
+        search_before = {k: v for k, v in build_search_params(args.keyword, 50).items() if v is not None and k != 'fields'}
+        search_after = {**search_before, 'fields': SEARCH_FIELDS}
+        _, _, _, seed = measure(client, args.base_url, args.api_key, 'search', search_after, 1)
+        v_ids = [i['id']['videoId'] for i in seed.get('items', [])]
+        ch_ids = list(dict.fromkeys(i['snippet']['channelId'] for i in seed.get('items', [])))
+        if not v_ids: sys.exit("검색 결과가 없습니다.")
+
+        cases = [
+            ('search.list', 'search', search_before, search_after),
+            ('videos.list', 'videos',
+             {'part': "snippet,statistics,contentDetails", 'id': ','.join(v_ids[:50])},
+             {'part': "snippet,statistics,contentDetails", 'id': ','.join(v_ids[:50]), 'fields': VIDEO_FIELDS}),
+            ('channels.list', 'channels',
+             {'part': "statistics", 'id': ','.join(ch_ids[:50])},
+             {'part': "statistics", 'id': ','.join(ch_ids[:50]), 'fields': CHANNEL_FIELDS}),
+            ('commentThreads.list', 'commentThreads',
+             {'part': "snippet,replies", 'videoId': v_ids[0], 'maxResults': 50, 'order': "relevance", 'textFormat': "plainText"},
+             {'part': "snippet,replies", 'videoId': v_ids[0], 'maxResults': 50, 'order': "relevance", 'textFormat': "plainText",
+              'fields': COMMENT_FIELDS}),
+        ]
+
+        print(f"{'요청':<22}{'전송(before)':>14}{'전송(after)':>14}{'본문(before)':>14}{'본문(after)':>14}{'파싱ms(before)':>16}{'파싱ms(after)':>16}")
+        for label, endpoint, before, after in cases:
+            try:
+                wb, bb, pb, _ = measure(client, args.base_url, args.api_key, endpoint, before, args.repeat)
+                wa, ba, pa, _ = measure(client, args.base_url, args.api_key, endpoint, after, args.repeat)
+            except httpx.HTTPStatusError as e:
+                print(f"{label:<22}실패 ({e.response.status_code})")
+                continue
+            print(f"{label:<22}{wb:>14,}{wa:>14,}{bb:>14,}{ba:>14,}{pb:>16.3f}{pa:>16.3f}  ({(1 - ba / bb) * 100 if bb else 0:.0f}% 감소)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ============================================================================
+# [벤치마크] 실제 응답 녹화 -> benchmarks/fixtures/
+#
+#   python benchmarks/record_fixtures.py --api-key <KEY> --keyword "60대 후회 사연"
+#   (시트까지: --creds service_account.json --sheet-url <URL> [--sheet-name source_urls])
+#
+# 쿼터 사용량: search 1회(100) + videos/channels/playlistItems/commentThreads 각 1회(4)
+# 녹화본은 앱과 같은 파라미터(fields 마스크 포함)로 받는다. API 키는 저장하지 않는다.
+# ============================================================================
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from youtube_core import (  # noqa: E402
+    build_service, build_search_params, CHANNEL_FIELDS, COMMENT_FIELDS, PLAYLIST_FIELDS, VIDEO_FIELDS, uploads_playlist_id,
+)
+from replay import FIXTURE_DIR  # noqa: E402
+
+
+def save(out_dir, name, data):
+    path = os.path.join(out_dir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        if isinstance(data, str): f.write(data)
+        else: json.dump(data, f, ensure_ascii=False, indent=1)
+    print(f"  {name:22s} {os.path.getsize(path):>9,} B")
+
+
+def record_api(youtube, keyword, out_dir):
+    search = youtube.search().list(**build_search_params(keyword, 50)).execute()
+    save(out_dir, "search.json", search)
+    v_ids = [i['id']['videoId'] for i in search.get('items', []) if i.get('id', {}).get('videoId')]
+    ch_ids = list(dict.fromkeys(i['snippet']['channelId'] for i in search.get('items', [])))[:50]
+
+    videos = youtube.videos().list(part="snippet,statistics,contentDetails", id=','.join(v_ids[:50]), fields=VIDEO_FIELDS).execute()
+    save(out_dir, "videos.json", videos)
+    channels = youtube.channels().list(part="statistics,contentDetails", id=','.join(ch_ids), fields=CHANNEL_FIELDS).execute()
+    save(out_dir, "channels.json", channels)
+    if channels.get('items'):
+        c = channels['items'][0]
+        playlist = youtube.playlistItems().list(part="contentDetails", playlistId=uploads_playlist_id(c['id'], {'uploads': c.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')}),
+                                                maxResults=20, fields=PLAYLIST_FIELDS).execute()
+        save(out_dir, "playlistItems.json", playlist)
+    # 댓글이 많은 영상 기준
+    top = max(videos.get('items', []), key=lambda v: int(v.get('statistics', {}).get('commentCount', 0)), default=None)
+    if top:
+        comments = youtube.commentThreads().list(part="snippet,replies", videoId=top['id'], maxResults=50, order="relevance",
+                                                 textFormat="plainText", fields=COMMENT_FIELDS).execute()
+        save(out_dir, "commentThreads.json", comments)
+    return v_ids
+
+
+def record_subtitle(v_ids, out_dir):
+    """앱과 같은 yt-dlp 옵션으로 한국어 자막 1개 저장 (자막 있는 첫 영상)"""
+    import yt_dlp
+    tmp = tempfile.mkdtemp()
+    for vid in v_ids[:10]:
+        opts = {'skip_download': True, 'writesubtitles': True, 'writeautomaticsub': True, 'subtitleslangs': ['ko'],
+                'outtmpl': os.path.join(tmp, vid), 'quiet': True, 'no_warnings': True}
+        if os.path.exists('cookies.txt'): opts['cookiefile'] = 'cookies.txt'
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl: ydl.download([f"https://www.youtube.com/watch?v={vid}"])
+        except Exception as e:
+            print(f"  자막 실패 {vid}: {e}")
+            continue
+        files = [f for f in glob.glob(os.path.join(tmp, vid) + "*") if not f.endswith('.part')]
+        if files:
+            with open(files[0], encoding='utf-8') as f: save(out_dir, "subtitle.vtt", f.read())
+            return
+    print("  자막을 찾지 못했습니다 (합성 자막 사용)")
+
+
+def record_sheet(creds_file, sheet_url, sheet_name, out_dir):
+    import gspread
+    from google.oauth2.service_account import Credentials
+    creds = Credentials.from_service_account_file(creds_file, scopes=['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive'])
+    sheet = gspread.authorize(creds).open_by_url(sheet_url).worksheet(sheet_name)
+    save(out_dir, "sheet.json", sheet.get_all_values())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="벤치마크용 실제 응답 녹화")
+    ap.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY", ""))
+    ap.add_argument("--keyword", default="60대 후회 사연")
+    ap.add_argument("--out", default=FIXTURE_DIR)
+    ap.add_argument("--no-subtitle", action="store_true")
+    ap.add_argument("--creds", help="서비스 계정 JSON (시트 녹화용)")
+    ap.add_argument("--sheet-url")
+    ap.add_argument("--sheet-name", default="source_urls")
+    args = ap.parse_args()
+    if not args.api_key: ap.error("--api-key 또는 YOUTUBE_API_KEY 필요")
+
+    os.makedirs(args.out, exist_ok=True)
+    print(f"녹화 -> {args.out}")
+    v_ids = record_api(build_service(args.api_key), args.keyword, args.out)
+    if not args.no_subtitle: record_subtitle(v_ids, args.out)
+    if args.creds and args.sheet_url: record_sheet(args.creds, args.sheet_url, args.sheet_name, args.out)
+
+
+if __name__ == "__main__":
+    main()
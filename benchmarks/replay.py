@@ -0,0 +1,208 @@
+# ============================================================================
+# [벤치마크] 녹화된 응답(fixtures) 재생 - 네트워크 없이 youtube_core / sheets_core 실행
+#
+# fixtures 디렉터리 (record_fixtures.py 로 생성):
+#   search.json / videos.json / channels.json / playlistItems.json / commentThreads.json
+#   subtitle.vtt / sheet.json (get_all_values 결과)
+# 없는 파일은 같은 구조의 합성 데이터로 대체한다 (결과 파일에 'synthetic' 로 표시).
+#
+# ReplayService 는 녹화된 항목을 템플릿으로 ID 만 바꿔서 원하는 규모로 늘려 돌려준다.
+# 응답은 매번 JSON 직렬화 -> 파싱을 거쳐서 실제 클라이언트의 파싱 비용도 포함된다.
+# ============================================================================
+
+import hashlib
+import json
+import os
+import time
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_FILES = ("search", "videos", "channels", "playlistItems", "commentThreads", "sheet")
+SEARCH_PAGES = 10   # 키워드당 search.list 최대 페이지 (youtube_core.MAX_SEARCH_PAGES 와 같게)
+
+
+def _h(*parts):
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:12], 16)
+
+
+def _vid(*parts):
+    return hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:11]
+
+
+# === 합성 fixtures (녹화본이 없을 때) ===
+def synthetic_fixtures():
+    videos = [{
+        'id': _vid('v', i),
+        'snippet': {'channelId': 'UC' + _vid('c', i) * 2, 'title': f"합성 영상 제목 {i} - 60대 후회 사연 모음",
+                    'channelTitle': f"채널 {i}", 'publishedAt': "2024-05-0%dT09:30:00Z" % (i % 9 + 1),
+                    'thumbnails': {'medium': {'url': f"https://i.ytimg.com/vi/{_vid('v', i)}/mqdefault.jpg"}}},
+        'statistics': {'viewCount': str(1000 * (i + 1) ** 2), 'commentCount': str(10 * (i + 1))},
+        'contentDetails': {'duration': "PT%dM%dS" % (i % 20, i % 60)},
+    } for i in range(10)]
+    channels = [{
+        'id': 'UC' + _vid('c', i) * 2,
+        'statistics': {'subscriberCount': str(5000 * (i + 1)), 'viewCount': str(2_000_000 * (i + 1)), 'videoCount': str(100 + i)},
+        'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + _vid('c', i) * 2}},
+    } for i in range(10)]
+    comment = lambda i, reply=False: {'snippet': {  # noqa: E731
+        'authorDisplayName': f"@user{i}", 'textDisplay': ("답글 " if reply else "") + f"공감합니다. 저도 비슷한 경험이 있어요 {i}" * 3,
+        'likeCount': (i * 37) % 500, 'publishedAt': "2024-05-10T12:00:00Z"}}
+    threads = [{'snippet': {'topLevelComment': comment(i)}, **({'replies': {'comments': [comment(i, True)]}} if i % 4 == 0 else {})}
+               for i in range(50)]
+    cues = []
+    for i in range(200):
+        s = i * 3
+        cues.append(f"{i + 1}\n00:{s // 60:02d}:{s % 60:02d}.000 --> 00:{(s + 3) // 60:02d}:{(s + 3) % 60:02d}.000\n"
+                    f"<c>그때는 몰랐습니다 {i}</c> 왜 그렇게 살았는지\n")
+    return {
+        'search': {'nextPageToken': 'X', 'items': [{'id': {'videoId': v['id']}, 'snippet': {'channelId': v['snippet']['channelId']}} for v in videos]},
+        'videos': {'etag': 'synthetic', 'items': videos},
+        'channels': {'etag': 'synthetic', 'items': channels},
+        'playlistItems': {'items': [{'contentDetails': {'videoId': _vid('p', i), 'videoPublishedAt': "2024-01-01T00:00:00Z"}} for i in range(20)]},
+        'commentThreads': {'nextPageToken': 'X', 'items': threads},
+        'subtitle': "WEBVTT\nKind: captions\nLanguage: ko\n\n" + "\n".join(cues),
+        'sheet': [['URL', 'title', 'category', 'subcategory', 'type', 'processed', 'processed_date', 'result_index']] + [
+            [f"https://www.youtube.com/watch?v={_vid('s', i)}", f"기존 영상 {i}", "사연", "노후", "쇼츠", "✓", "2024-05-01", str(i + 1)]
+            for i in range(100)],
+    }
+
+
+def load_fixtures(path=FIXTURE_DIR):
+    """fixtures 로드 -> (dict, {이름: 'recorded'|'synthetic'})"""
+    synth = synthetic_fixtures()
+    out, source = {}, {}
+    for name in FIXTURE_FILES + ('subtitle',):
+        fn = os.path.join(path, "subtitle.vtt" if name == 'subtitle' else f"{name}.json")
+        if os.path.exists(fn):
+            with open(fn, encoding='utf-8') as f:
+                out[name] = f.read() if name == 'subtitle' else json.load(f)
+            source[name] = 'recorded'
+        else:
+            out[name], source[name] = synth[name], 'synthetic'
+    return out, source
+
+
+# === googleapiclient 모양의 재생 서비스 ===
+class _Request:
+    def __init__(self, service, endpoint, params):
+        self._service = service
+        self._endpoint = endpoint
+        self._params = params
+        self.headers = {}   # If-None-Match 는 무시 (항상 200)
+
+    def execute(self):
+        svc = self._service
+        svc.calls += 1
+        if svc.latency_s: time.sleep(svc.latency_s)
+        body = getattr(svc, "_" + self._endpoint)(**self._params)
+        return json.loads(json.dumps(body, ensure_ascii=False))
+
+
+class _Resource:
+    def __init__(self, service, endpoint):
+        self._service = service
+        self._endpoint = endpoint
+
+    def list(self, **params):
+        return _Request(self._service, self._endpoint, params)
+
+
+class ReplayService:
+    """
+    녹화된 응답 항목을 템플릿으로 무한히 늘려 주는 가짜 YouTube 서비스.
+    n_channels : 검색 결과에 등장할 채널 수 (영상 -> 채널은 ID 해시로 고정 배정)
+    latency_ms : 호출당 인위 지연 (네트워크 왕복 흉내, 기본 0)
+    """
+    def __init__(self, fixtures, n_channels=100, latency_ms=0, comment_pages=None):
+        self.fx = fixtures
+        self.n_channels = max(1, n_channels)
+        self.latency_s = latency_ms / 1000
+        self.comment_pages = comment_pages
+        self.calls = 0
+
+    def search(self): return _Resource(self, 'search')
+    def videos(self): return _Resource(self, 'videos')
+    def channels(self): return _Resource(self, 'channels')
+    def commentThreads(self): return _Resource(self, 'commentThreads')
+    def playlistItems(self): return _Resource(self, 'playlistItems')
+
+    def channel_of(self, vid):
+        return 'UC' + _vid('ch', _h(vid) % self.n_channels) * 2
+
+    @staticmethod
+    def _pick(items, key):
+        return items[_h(key) % len(items)]
+
+    def _search(self, q, maxResults=50, pageToken=None, **_):
+        page = int(pageToken or 0)
+        items = []
+        for i in range(maxResults):
+            vid = _vid(q, page, i)
+            items.append({'id': {'videoId': vid}, 'snippet': {'channelId': self.channel_of(vid)}})
+        body = {'items': items}
+        if page + 1 < SEARCH_PAGES: body['nextPageToken'] = str(page + 1)
+        return body
+
+    def _videos(self, id, part="", **_):
+        items = []
+        for vid in id.split(','):
+            t = self._pick(self.fx['videos']['items'], vid)
+            views = 500 + _h('views', vid) % 2_000_000
+            if part == "statistics":
+                items.append({'id': vid, 'statistics': {'viewCount': str(views)}})
+                continue
+            items.append({**t, 'id': vid, 'snippet': {**t.get('snippet', {}), 'channelId': self.channel_of(vid)},
+                          'statistics': {**t.get('statistics', {}), 'viewCount': str(views)}})
+        return {'etag': _vid('etag', id), 'items': items}
+
+    def _channels(self, id, **_):
+        items = []
+        for cid in id.split(','):
+            t = self._pick(self.fx['channels']['items'], cid)
+            items.append({**t, 'id': cid, 'statistics': {**t.get('statistics', {}), 'subscriberCount': str(100 + _h('subs', cid) % 500_000)},
+                          'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + cid[2:]}}})
+        return {'etag': _vid('etag', id), 'items': items}
+
+    def _playlistItems(self, playlistId, maxResults=20, **_):
+        tpl = self.fx['playlistItems']['items'] or [{'contentDetails': {'videoPublishedAt': "2024-01-01T00:00:00Z"}}]
+        return {'items': [{'contentDetails': {**self._pick(tpl, (playlistId, i))['contentDetails'], 'videoId': _vid(playlistId, i)}}
+                          for i in range(maxResults)]}
+
+    def _commentThreads(self, videoId, pageToken=None, **_):
+        page = int(pageToken or 0)
+        body = {'items': self.fx['commentThreads']['items']}
+        if self.comment_pages is None or page + 1 < self.comment_pages: body['nextPageToken'] = str(page + 1)
+        return body
+
+
+# === gspread Worksheet 모양의 재생 시트 ===
+class ReplayWorksheet:
+    """get_all_values 는 녹화된 시트 행을 n_rows 까지 늘려서 (JSON 파싱 포함) 돌려준다. 쓰기는 버린다."""
+    def __init__(self, fixtures, n_rows):
+        header, *rows = fixtures['sheet']
+        rows = rows or [[''] * len(header)]
+        body = [header]
+        for i in range(n_rows):
+            r = list(rows[i % len(rows)])
+            r[0] = f"https://www.youtube.com/watch?v={_vid('sheet', i)}"
+            if len(r) > 7: r[7] = str(i + 1)
+            body.append(r)
+        self._payload = json.dumps(body, ensure_ascii=False)
+        self.appended = 0
+
+    def get_all_values(self):
+        return json.loads(self._payload)
+
+    def append_row(self, row):
+        self.appended += 1
+
+    def append_rows(self, rows):
+        json.dumps(rows, ensure_ascii=False)   # 요청 본문 직렬화 비용
+        self.appended += len(rows)
+
+
+def scaled_subtitle(fixtures, n_cues):
+    """녹화된 자막의 큐 블록을 n_cues 개가 되도록 반복"""
+    text = fixtures['subtitle'].replace('\r\n', '\n')
+    head, _, body = text.partition('\n\n')
+    blocks = [b for b in body.split('\n\n') if b.strip()] or [head]
+    return head + '\n\n' + '\n\n'.join(blocks[i % len(blocks)] for i in range(n_cues)) + '\n'
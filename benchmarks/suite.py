@@ -0,0 +1,260 @@
+# ============================================================================
+# [벤치마크] 오프라인 성능 회귀 측정 (네트워크 없음, 녹화 fixtures 재생)
+#
+#   python benchmarks/suite.py                         # 전체 (50 / 500 / 5,000 / 50,000)
+#   python benchmarks/suite.py --sizes 50,500 --repeat 5
+#   python benchmarks/suite.py --compare benchmarks/results/<이전>.json
+#   python benchmarks/suite.py --latency-ms 30         # 호출당 네트워크 지연 흉내
+#
+# 측정 대상
+#   search      : mine_keywords (검색 -> 영상/채널 배치 조회 -> 행 생성/필터 -> 채널 기준선) + DataFrame 변환
+#                 (행당 바이트: 이전 스키마 row_bytes_legacy / 압축 스키마 row_bytes)
+#   transcript  : parse_subtitle_text (자막 큐 N개)
+#   comments    : fetch_comments (댓글 N개 = 50개/페이지)
+#   sheets      : append_to_sheet (기존 N행 시트에 500건 업로드, 절반 중복)
+#   list_view   : 리스트 뷰 data_editor 로 보내는 프레임의 Arrow 직렬화 (투영 프레임 vs 전체 프레임, 바이트/시간)
+#   export      : 결과 N행 (기본 100,000) 내보내기 CSV / Parquet / XLSX (CSV 는 이전 방식 legacy_median_s 와 비교)
+# 결과는 benchmarks/results/<시각>_<커밋>.json 에 저장되고, 직전 결과와 자동 비교한다.
+# ============================================================================
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import unicodedata
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import pandas as pd  # noqa: E402
+
+import youtube_core  # noqa: E402
+from response_cache import ETAG_CACHE, BASELINE_CACHE  # noqa: E402
+from sheets_core import append_to_sheet  # noqa: E402
+from youtube_core import mine_keywords, fetch_comments, parse_subtitle_text, BASELINE_UPLOADS  # noqa: E402
+from result_schema import (compact_results, with_derived_columns, bytes_per_row, project_columns, arrow_payload_bytes,  # noqa: E402
+                           LIST_FIXED_COLS, LIST_DEFAULT_COLS, ROW_KEY)
+from result_export import FORMATS as EXPORT_FORMATS, EXPORT_COLS, export_bytes  # noqa: E402
+from replay import ReplayService, ReplayWorksheet, load_fixtures, scaled_subtitle  # noqa: E402
+
+RESULTS_DIR = os.path.join(HERE, "results")
+DEFAULT_SIZES = (50, 500, 5_000, 50_000)
+SHEET_SIZES = (1_000, 10_000, 100_000)
+EXPORT_SIZES = (100_000,)
+PER_KEYWORD = 500          # 키워드당 최대 결과 (search.list 10페이지)
+UPLOAD_ITEMS = 500         # 시트 업로드 건수
+
+
+def git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def timed(fn, repeat):
+    """fn() 을 repeat 번 -> (소요 시간 목록(초), 마지막 반환값)"""
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return times, out
+
+
+def summarize(case, n, times, unit, **extra):
+    med = statistics.median(times)
+    return {'case': case, 'n': n, 'unit': unit, 'median_s': round(med, 5), 'min_s': round(min(times), 5),
+            'max_s': round(max(times), 5), 'throughput': round(n / med, 1) if med else None, **extra}
+
+
+# === 측정 케이스 ===
+def bench_search(fx, n, repeat, latency_ms, workers):
+    """검색 파이프라인 (다중 키워드 채굴 경로). 키워드당 최대 500개 -> n 개가 되도록 키워드 수 조절"""
+    n_kw = max(1, -(-n // PER_KEYWORD))
+    keywords = [f"벤치 키워드 {i}" for i in range(n_kw)]
+    svc = ReplayService(fx, n_channels=max(1, n // 5), latency_ms=latency_ms)
+    youtube_core.build = lambda *a, **k: svc   # 네트워크 계층만 교체 (_MeteredService 계측은 그대로)
+    calls = []
+
+    def run():
+        ETAG_CACHE._data.clear()
+        BASELINE_CACHE._data.clear()
+        svc.calls = 0
+        rows = mine_keywords("bench", keywords, min(n, PER_KEYWORD), max_workers=workers, baseline_uploads=BASELINE_UPLOADS)
+        df = pd.DataFrame(rows).drop_duplicates(subset=['video_id'], keep='first').reset_index(drop=True)
+        calls.append(svc.calls)
+        return df
+
+    times, df = timed(run, repeat)
+    return summarize("search", n, times, "videos/s", rows=len(df), api_calls=calls[-1],
+                     row_bytes_legacy=round(bytes_per_row(with_derived_columns(df))), row_bytes=round(bytes_per_row(compact_results(df))))
+
+
+def result_frame(fx, n):
+    """검색 결과(최대 500개)를 n 행으로 복제 (video_id 만 다르게) -> 압축 스키마"""
+    svc = ReplayService(fx, n_channels=max(1, min(n, PER_KEYWORD) // 5))
+    youtube_core.build = lambda *a, **k: svc
+    base = pd.DataFrame(mine_keywords("bench", ["벤치 리스트"], min(n, PER_KEYWORD), baseline_uploads=0))
+    df = pd.concat([base] * -(-n // len(base)), ignore_index=True).head(n)
+    df['video_id'] = [f"bench{i:07d}" for i in range(n)]
+    return compact_results(df)
+
+
+def bench_list_view(fx, n, repeat):
+    """리스트 뷰 전송량: 화면용 프레임 -> 기본 표시 컬럼만 투영"""
+    view = with_derived_columns(result_frame(fx, n))
+    view[ROW_KEY] = view.index
+    cols = [*LIST_FIXED_COLS, *LIST_DEFAULT_COLS]
+    full_times, full_bytes = timed(lambda: arrow_payload_bytes(view), repeat)
+    times, sent_bytes = timed(lambda: arrow_payload_bytes(project_columns(view, cols)), repeat)
+    return summarize("list_view", n, times, "rows/s", payload_bytes=sent_bytes, payload_bytes_full=full_bytes,
+                     full_median_s=round(statistics.median(full_times), 5),
+                     saving_pct=round((1 - sent_bytes / full_bytes) * 100, 1) if full_bytes else 0.0)
+
+
+def legacy_csv(df):
+    """이전 CSV 버튼: 셀마다 NFC 정규화(.apply) 후 전체 CSV 문자열을 한 번에"""
+    out = with_derived_columns(df)
+    for col in ('title', 'channel'):
+        out[col] = out[col].apply(lambda x: unicodedata.normalize('NFC', str(x)) if isinstance(x, str) else x)
+    return out[[c for c in EXPORT_COLS if c in out.columns]].to_csv(index=False).encode('utf-8-sig')
+
+
+def bench_export(fx, n, repeat):
+    """형식별 내보내기 -> [결과]. XLSX 는 xlsxwriter 가 있을 때만"""
+    df = result_frame(fx, n)
+    out = []
+    for fmt in EXPORT_FORMATS:
+        try:
+            times, data = timed(lambda: export_bytes(df, fmt), repeat)
+        except ImportError as e:
+            print(f"⚠️ export_{fmt.lower()} 건너뜀: {e}")
+            continue
+        extra = {'bytes': len(data)}
+        if fmt == 'CSV':
+            legacy_times, legacy = timed(lambda: legacy_csv(df), repeat)
+            extra.update(legacy_median_s=round(statistics.median(legacy_times), 5), same_output=legacy == data)
+        out.append(summarize(f"export_{fmt.lower()}", n, times, "rows/s", **extra))
+    return out
+
+
+def bench_transcript(fx, n, repeat):
+    content = scaled_subtitle(fx, n)
+    times, text = timed(lambda: parse_subtitle_text(content), repeat)
+    return summarize("transcript", n, times, "cues/s", input_bytes=len(content.encode('utf-8')), output_chars=len(text))
+
+
+def bench_comments(fx, n, repeat, latency_ms):
+    pages = max(1, n // 50)
+    svc = ReplayService(fx, latency_ms=latency_ms, comment_pages=pages)
+    times, comments = timed(lambda: fetch_comments(svc, "bench", max_pages=pages), repeat)
+    return summarize("comments", n, times, "comments/s", pages=pages, collected=len(comments))
+
+
+def bench_sheets(fx, n_rows, repeat):
+    sheet = ReplayWorksheet(fx, n_rows)
+    # 절반은 이미 시트에 있는 URL (중복), 절반은 새 URL
+    existing = [r[0] for r in sheet.get_all_values()[1:UPLOAD_ITEMS // 2 + 1]]
+    data = [{'url': u, 'title': "중복"} for u in existing] + \
+           [{'url': f"https://www.youtube.com/watch?v=new{i:08d}", 'title': f"새 영상 {i}"} for i in range(UPLOAD_ITEMS - len(existing))]
+    times, (added, dup) = timed(lambda: append_to_sheet(sheet, data, "사연", "노후", "쇼츠"), repeat)
+    return summarize("sheets", n_rows, times, "sheet rows/s", uploaded=len(data), added=added, duplicates=dup)
+
+
+# === 저장 / 비교 ===
+def save_results(report, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{report['env']['git']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def previous_result(exclude, out_dir=RESULTS_DIR):
+    files = sorted(f for f in glob.glob(os.path.join(out_dir, "*.json")) if os.path.abspath(f) != os.path.abspath(exclude))
+    return files[-1] if files else None
+
+
+def compare(current, baseline_path, threshold):
+    """median_s 기준 비교 -> 회귀(threshold 초과 느려짐) 개수"""
+    with open(baseline_path, encoding='utf-8') as f: base = json.load(f)
+    old = {(r['case'], r['n']): r for r in base['results']}
+    print(f"\n비교 기준: {os.path.basename(baseline_path)} (git {base['env'].get('git')})")
+    print(f"{'case':12s} {'n':>8s} {'이전(s)':>10s} {'현재(s)':>10s} {'변화':>8s}")
+    regressions = 0
+    for r in current['results']:
+        o = old.get((r['case'], r['n']))
+        if not o: continue
+        delta = (r['median_s'] - o['median_s']) / o['median_s'] * 100 if o['median_s'] else 0
+        flag = ""
+        if delta > threshold: flag, regressions = " ⚠️ 회귀", regressions + 1
+        elif delta < -threshold: flag = " ✅ 개선"
+        print(f"{r['case']:12s} {r['n']:>8,} {o['median_s']:>10.4f} {r['median_s']:>10.4f} {delta:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="오프라인 벤치마크 (녹화 fixtures 재생)")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="검색/자막/댓글 규모 (쉼표 구분)")
+    ap.add_argument("--sheet-sizes", default=",".join(map(str, SHEET_SIZES)), help="기존 시트 행 수 (쉼표 구분)")
+    ap.add_argument("--export-sizes", default=",".join(map(str, EXPORT_SIZES)), help="내보내기 행 수 (쉼표 구분)")
+    ap.add_argument("--cases", default="search,list_view,transcript,comments,sheets,export")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=0, help="API 호출당 인위 지연")
+    ap.add_argument("--workers", type=int, default=4, help="mine_keywords 동시성")
+    ap.add_argument("--fixtures", default=None, help="fixtures 디렉터리 (기본 benchmarks/fixtures)")
+    ap.add_argument("--compare", help="비교할 이전 결과 파일 (기본: results/ 의 직전 파일)")
+    ap.add_argument("--threshold", type=float, default=10.0, help="회귀 판정 기준 (%%)")
+    ap.add_argument("--no-save", action="store_true")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args()
+
+    fx, source = load_fixtures(args.fixtures) if args.fixtures else load_fixtures()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    sheet_sizes = [int(s) for s in args.sheet_sizes.split(",") if s]
+    export_sizes = [int(s) for s in args.export_sizes.split(",") if s]
+    cases = set(args.cases.split(","))
+    synth = [k for k, v in source.items() if v == 'synthetic']
+    if synth: print(f"⚠️ 녹화본 없음 -> 합성 데이터 사용: {', '.join(synth)} (record_fixtures.py 로 녹화)")
+
+    results = []
+    def run(r):
+        results.append(r)
+        extra = {k: v for k, v in r.items() if k not in ('case', 'n', 'unit', 'median_s', 'min_s', 'max_s', 'throughput')}
+        print(f"{r['case']:12s} n={r['n']:>8,}  median {r['median_s'] * 1000:>10.1f} ms  {r['throughput'] or 0:>12,.0f} {r['unit']}  {extra}")
+
+    for n in sizes:
+        if 'search' in cases: run(bench_search(fx, n, args.repeat, args.latency_ms, args.workers))
+        if 'list_view' in cases: run(bench_list_view(fx, n, args.repeat))
+        if 'transcript' in cases: run(bench_transcript(fx, n, args.repeat))
+        if 'comments' in cases: run(bench_comments(fx, n, args.repeat, args.latency_ms))
+    if 'sheets' in cases:
+        for n in sheet_sizes: run(bench_sheets(fx, n, args.repeat))
+    if 'export' in cases:
+        for n in export_sizes:
+            for r in bench_export(fx, n, args.repeat): run(r)
+
+    report = {
+        'env': {'git': git_rev(), 'python': platform.python_version(), 'pandas': pd.__version__, 'platform': platform.platform(),
+                'repeat': args.repeat, 'latency_ms': args.latency_ms, 'workers': args.workers, 'fixtures': source,
+                'ts': datetime.now().isoformat(timespec='seconds')},
+        'results': results,
+    }
+    path = None
+    if not args.no_save:
+        path = save_results(report)
+        print(f"\n저장: {path}")
+    baseline = args.compare or previous_result(path or "")
+    regressions = compare(report, baseline, args.threshold) if baseline else 0
+    if regressions and args.fail_on_regression: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
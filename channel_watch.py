@@ -0,0 +1,237 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 채널 감시 (고정한 채널의 새 업로드 추적)
+# 같은 채널 주변을 보려고 search().list(100 units)를 반복하는 대신
+#   채널 업로드 재생목록 playlistItems.list (채널당 1 unit)
+#   -> 최근 업로드 ID 를 모아 videos.list (50개당 1 unit) / channels.list (50개당 1 unit)
+#   -> 검색 결과와 같은 지표(떡상지표 / 성과지표 / 채널 기준선) 계산
+# 처음 본 영상은 '새 영상', 알림 등급(🚀/💎, 기준선 대비 초대박)을 처음 넘은 영상은 '떡상 피드'에 올린다.
+# 고정 목록/추적 영상/피드는 사용자(owner = usage_user_id)별이고, 점검은 고정한 사용자의 API 키로 한다.
+# ============================================================================
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from youtube_core import (
+    _ThreadServices, build_result_row, fetch_video_items, fetch_channel_stats, compute_channel_baselines,
+    apply_channel_baselines, uploads_playlist_id, is_breakout, PLAYLIST_FIELDS, BASELINE_UPLOADS,
+)
+
+WATCH_DB = 'channel_watch.db'
+POLL_PAGE = 50             # 채널당 최근 업로드 50개 (playlistItems 1페이지 = 1 unit)
+WATCH_MAX_AGE_DAYS = 30    # 이보다 오래된 업로드는 추적하지 않음 (처음 고정할 때 옛 영상이 전부 '새 영상'이 되지 않게)
+WATCH_TAG = "📌 채널 감시"  # 결과 행의 keywords 자리에 표시
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    owner       TEXT NOT NULL,    -- usage_user_id
+    channel_id  TEXT NOT NULL,
+    api_key     TEXT NOT NULL,    -- 점검에 쓸 owner 의 키
+    title       TEXT NOT NULL,
+    uploads     TEXT NOT NULL,
+    added_ts    INTEGER NOT NULL,
+    last_polled INTEGER,
+    last_error  TEXT,
+    PRIMARY KEY (owner, channel_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS videos (
+    owner       TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    channel_id  TEXT NOT NULL,
+    first_seen  INTEGER NOT NULL,
+    updated     INTEGER NOT NULL,
+    breakout_ts INTEGER,          -- 알림 등급을 처음 넘은 시각
+    row         TEXT NOT NULL,    -- 최신 결과 행 (JSON)
+    PRIMARY KEY (owner, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videos_channel ON videos(owner, channel_id);
+"""
+
+
+class ChannelWatchStore:
+    """사용자별 고정 채널 목록 + 추적 영상의 최신 지표 (SQLite, 호출마다 새 연결)"""
+    def __init__(self, path=WATCH_DB):
+        self.path = path
+        with self._conn() as con:
+            con.executescript(_SCHEMA)
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    # --- 고정 채널 ---
+    def pin(self, owner, api_key, channels):
+        """owner 가 [(channel_id, 채널명)] 고정 (이미 있으면 점검 키만 갱신) -> 새로 고정한 수"""
+        now = int(time.time())
+        rows = [(owner, cid, api_key, title, uploads_playlist_id(cid), now) for cid, title in channels if uploads_playlist_id(cid)]
+        with self._conn() as con:
+            placeholders = ','.join('?' * len(rows))
+            known = {r[0] for r in con.execute(f"SELECT channel_id FROM channels WHERE owner = ? AND channel_id IN ({placeholders})",
+                                               [owner, *(r[1] for r in rows)])} if rows else set()
+            con.executemany("""INSERT INTO channels (owner, channel_id, api_key, title, uploads, added_ts) VALUES (?, ?, ?, ?, ?, ?)
+                               ON CONFLICT(owner, channel_id) DO UPDATE SET api_key = excluded.api_key""", rows)
+            return len({r[1] for r in rows} - known)
+
+    def unpin(self, owner, channel_ids):
+        with self._conn() as con:
+            con.executemany("DELETE FROM channels WHERE owner = ? AND channel_id = ?", [(owner, c) for c in channel_ids])
+            con.executemany("DELETE FROM videos WHERE owner = ? AND channel_id = ?", [(owner, c) for c in channel_ids])
+
+    def pinned(self, owner):
+        with self._conn() as con:
+            con.row_factory = sqlite3.Row
+            return [dict(r) for r in con.execute("SELECT * FROM channels WHERE owner = ? ORDER BY added_ts", (owner,))]
+
+    def owners(self):
+        """점검용: {owner: api_key}"""
+        with self._conn() as con:
+            return dict(con.execute("SELECT owner, MAX(api_key) FROM channels GROUP BY owner ORDER BY owner"))
+
+    def mark_polled(self, owner, results, ts=None):
+        """{channel_id: 오류 메시지 또는 None}"""
+        ts = int(ts or time.time())
+        with self._conn() as con:
+            con.executemany("UPDATE channels SET last_polled = ?, last_error = ? WHERE owner = ? AND channel_id = ?",
+                            [(ts, err, owner, cid) for cid, err in results.items()])
+
+    # --- 추적 영상 ---
+    def record(self, owner, rows, ts=None):
+        """owner 의 추적 영상 최신 지표 저장 -> (처음 본 영상 ID 목록, 이번에 처음 알림 등급을 넘은 행 목록)"""
+        ts = int(ts or time.time())
+        if not rows: return [], []
+        ids = [r['video_id'] for r in rows]
+        with self._conn() as con:
+            known = {}
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                known.update(con.execute(f"SELECT video_id, breakout_ts FROM videos WHERE owner = ? AND video_id IN ({','.join('?' * len(batch))})",
+                                         [owner, *batch]).fetchall())
+            new_ids, new_breakouts, params = [], [], []
+            for r in rows:
+                vid = r['video_id']
+                if vid not in known: new_ids.append(vid)
+                b_ts = known.get(vid)
+                if b_ts is None and is_breakout(r):
+                    b_ts = ts
+                    new_breakouts.append(r)
+                params.append((owner, vid, r['channel_id'], ts, ts, b_ts, json.dumps(r, ensure_ascii=False)))
+            con.executemany("""INSERT INTO videos VALUES (?, ?, ?, ?, ?, ?, ?)
+                               ON CONFLICT(owner, video_id) DO UPDATE SET updated = excluded.updated,
+                               breakout_ts = excluded.breakout_ts, row = excluded.row""", params)
+        return new_ids, new_breakouts
+
+    def rows(self, owner):
+        """owner 가 추적 중인 영상의 최신 결과 행 (새로 본 순)"""
+        with self._conn() as con:
+            return [json.loads(r[0]) for r in con.execute(
+                "SELECT row FROM videos WHERE owner = ? ORDER BY first_seen DESC, video_id", (owner,))]
+
+    def breakouts(self, owner, limit=20):
+        """owner 의 떡상 피드: [(알림 시각, 결과 행)] 최신순"""
+        with self._conn() as con:
+            return [(ts, json.loads(row)) for ts, row in con.execute(
+                """SELECT breakout_ts, row FROM videos WHERE owner = ? AND breakout_ts IS NOT NULL
+                   ORDER BY breakout_ts DESC, video_id LIMIT ?""", (owner, limit))]
+
+    def prune(self, keep_days=WATCH_MAX_AGE_DAYS * 2):
+        """업로드 창에서 빠진 뒤 오래 갱신되지 않은 영상 삭제"""
+        cutoff = int(time.time()) - keep_days * 86400
+        with self._conn() as con:
+            con.execute("DELETE FROM videos WHERE updated < ?", (cutoff,))
+
+
+def poll_channels(api_key, store, owner, backend="google", max_workers=4, max_age_days=WATCH_MAX_AGE_DAYS,
+                  baseline_uploads=BASELINE_UPLOADS, now=None):
+    """
+    owner 의 고정 채널을 api_key(owner 의 키)로 1회 점검 -> 요약 dict
+    {'channels': 점검 채널 수, 'videos': 지표 갱신 영상 수, 'new': 새 영상 수, 'breakouts': 새 떡상 행 목록, 'errors': [...]}
+    재생목록 실패 채널은 건너뛰고(errors, last_error) 나머지는 그대로 반영한다.
+    """
+    summary = {'channels': 0, 'videos': 0, 'new': 0, 'breakouts': [], 'errors': []}
+    channels = store.pinned(owner)
+    if not api_key or not channels: return summary
+    services = _ThreadServices(api_key, backend)
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=max_age_days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    # 1) 채널별 업로드 재생목록 최근 1페이지 (동시 실행, 채널당 1 unit)
+    def _uploads(ch):
+        try:
+            res = services.get().playlistItems().list(part="contentDetails", playlistId=ch['uploads'], maxResults=POLL_PAGE,
+                                                      fields=PLAYLIST_FIELDS).execute()
+            return ch['channel_id'], res.get('items', []), None
+        except Exception as e:
+            return ch['channel_id'], [], str(e)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        polled = list(ex.map(_uploads, channels))
+    recent = [i['contentDetails']['videoId'] for _, items, _ in polled for i in items
+              if i.get('contentDetails', {}).get('videoPublishedAt', '') >= cutoff]
+    summary['channels'] = len(channels)
+    summary['errors'] = [f"{cid}: {err}" for cid, _, err in polled if err]
+
+    # 2) 최근 업로드 통계 + 채널 통계 (50개 단위 배치) -> 검색 결과와 같은 행/지표
+    rows = []
+    if recent:
+        youtube = services.get()
+        v_items = fetch_video_items(youtube, recent)
+        ch_stats = fetch_channel_stats(youtube, [c['channel_id'] for c in channels])
+        for v in v_items.values():
+            row = build_result_row(v, ch_stats.get(v['snippet'].get('channelId'), {'sub': 0, 'view': 0, 'vid': 0}))
+            row['keywords'] = WATCH_TAG
+            rows.append(row)
+        if baseline_uploads and rows:
+            used = {r['channel_id'] for r in rows}
+            apply_channel_baselines(rows, compute_channel_baselines(api_key, {c: ch_stats[c] for c in used if c in ch_stats},
+                                                                    baseline_uploads, backend, max_workers))
+
+    new_ids, new_breakouts = store.record(owner, rows)
+    store.mark_polled(owner, {cid: err for cid, _, err in polled})
+    store.prune()
+    summary.update(videos=len(rows), new=len(new_ids), breakouts=new_breakouts)
+    return summary
+
+
+class ChannelWatcher:
+    """백그라운드에서 interval_sec 마다 사용자별 고정 채널을 그 사용자의 키로 점검한다 (SnapshotCollector 와 같은 구조)"""
+    def __init__(self, store, interval_sec=3600, backend="google"):
+        self.store = store
+        self.interval_sec = interval_sec
+        self.backend = backend
+        self.last_run = None
+        self.last_error = None
+        self.errors = {}      # owner -> 마지막 점검 오류 (화면에는 그 사용자에게만)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="channel-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self.poll_once()
+
+    def poll_once(self, owner=None):
+        """owner 만 (지금 점검 버튼) 또는 전체 사용자 -> owner 를 줬으면 그 요약, 아니면 {owner: 요약}"""
+        owners = self.store.owners()
+        if owner is not None: owners = {owner: owners[owner]} if owner in owners else {}
+        summaries = {}
+        for o, api_key in owners.items():
+            try:
+                summaries[o] = poll_channels(api_key, self.store, o, self.backend)
+                self.errors[o] = summaries[o]['errors'][0] if summaries[o]['errors'] else None
+            except Exception as e:
+                self.errors[o] = str(e)
+        if owners:
+            self.last_run = time.time()
+            self.last_error = next((e for o, e in self.errors.items() if o in owners and e), None)
+        return summaries.get(owner) if owner is not None else summaries
@@ -0,0 +1,257 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 채굴 데이터 레이크 (로컬 Parquet, 날짜/키워드 파티션) + DuckDB 분석
+# 검색 결과 / 통계 새로고침 / 키워드 감시 실행 / 대본·댓글 수집을 버리지 않고 쌓아서 몇 달치를 분석한다.
+#   data_lake/results/owner=<usage_user_id>/dt=2026-10-19/kw=<키워드(URL 인코딩)>/part-*.parquet   결과 행 스냅샷
+#   data_lake/texts/owner=.../dt=.../kw=.../part-*.parquet                                       대본/댓글 본문
+#   - owner: 그 데이터를 만든 사용자. 키워드 목록/분석은 owner 디렉터리 안에서만 (다른 사용자의 검색어가 보이지 않게)
+#   - 추가: 호출 1번 = 파티션마다 작은 파일 1개 (임시 파일에 쓰고 rename -> 반쯤 쓴 파일은 읽히지 않음)
+#   - 압축: 작은 파일이 COMPACT_MIN_FILES 개 이상 쌓인 파티션을 파일 1개로 합친다 (LakeCompactor 가 주기 실행)
+#   - 분석: DuckDB read_parquet(hive_partitioning) -> owner/dt/kw 조건은 디렉터리 이름으로 먼저 걸러져(파일 가지치기)
+#     데이터가 쌓여도 조회 기간/키워드만큼만 읽는다
+# dt 는 한국 시간 날짜 (화면의 발행시간과 같은 기준). 쓰기는 pyarrow(Streamlit 의존성), duckdb 는 분석할 때만 import.
+# ============================================================================
+
+import glob
+import os
+import threading
+import time
+import unicodedata
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+LAKE_DIR = 'data_lake'
+COMPACT_MIN_FILES = 8
+COMPACT_LOCK_STALE = 3600     # 압축 잠금 파일이 이보다 오래되면 죽은 프로세스가 남긴 것으로 보고 무시
+NO_KEYWORD = "_"
+KST = timezone(timedelta(hours=9))
+ALERT_GRADES_SQL = "('🚀 초대박', '💎 전설')"   # youtube_core.ALERT_GRADES
+
+SCHEMAS = {
+    'results': pa.schema([
+        ('ts', pa.timestamp('s', tz='UTC')), ('event', pa.string()), ('video_id', pa.string()), ('title', pa.string()),
+        ('channel_id', pa.string()), ('channel', pa.string()), ('published_at', pa.string()),
+        ('view_count', pa.int64()), ('subscriber_count', pa.int64()), ('comment_count', pa.int64()), ('duration_sec', pa.int64()),
+        ('view_sub_ratio', pa.float64()), ('outlier_score', pa.float64()), ('baseline_views', pa.float64()),
+        ('performance', pa.string()), ('breakout_grade', pa.string()),
+    ]),
+    'texts': pa.schema([
+        ('ts', pa.timestamp('s', tz='UTC')), ('event', pa.string()), ('video_id', pa.string()), ('title', pa.string()),
+        ('channel', pa.string()), ('items', pa.int32()), ('chars', pa.int64()), ('body', pa.string()),
+    ]),
+}
+
+
+def _nfc(value):
+    return unicodedata.normalize('NFC', value) if isinstance(value, str) else value
+
+def _owner_dir(root, table, owner):
+    return os.path.join(root, table, f"owner={quote(owner, safe='')}")
+
+def _partition_dir(root, table, owner, dt, kw):
+    return os.path.join(_owner_dir(root, table, owner), f"dt={dt}", f"kw={quote(kw, safe='')}")
+
+def _write_atomic(table, path):
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+
+
+class DataLake:
+    """Parquet 파티션 쓰기/압축 + DuckDB 분석 쿼리 (여러 세션/프로세스가 동시에 써도 파일 이름이 겹치지 않음)"""
+    def __init__(self, root=LAKE_DIR):
+        self.root = root
+        self._compact_lock = threading.Lock()
+
+    # --- 쓰기 ---
+    def _append(self, table, owner, df, ts):
+        """df: 스키마 컬럼 + 'kw' -> owner 아래 (dt, kw) 파티션마다 파일 1개. 추가한 행 수"""
+        if df.empty: return 0
+        schema = SCHEMAS[table]
+        df = df.copy()
+        df['ts'] = pd.Timestamp(ts, unit='s', tz='UTC')
+        dt = datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%d")
+        for col in schema.names:
+            if col not in df.columns: df[col] = None
+        stamp = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%dT%H%M%S")
+        for kw, part in df.groupby('kw', sort=False):
+            out = _partition_dir(self.root, table, owner, dt, kw)
+            os.makedirs(out, exist_ok=True)
+            arrow = pa.Table.from_pandas(part[schema.names], schema=schema, preserve_index=False)
+            _write_atomic(arrow, os.path.join(out, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+        return len(df)
+
+    def append_results(self, owner, rows, event, keyword=None, ts=None):
+        """
+        owner(usage_user_id) 의 결과 행(DataFrame 또는 dict 목록) 스냅샷 추가. event = search / refresh / watch
+        파티션 키워드: 행의 keywords(다중 키워드면 키워드마다 1행) -> 없으면 keyword 인자
+        """
+        df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+        if df.empty: return 0
+        ts = int(ts or time.time())
+        kws = df['keywords'].astype(str) if 'keywords' in df.columns else pd.Series("", index=df.index)
+        df = df.assign(kw=kws.where(kws.str.strip() != "", keyword or NO_KEYWORD).str.split(", ")).explode('kw')
+        df['kw'] = df['kw'].map(_nfc).str.strip().replace("", NO_KEYWORD)
+        df['event'] = event
+        for col in ('performance', 'breakout_grade', 'channel', 'channel_id', 'title'):
+            if col in df.columns: df[col] = df[col].astype(str)
+        for col in ('view_count', 'subscriber_count', 'comment_count', 'duration_sec'):
+            if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
+        for col in ('view_sub_ratio', 'outlier_score', 'baseline_views'):
+            if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        return self._append('results', owner, df, ts)
+
+    def append_text(self, owner, kind, video_id, body, keyword=None, title="", channel="", items=0, ts=None):
+        """owner 의 대본(kind='script') / 댓글(kind='comments', items=댓글 수) 본문 1건 추가"""
+        body = _nfc(body or "")
+        df = pd.DataFrame([{'event': kind, 'video_id': video_id, 'title': _nfc(title), 'channel': _nfc(channel),
+                            'items': int(items), 'chars': len(body), 'body': body, 'kw': _nfc(keyword or "").strip() or NO_KEYWORD}])
+        return self._append('texts', owner, df, int(ts or time.time()))
+
+    # --- 압축 ---
+    def partitions(self, table='results', owner=None):
+        """(owner, dt, kw) 파티션 디렉터리 (owner 를 주면 그 사용자 것만)"""
+        base = _owner_dir(self.root, table, owner) if owner is not None else os.path.join(self.root, table, "owner=*")
+        return sorted(glob.glob(os.path.join(base, "dt=*", "kw=*")))
+
+    def _lock_file(self):
+        """프로세스 간 압축 잠금 (O_EXCL 로 잠금 파일 생성) -> 경로 또는 None"""
+        path = os.path.join(self.root, ".compact.lock")
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(path) > COMPACT_LOCK_STALE: os.remove(path)
+        except OSError: pass
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            return None
+
+    def compact(self, min_files=COMPACT_MIN_FILES):
+        """작은 파일이 min_files 개 이상인 파티션을 파일 1개로 -> {'partitions': 합친 파티션 수, 'files': 없앤 파일 수}"""
+        done = {'partitions': 0, 'files': 0}
+        if not self._compact_lock.acquire(blocking=False): return done
+        lock = self._lock_file()
+        try:
+            if not lock: return done
+            for table in SCHEMAS:
+                for part in self.partitions(table):
+                    files = sorted(glob.glob(os.path.join(part, "*.parquet")))
+                    if len(files) < min_files: continue
+                    merged = pa.concat_tables([pq.read_table(f, schema=SCHEMAS[table]) for f in files])
+                    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+                    _write_atomic(merged, os.path.join(part, f"compact-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+                    for f in files:   # 합친 새 파일이 먼저 보이고 나서 지운다 (그 사이 추가된 파일은 그대로)
+                        try: os.remove(f)
+                        except FileNotFoundError: pass
+                    done['partitions'] += 1
+                    done['files'] += len(files) - 1
+        finally:
+            if lock: os.remove(lock)
+            self._compact_lock.release()
+        return done
+
+    def stats(self, owner=None):
+        """파티션/파일 수, 크기 (owner 를 주면 그 사용자 것만)"""
+        parts = self.partitions('results', owner) + self.partitions('texts', owner)
+        files = [f for part in parts for f in glob.glob(os.path.join(part, "*.parquet"))]
+        return {'partitions': len(parts), 'files': len(files),
+                'bytes': sum(os.path.getsize(f) for f in files if os.path.exists(f))}
+
+    # --- 분석 (DuckDB) ---
+    def _source(self, table, owner):
+        """owner 디렉터리 아래 파일만 읽는다 (다른 사용자의 파일은 목록에도 오르지 않음)"""
+        path = os.path.join(_owner_dir(self.root, table, owner), "**", "*.parquet").replace("'", "''")
+        return (f"read_parquet('{path}', hive_partitioning = true, "
+                f"hive_types = {{'owner': VARCHAR, 'dt': DATE, 'kw': VARCHAR}}, union_by_name = true)")
+
+    def _where(self, date_from, date_to, keywords):
+        """파티션 컬럼(dt, kw) 조건 -> DuckDB 가 이 조건으로 읽을 파일을 먼저 고른다"""
+        sql, params = ["dt BETWEEN ? AND ?"], [date_from, date_to]
+        if keywords:
+            sql.append(f"kw IN ({', '.join('?' * len(keywords))})")
+            params += [_nfc(k) for k in keywords]
+        return " AND ".join(sql), params
+
+    def query(self, owner, sql, params=()):
+        """owner 의 결과 파티션이 없으면 빈 프레임 (read_parquet 는 파일이 없으면 오류)"""
+        import duckdb
+        if not self.partitions('results', owner): return pd.DataFrame()
+        for attempt in range(2):
+            try:
+                with duckdb.connect() as con:
+                    return con.execute(sql, list(params)).df()
+            except duckdb.IOException:
+                if attempt: raise   # 읽는 도중 압축이 파일을 바꿨으면 1번 더 (새 파일 목록으로)
+
+    def _latest(self, owner, date_from, date_to, keywords):
+        """owner 의 기간/키워드 안에서 (키워드, 영상)마다 가장 최근 스냅샷 1행 (검색/새로고침이 여러 번 쌓이므로)"""
+        where, params = self._where(date_from, date_to, keywords)
+        return (f"""WITH latest AS (
+                      SELECT * FROM {self._source('results', owner)} WHERE {where}
+                      QUALIFY row_number() OVER (PARTITION BY kw, video_id ORDER BY ts DESC) = 1)""", params)
+
+    def keywords(self, owner):
+        """owner 의 파티션 디렉터리에 있는 키워드 목록 (파일을 읽지 않음)"""
+        return sorted({unquote(os.path.basename(p)[len("kw="):]) for p in self.partitions('results', owner)})
+
+    def top_breakout_channels(self, owner, date_from, date_to, keywords=None, limit=20):
+        cte, params = self._latest(owner, date_from, date_to, keywords)
+        return self.query(owner, f"""{cte}
+            SELECT channel, count(DISTINCT video_id) AS breakouts, max(view_sub_ratio) AS best_ratio, any_value(channel_id) AS channel_id
+            FROM latest WHERE breakout_grade IN {ALERT_GRADES_SQL}
+            GROUP BY channel ORDER BY breakouts DESC, best_ratio DESC LIMIT {int(limit)}""", params)
+
+    def grade_distribution(self, owner, date_from, date_to, keywords=None):
+        cte, params = self._latest(owner, date_from, date_to, keywords)
+        return self.query(owner, f"""{cte}
+            SELECT kw AS keyword, coalesce(nullif(breakout_grade, ''), '-') AS grade, count(*) AS videos
+            FROM latest GROUP BY ALL ORDER BY keyword, grade""", params)
+
+    def duration_vs_ratio(self, owner, date_from, date_to, keywords=None):
+        cte, params = self._latest(owner, date_from, date_to, keywords)
+        return self.query(owner, f"""{cte}
+            SELECT CASE WHEN duration_sec <= 60 THEN '1) ~1분 (쇼츠)' WHEN duration_sec <= 240 THEN '2) 1~4분'
+                        WHEN duration_sec <= 600 THEN '3) 4~10분' WHEN duration_sec <= 1200 THEN '4) 10~20분'
+                        ELSE '5) 20분~' END AS duration,
+                   count(*) AS videos, median(view_sub_ratio) AS median_ratio, avg(view_sub_ratio) AS avg_ratio,
+                   avg(CASE WHEN breakout_grade IN {ALERT_GRADES_SQL} THEN 1.0 ELSE 0.0 END) * 100 AS breakout_pct
+            FROM latest GROUP BY 1 ORDER BY 1""", params)
+
+
+class LakeCompactor:
+    """백그라운드에서 interval_sec 마다 DataLake.compact() (SnapshotCollector 와 같은 구조)"""
+    def __init__(self, lake, interval_sec=3600):
+        self.lake = lake
+        self.interval_sec = interval_sec
+        self.last_run = None
+        self.last_error = None
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="lake-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self.compact_once()
+
+    def compact_once(self):
+        try:
+            self.last_result = self.lake.compact()
+            self.last_run, self.last_error = time.time(), None
+            return self.last_result
+        except Exception as e:
+            self.last_error = str(e)
+            return None
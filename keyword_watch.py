@@ -0,0 +1,251 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 키워드 감시 (저장한 검색 조건을 주기적으로 자동 실행)
+#   - 감시 작업: 키워드 / 기간 / 영상 길이 / 최소 조회수·구독자 / 실행 간격
+#   - 증분 실행: 직전 실행 시각(watermark) 이후 게시된 영상만 검색 (publishedAfter, 최신순)
+#     검색 색인 지연을 고려해 WATERMARK_OVERLAP 만큼 겹쳐서 찾고, 이미 본 영상은 video_id 로 거른다
+#     새 영상이 limit_count 개를 넘으면 watermark 는 그대로 두고 끊긴 지점(publishedBefore)부터 다음 실행에서 이어 찾는다
+#   - 알림 피드: 떡상등급 🚀/💎 를 넘은 영상 (작업+영상당 1번만)
+# 여러 프로세스가 같은 DB 를 써도 작업 1건은 한 곳에서만 실행된다 (next_run 조건부 UPDATE 로 선점).
+# 작업/알림은 사용자(owner = usage_user_id)별이고, 작업은 등록한 사용자의 API 키로 실행한다.
+# ============================================================================
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from youtube_core import mine_keywords, ALERT_GRADES, BASELINE_UPLOADS
+
+WATCH_DB = 'keyword_watch.db'
+WATERMARK_OVERLAP = timedelta(hours=2)
+INTERVAL_OPTIONS_MIN = (60, 180, 360, 720, 1440)
+_RFC3339 = "%Y-%m-%dT%H:%M:%SZ"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner        TEXT NOT NULL,      -- usage_user_id
+    api_key      TEXT NOT NULL,      -- 실행에 쓸 owner 의 키
+    keyword      TEXT NOT NULL,
+    period       TEXT NOT NULL,      -- 화면 표시용 (첫 실행 범위)
+    duration     TEXT NOT NULL,
+    min_view     INTEGER NOT NULL,
+    min_sub      INTEGER NOT NULL,
+    limit_count  INTEGER NOT NULL,
+    interval_min INTEGER NOT NULL,
+    enabled      INTEGER NOT NULL DEFAULT 1,
+    created_ts   INTEGER NOT NULL,
+    next_run     INTEGER NOT NULL,
+    last_run     INTEGER,
+    last_count   INTEGER,
+    last_error   TEXT,
+    watermark    TEXT,               -- 다음 실행의 publishedAfter (None = 기간 제한 없음)
+    backfill_before    TEXT,         -- 밀린 구간을 이어 찾는 중이면 다음 실행의 publishedBefore
+    backfill_watermark TEXT          -- 밀린 구간을 다 찾은 뒤 옮길 watermark
+);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs(owner);
+CREATE TABLE IF NOT EXISTS seen (
+    job_id   INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (job_id, video_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alerts (
+    job_id   INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    ts       INTEGER NOT NULL,
+    is_read  INTEGER NOT NULL DEFAULT 0,
+    row      TEXT NOT NULL,
+    PRIMARY KEY (job_id, video_id)
+) WITHOUT ROWID;
+"""
+
+
+class KeywordWatchStore:
+    """감시 작업 / 본 영상 / 알림 (SQLite, 호출마다 새 연결). 화면용 조회/변경은 owner 의 것만"""
+    def __init__(self, path=WATCH_DB):
+        self.path = path
+        with self._conn() as con:
+            con.executescript(_SCHEMA)
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    # --- 작업 ---
+    def add_job(self, owner, api_key, keyword, p_after=None, period="전체", duration="전체", min_view=0, min_sub=0, limit_count=50,
+                interval_min=360):
+        """owner 의 작업 추가 (바로 다음 점검 때 첫 실행, owner 의 키로) -> id"""
+        now = int(time.time())
+        with self._conn() as con:
+            cur = con.execute("""INSERT INTO jobs (owner, api_key, keyword, period, duration, min_view, min_sub, limit_count, interval_min,
+                                                   created_ts, next_run, watermark) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                              (owner, api_key, keyword.strip(), period, duration, int(min_view), int(min_sub), int(limit_count),
+                               int(interval_min), now, now, p_after))
+            return cur.lastrowid
+
+    def _owns(self, con, owner, job_id):
+        return con.execute("SELECT 1 FROM jobs WHERE id = ? AND owner = ?", (job_id, owner)).fetchone() is not None
+
+    def remove_job(self, owner, job_id):
+        with self._conn() as con:
+            if not self._owns(con, owner, job_id): return
+            for table, col in (("jobs", "id"), ("seen", "job_id"), ("alerts", "job_id")):
+                con.execute(f"DELETE FROM {table} WHERE {col} = ?", (job_id,))
+
+    def set_enabled(self, owner, job_id, enabled):
+        with self._conn() as con:
+            con.execute("UPDATE jobs SET enabled = ? WHERE id = ? AND owner = ?", (int(bool(enabled)), job_id, owner))
+
+    def jobs(self, owner):
+        with self._conn() as con:
+            con.row_factory = sqlite3.Row
+            return [dict(r) for r in con.execute("SELECT * FROM jobs WHERE owner = ? ORDER BY id", (owner,))]
+
+    def due_jobs(self, now=None, owner=None):
+        """실행 시각이 된 작업 (owner 를 주면 그 사용자 것만)"""
+        now = int(now or time.time())
+        with self._conn() as con:
+            con.row_factory = sqlite3.Row
+            return [dict(r) for r in con.execute(
+                "SELECT * FROM jobs WHERE enabled = 1 AND next_run <= ? AND (? IS NULL OR owner = ?) ORDER BY next_run", (now, owner, owner))]
+
+    def claim(self, job, now=None):
+        """실행 선점: next_run 을 다음 주기로 미룬다 (다른 프로세스가 먼저 가져갔으면 False)"""
+        now = int(now or time.time())
+        with self._conn() as con:
+            cur = con.execute("UPDATE jobs SET next_run = ? WHERE id = ? AND next_run = ?",
+                              (now + job['interval_min'] * 60, job['id'], job['next_run']))
+            return cur.rowcount == 1
+
+    def run_now(self, owner, job_id):
+        with self._conn() as con:
+            con.execute("UPDATE jobs SET next_run = ? WHERE id = ? AND owner = ?", (int(time.time()), job_id, owner))
+
+    def finish(self, job_id, count, error=None, watermark=None, backfill=None, ts=None):
+        """
+        실행 결과 기록. 실패하면 watermark / 밀린 구간은 그대로 둔다.
+        성공하면 watermark 를 옮기거나, backfill=(publishedBefore, 다 찾은 뒤의 watermark) 로 밀린 구간을 이어간다.
+        """
+        ts = int(ts or time.time())
+        with self._conn() as con:
+            if error:
+                con.execute("UPDATE jobs SET last_run = ?, last_count = ?, last_error = ? WHERE id = ?", (ts, count, error, job_id))
+                return
+            before, target = backfill or (None, None)
+            con.execute("""UPDATE jobs SET last_run = ?, last_count = ?, last_error = NULL, watermark = COALESCE(?, watermark),
+                                           backfill_before = ?, backfill_watermark = ? WHERE id = ?""",
+                        (ts, count, watermark, before, target, job_id))
+
+    # --- 본 영상 / 알림 ---
+    def mark_seen(self, job_id, video_ids):
+        """처음 본 영상 ID 만 돌려준다"""
+        new = []
+        with self._conn() as con:
+            for vid in video_ids:
+                if con.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (job_id, vid)).rowcount: new.append(vid)
+        return new
+
+    def add_alerts(self, job_id, rows, ts=None):
+        """알림 추가 (이미 알린 영상은 무시) -> 새로 추가된 행"""
+        ts = int(ts or time.time())
+        added = []
+        with self._conn() as con:
+            for r in rows:
+                cur = con.execute("INSERT OR IGNORE INTO alerts (job_id, video_id, ts, row) VALUES (?, ?, ?, ?)",
+                                  (job_id, r['video_id'], ts, json.dumps(r, ensure_ascii=False)))
+                if cur.rowcount: added.append(r)
+        return added
+
+    def alerts(self, owner, limit=20):
+        """owner 의 알림 피드 최신순 -> [{'ts', 'keyword', 'is_read', 'row'}]"""
+        with self._conn() as con:
+            return [{'ts': ts, 'keyword': kw, 'is_read': bool(rd), 'row': json.loads(row)} for ts, kw, rd, row in con.execute(
+                """SELECT a.ts, j.keyword, a.is_read, a.row FROM alerts a JOIN jobs j ON j.id = a.job_id
+                   WHERE j.owner = ? ORDER BY a.ts DESC, a.video_id LIMIT ?""", (owner, limit))]
+
+    def unread_count(self, owner):
+        with self._conn() as con:
+            return con.execute("""SELECT COUNT(*) FROM alerts a JOIN jobs j ON j.id = a.job_id
+                                  WHERE j.owner = ? AND a.is_read = 0""", (owner,)).fetchone()[0]
+
+    def mark_all_read(self, owner):
+        with self._conn() as con:
+            con.execute("""UPDATE alerts SET is_read = 1
+                           WHERE is_read = 0 AND job_id IN (SELECT id FROM jobs WHERE owner = ?)""", (owner,))
+
+
+def run_job(api_key, store, job, backend="google", baseline_uploads=BASELINE_UPLOADS, now=None):
+    """
+    작업 1회 실행 (api_key = 작업 owner 의 키) -> {'rows': 이번 검색 결과, 'new': 처음 본 행, 'alerts': 새 알림 행, 'errors': [...]}
+    검색 조건은 화면의 다중 키워드 채굴과 같은 경로(mine_keywords). 일부 실패 시 watermark 는 그대로 둔다.
+    첫 실행은 화면 검색과 같은 관련도순, 이후(증분)는 최신순으로 찾는다. 증분 실행이 limit_count 에서 끊기면
+    watermark 는 그대로 두고 가장 오래된 후보의 게시 시각을 publishedBefore 로 남겨 다음 실행에서 그 앞을 이어 찾는다.
+    """
+    now = now or datetime.now(timezone.utc)
+    incremental = job['last_run'] is not None and job['watermark'] is not None
+    errors = []
+    search_info = {}
+    rows = mine_keywords(api_key, [job['keyword']], job['limit_count'], p_after=job['watermark'], p_before=job['backfill_before'],
+                         duration_mode=job['duration'], min_view=job['min_view'], min_sub=job['min_sub'], backend=backend,
+                         baseline_uploads=baseline_uploads, errors=errors, order="date" if incremental else "relevance",
+                         search_info=search_info)
+    new_ids = set(store.mark_seen(job['id'], [r['video_id'] for r in rows]))
+    alerts = store.add_alerts(job['id'], [r for r in rows if r.get('breakout_grade') in ALERT_GRADES])
+    info = search_info.get(job['keyword'], {})
+    target = job['backfill_watermark'] or (now - WATERMARK_OVERLAP).strftime(_RFC3339)
+    watermark, backfill = target, None
+    if incremental and info.get('more') and info.get('oldest'):
+        # publishedBefore 는 그 시각도 포함 -> 경계의 영상은 다시 받고 seen 으로 거른다 (같은 시각이면 1초 앞으로)
+        before = info['oldest']
+        if before == job['backfill_before']:
+            before = (datetime.fromisoformat(before.replace('Z', '+00:00')) - timedelta(seconds=1)).strftime(_RFC3339)
+        watermark, backfill = None, (before, target)
+    store.finish(job['id'], len(new_ids), errors[0] if errors else None, watermark, backfill)
+    return {'rows': rows, 'new': [r for r in rows if r['video_id'] in new_ids], 'alerts': alerts, 'errors': errors}
+
+
+class KeywordScheduler:
+    """
+    tick_sec 마다 실행 시각이 된 작업을 선점해서 작업마다 owner 의 키로 실행 (SnapshotCollector 와 같은 백그라운드 스레드 구조)
+    on_result(job, result): 실행 후 콜백 (검색 기록 추가 등, 스레드 안에서 호출됨)
+    """
+    def __init__(self, store, tick_sec=60, backend="google", on_result=None):
+        self.store = store
+        self.tick_sec = tick_sec
+        self.backend = backend
+        self.on_result = on_result
+        self.last_run = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="keyword-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.tick_sec):
+            self.run_due()
+
+    def run_due(self, owner=None):
+        """실행 시각이 된 작업 실행 (owner 를 주면 그 사용자 것만) -> 실행한 작업 수"""
+        ran = 0
+        for job in self.store.due_jobs(owner=owner):
+            if not self.store.claim(job): continue
+            try:
+                result = run_job(job['api_key'], self.store, job, self.backend)
+                if self.on_result: self.on_result(job, result)
+                self.last_error = result['errors'][0] if result['errors'] else None
+            except Exception as e:
+                self.store.finish(job['id'], 0, str(e))
+                self.last_error = str(e)
+            ran += 1
+        if ran: self.last_run = time.time()
+        return ran
@@ -0,0 +1,152 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 대본/댓글 미리 받기 (검색 직후 떡상지표 상위 영상)
+# 검색 후에는 거의 항상 상위 몇 개의 대본/댓글을 열어 보므로, 쉬는 동안 캐시를 미리 채운다.
+#   - 검색이 끝나면 상위 N개의 (대본, 댓글) 작업을 큐에 넣고, 백그라운드 스레드 1개가 PREFETCH_IDLE_SEC 뒤부터 하나씩 처리
+#   - 이미 캐시에 있으면 건너뛰고, API 단위가 드는 작업은 검색 1회당 예산(unit_budget) 안에서만 실행
+#   - 속도 제한에 걸리면(rate_limited) 뒤로 미뤄서 다시 시도 (사용자 요청이 먼저)
+#   - 같은 세션(owner)에서 새 검색이 시작되면 남은 작업은 취소 (세대 번호)
+# 모달이 열릴 때 'prefetched'(미리 받아 둔 것) / 'cached'(다른 경로로 캐시됨) / 'miss' 를 집계해 적중률을 본다.
+# ============================================================================
+
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+from telemetry import METRICS, LATENCY_BUCKETS
+
+PREFETCH_TOP_N = 5
+PREFETCH_UNIT_BUDGET = 50     # 검색 1회당 댓글 미리 받기에 쓸 API 단위 (commentThreads 페이지당 1 unit)
+PREFETCH_IDLE_SEC = 3.0       # 검색 직후 화면 그리기/첫 클릭과 겹치지 않게 잠시 쉬었다가 시작
+RETRY_SEC = 15.0
+MAX_TRIES = 20                # rate_limited 재시도 (대본은 간격 제한 때문에 여러 번 밀릴 수 있음)
+WARMED_MAX = 5000             # 적중 판정용으로 기억하는 미리 받은 (종류, 영상) 수
+
+
+class Prefetcher:
+    """
+    handlers = {kind: (is_cached(video_id, ctx) -> bool, fetch(video_id, ctx) -> 상태)}
+    fetch 상태: 'done' (캐시 저장) / 'empty' (받을 내용 없음) / 'failed' / 'rate_limited' (나중에 다시)
+    작업 ctx 의 'units' = 예상 API 단위 (예산 차감, rate_limited 면 환불)
+    """
+    def __init__(self, handlers, idle_sec=PREFETCH_IDLE_SEC, retry_sec=RETRY_SEC, max_tries=MAX_TRIES):
+        self.handlers = handlers
+        self.idle_sec = idle_sec
+        self.retry_sec = retry_sec
+        self.max_tries = max_tries
+        self.last_error = None
+        self._cv = threading.Condition()
+        self._queue = deque()
+        self._gen = {}                  # owner -> 현재 세대 (새 검색/취소마다 +1)
+        self._warmed = OrderedDict()    # (kind, video_id) -> 미리 받은 시각
+        self._jobs = Counter()          # (kind, 결과)
+        self._opens = Counter()         # (kind, prefetched/cached/miss)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._cv: self._cv.notify_all()
+
+    # --- 작업 등록 / 취소 ---
+    def submit(self, owner, jobs, unit_budget=PREFETCH_UNIT_BUDGET):
+        """jobs = [(kind, video_id, ctx)] 순서대로 처리. 같은 owner 의 남은 작업은 먼저 취소 -> 세대 번호"""
+        self.cancel(owner)
+        with self._cv:
+            gen = self._gen[owner]
+            budget = {'units': unit_budget}    # 이번 검색의 작업들이 함께 쓰는 예산
+            start = time.time() + self.idle_sec
+            for kind, video_id, ctx in jobs:
+                self._queue.append({'owner': owner, 'gen': gen, 'kind': kind, 'video_id': video_id, 'ctx': ctx,
+                                    'budget': budget, 'not_before': start, 'tries': 0})
+            self._cv.notify()
+        return gen
+
+    def cancel(self, owner):
+        """owner 의 대기 작업 취소 (이미 실행 중인 1건은 끝까지 돌고 결과는 캐시에 남는다) -> 취소한 수"""
+        with self._cv:
+            self._gen[owner] = self._gen.get(owner, 0) + 1
+            dropped = [j for j in self._queue if j['owner'] == owner]
+            if dropped: self._queue = deque(j for j in self._queue if j['owner'] != owner)
+        for j in dropped: self._count(j['kind'], 'cancelled')
+        return len(dropped)
+
+    # --- 처리 ---
+    def _loop(self):
+        while not self._stop.is_set():
+            job = self._next()
+            if job: self._run(job)
+
+    def _next(self):
+        with self._cv:
+            while not self._stop.is_set():
+                now = time.time()
+                job = next((j for j in self._queue if j['not_before'] <= now), None)
+                if job:
+                    self._queue.remove(job)
+                    return job
+                wake = min((j['not_before'] for j in self._queue), default=now + 60)
+                self._cv.wait(max(0.05, wake - now))
+        return None
+
+    def _run(self, job):
+        kind, video_id, ctx = job['kind'], job['video_id'], job['ctx']
+        if self._gen.get(job['owner']) != job['gen']: return self._count(kind, 'cancelled')
+        is_cached, fetch = self.handlers[kind]
+        try:
+            if is_cached(video_id, ctx): return self._count(kind, 'cached')
+        except Exception as e:
+            self.last_error = str(e)
+            return self._count(kind, 'failed')
+        cost = ctx.get('units', 0)
+        with self._cv:
+            if cost > job['budget']['units']: return self._count(kind, 'budget')
+            job['budget']['units'] -= cost
+        t0 = time.perf_counter()
+        try:
+            status = fetch(video_id, ctx)
+        except Exception as e:
+            status, self.last_error = 'failed', str(e)
+        if status == 'rate_limited':
+            with self._cv:
+                job['budget']['units'] += cost
+                job['tries'] += 1
+                if job['tries'] < self.max_tries and self._gen.get(job['owner']) == job['gen']:
+                    job['not_before'] = time.time() + self.retry_sec
+                    self._queue.append(job)
+                    self._cv.notify()
+                    return
+        METRICS.observe('prefetch_fetch_seconds', time.perf_counter() - t0, LATENCY_BUCKETS, kind=kind)
+        if status == 'done':
+            with self._cv:
+                self._warmed[(kind, video_id)] = time.time()
+                while len(self._warmed) > WARMED_MAX: self._warmed.popitem(last=False)
+        self._count(kind, status)
+
+    def _count(self, kind, outcome):
+        with self._cv: self._jobs[(kind, outcome)] += 1
+        METRICS.inc('prefetch_jobs_total', kind=kind, outcome=outcome)
+
+    # --- 적중률 ---
+    def record_open(self, kind, video_id, cached):
+        """모달이 열릴 때 호출 -> 'prefetched' / 'cached' / 'miss'"""
+        with self._cv:
+            outcome = 'miss' if not cached else 'prefetched' if (kind, video_id) in self._warmed else 'cached'
+            self._opens[(kind, outcome)] += 1
+        METRICS.inc('prefetch_modal_opens_total', kind=kind, outcome=outcome)
+        return outcome
+
+    def stats(self):
+        """관리자 화면용: 대기 작업 수, 작업 결과별 수, 모달 적중(즉시 열림) 비율"""
+        with self._cv:
+            jobs, opens, queued = dict(self._jobs), dict(self._opens), len(self._queue)
+        total = sum(opens.values())
+        hits = sum(v for (_, o), v in opens.items() if o != 'miss')
+        warm = sum(v for (_, o), v in opens.items() if o == 'prefetched')
+        return {'queued': queued, 'jobs': jobs, 'opens': total,
+                'hit_rate': hits / total if total else 0.0, 'prefetch_hit_rate': warm / total if total else 0.0}
@@ -0,0 +1,250 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - API 응답 캐시
+# ETag 조건부 요청 (If-None-Match -> 304 이면 저장된 본문 재사용)
+# 채널 기준선 TTL 캐시 / 검색 결과 디스크 캐시 / 동시 동일 검색 합치기(single-flight)
+# ============================================================================
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+from googleapiclient.errors import HttpError
+
+from telemetry import METRICS, LATENCY_BUCKETS
+
+
+def request_key(endpoint, params):
+    """엔드포인트 + 정렬된 파라미터 -> 캐시 키 (API 키는 제외)"""
+    clean = {k: v for k, v in params.items() if v is not None and k != 'key'}
+    return f"{endpoint}?{json.dumps(clean, sort_keys=True, ensure_ascii=False)}"
+
+
+class EtagCache:
+    """ETag + 응답 본문 저장 (LRU, 스레드 안전)"""
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'miss': 0, 'not_modified': 0, 'changed': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None: self._data.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._data[key] = {'etag': etag, 'body': body}
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def count(self, name):
+        with self._lock: self.stats[name] += 1
+
+    def execute(self, endpoint, resource, **params):
+        """
+        resource.list(**params) 를 조건부로 실행.
+        저장된 ETag 가 있으면 If-None-Match 를 붙이고, 304 면 저장된 본문을 그대로 돌려준다.
+        (googleapiclient / youtube_async 둘 다 304 를 HttpError 로 올려준다)
+        """
+        key = request_key(endpoint, params)
+        entry = self.get(key)
+        request = resource.list(**params)
+        if entry: request.headers['If-None-Match'] = entry['etag']
+        try:
+            body = request.execute()
+        except HttpError as e:
+            if entry and e.resp.status == 304:
+                self.count('not_modified')
+                return entry['body']
+            raise
+        self.count('changed' if entry else 'miss')
+        if body.get('etag'): self.put(key, body['etag'], body)
+        return body
+
+
+class TTLCache:
+    """유효기간(초)이 있는 단순 키-값 캐시 (스레드 안전)"""
+    def __init__(self, ttl=6*3600, max_entries=20000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None: return None
+            if time.time() - entry[0] > self.ttl:
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+# === 검색 결과 디스크 캐시 ===
+def normalize_keyword(keyword):
+    """NFC 정규화 + 앞뒤 공백 제거 + 연속 공백 1칸 + 대소문자 무시"""
+    return " ".join(unicodedata.normalize('NFC', keyword or "").split()).casefold()
+
+def search_cache_key(keywords, limit_count, p_after, p_before, duration_mode, min_view, min_sub, **extra):
+    """
+    검색 조건 -> 캐시 키 (API 키 제외).
+    - 키워드: normalize_keyword, 다중 키워드는 정렬
+    - 기간: 날짜 단위로 반올림 (같은 날 안의 '최근 7일' 검색은 같은 키)
+    """
+    if isinstance(keywords, str): keywords = [keywords]
+    norm = {
+        'keywords': sorted({normalize_keyword(k) for k in keywords if normalize_keyword(k)}),
+        'limit': int(limit_count),
+        'after': (p_after or "")[:10],
+        'before': (p_before or "")[:10],
+        'duration': duration_mode,
+        'min_view': int(min_view or 0),
+        'min_sub': int(min_sub or 0),
+        **extra,
+    }
+    return hashlib.sha1(json.dumps(norm, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SearchCache:
+    """
+    검색 결과 캐시 (SQLite 파일, 여러 프로세스/레플리카가 같은 파일 공유)
+    - ttl_sec 지난 항목은 무시 + 정리
+    - 전체 크기가 max_bytes 를 넘으면 오래 안 쓴 것부터 삭제 (LRU)
+    - 결과는 zlib 압축 JSON 으로 저장
+    """
+    def __init__(self, path='search_cache.db', ttl_sec=6*3600, max_bytes=200*1024*1024):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        with self._conn() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY, created REAL NOT NULL, last_access REAL NOT NULL,
+                size INTEGER NOT NULL, payload BLOB NOT NULL)""")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)")
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def get(self, key):
+        now = time.time()
+        with self._conn() as con:
+            row = con.execute("SELECT created, payload FROM search_cache WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            if now - row[0] > self.ttl_sec:
+                con.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                return None
+            con.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[1]))
+
+    def put(self, key, results):
+        payload = zlib.compress(json.dumps(results, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)", (key, now, now, len(payload), payload))
+            con.execute("DELETE FROM search_cache WHERE created < ?", (now - self.ttl_sec,))
+            total = con.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+            if total > self.max_bytes:
+                for k, size in con.execute("SELECT key, size FROM search_cache ORDER BY last_access").fetchall():
+                    if total <= self.max_bytes: break
+                    con.execute("DELETE FROM search_cache WHERE key = ?", (k,))
+                    total -= size
+
+    def stats(self):
+        with self._conn() as con:
+            n, total = con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache").fetchone()
+        return {'entries': n, 'bytes': total}
+
+
+# === 동시 동일 요청 합치기 ===
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'abandoned', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 실행을 1건으로 합친다 (프로세스 공용, 스레드 = 세션).
+    먼저 온 호출(leader)만 fn() 을 실행하고, 그 사이 들어온 같은 키 호출은 끝날 때까지 기다렸다가
+    같은 결과(또는 같은 Exception)를 받는다. 끝난 결과는 들고 있지 않는다 (보관은 SearchCache 몫).
+    leader 가 BaseException(Streamlit Stop/Rerun 등 그 세션만의 제어 예외)으로 끝나면 leader 에서만 올리고,
+    기다리던 호출들은 깨어나서 다시 경쟁 -> 그중 하나가 새 leader 가 된다.
+    지표: singleflight_calls_total{group, role=leader|coalesced}, singleflight_wait_seconds{group}
+    coalesced 는 stats() 와 지표 모두 leader 의 결과(또는 Exception)를 실제로 받은 호출만 센다.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, fn):
+        """-> (결과, 다른 호출의 결과를 받았으면 True)"""
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.leaders += 1
+                else:
+                    flight.waiters += 1
+            if leader:
+                METRICS.inc('singleflight_calls_total', group=self.name, role='leader')
+                break
+            t0 = time.perf_counter()
+            flight.done.wait()
+            METRICS.observe('singleflight_wait_seconds', time.perf_counter() - t0, LATENCY_BUCKETS, group=self.name)
+            if flight.abandoned: continue   # leader 세션이 중단됨 -> 받은 것이 없으니 합류로 세지 않고 다시 경쟁
+            with self._lock: self.coalesced += 1
+            METRICS.inc('singleflight_calls_total', group=self.name, role='coalesced')
+            if flight.error is not None: raise flight.error
+            return flight.result, True
+        try:
+            flight.result = fn()
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.abandoned = True   # 다른 세션에 넘기면 그 세션이 엉뚱하게 멈추거나 리런된다
+            raise
+        finally:
+            with self._lock: self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self):
+        with self._lock:
+            return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._flights)}
+
+
+# 프로세스 공용 캐시
+ETAG_CACHE = EtagCache()               # videos.list / channels.list
+BASELINE_CACHE = TTLCache(ttl=6*3600)  # 채널별 최근 업로드 중앙값 조회수
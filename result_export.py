@@ -0,0 +1,120 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 결과 내보내기 (CSV / Parquet / XLSX)
+#   - 세 형식 모두 같은 컬럼 구성(EXPORT_COLS, 사용자가 보기 편한 순서)
+#     CSV     : utf-8-sig (엑셀에서 한글이 깨지지 않게 BOM)
+#     Parquet : 원래 타입 그대로 (pandas / DuckDB 등 분석 도구용)
+#     XLSX    : url 은 클릭되는 링크 (=HYPERLINK 수식 -> 시트당 하이퍼링크 65,530개 제한을 받지 않음)
+#   - CHUNK_ROWS 행씩 나눠서 만든다 (검색 기록 전체처럼 큰 세트도 거대한 중간 문자열/객체를 한 번에 만들지 않게)
+#   - 한글 NFC 정규화는 내보낼 때가 아니라 수집할 때 한 번 (build_result_row, compact_results)
+# 화면에서는 st.download_button(data=콜백) 으로 넘겨서 버튼을 눌렀을 때만 만든다 (매 리런마다 만들지 않음).
+# ============================================================================
+
+import codecs
+import io
+
+from result_schema import with_derived_columns
+
+CHUNK_ROWS = 20_000
+EXPORT_COLS = ('thumbnail', 'title', 'url', 'view_count', 'published_at', 'view_sub_ratio', 'performance', 'duration_sec',
+               'view_diff', 'subscriber_count', 'comment_count', 'is_shorts', 'channel', 'video_id', 'keywords')
+LINK_COLS = ('url',)   # 수식 셀은 일반 셀보다 몇 배 느려서 영상 링크만
+
+
+def export_frame(df):
+    """내보낼 프레임: url/thumbnail/is_shorts 생성 + EXPORT_COLS 순서 (없는 컬럼은 건너뜀)"""
+    df = with_derived_columns(df)
+    return df[[c for c in EXPORT_COLS if c in df.columns]]
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def to_csv(df, chunk_rows=CHUNK_ROWS):
+    buf = io.BytesIO()
+    buf.write(codecs.BOM_UTF8)
+    buf.write(df.head(0).to_csv(index=False).encode('utf-8'))
+    for chunk in _chunks(df, chunk_rows):
+        buf.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+    return buf.getvalue()
+
+
+def to_parquet(df, chunk_rows=CHUNK_ROWS):
+    """청크 = row group. 스키마는 첫 청크 기준 (categorical 은 사전 인코딩 그대로)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    buf = io.BytesIO()
+    writer = None
+    for chunk in _chunks(df, chunk_rows):
+        if writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(buf, table.schema, compression='zstd')
+        else:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+        writer.write_table(table)
+    if writer is None: pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buf)
+    else: writer.close()
+    return buf.getvalue()
+
+
+def _link_formula(url):
+    return '=HYPERLINK("' + url.replace('"', '""') + '")'
+
+
+def to_xlsx(df, chunk_rows=CHUNK_ROWS):
+    """
+    constant_memory: 행을 쓰는 즉시 임시 파일로 내보내서 메모리는 한 행 분량만.
+    제목이 '=' 로 시작해도 수식이 되지 않게 문자열은 write_string 으로 직접 쓴다.
+    """
+    import xlsxwriter
+    buf = io.BytesIO()
+    wb = xlsxwriter.Workbook(buf, {'constant_memory': True})
+    ws = wb.add_worksheet("results")
+    bold = wb.add_format({'bold': True})
+    link = wb.add_format({'font_color': 'blue', 'underline': 1})
+    cols = list(df.columns)
+    ws.write_row(0, 0, cols, bold)
+    ws.freeze_panes(1, 0)
+    for j, c in enumerate(cols):
+        ws.set_column(j, j, 48 if c in ('title', 'thumbnail') else 36 if c in LINK_COLS else 14)
+    links = {j for j, c in enumerate(cols) if c in LINK_COLS}
+    r = 1
+    for chunk in _chunks(df, chunk_rows):
+        # numpy 타입 -> 파이썬 기본 타입, 결측 -> None (빈 칸)
+        for row in chunk.astype(object).where(chunk.notna(), None).to_numpy().tolist():
+            for j, v in enumerate(row):
+                if v is None: continue
+                if j in links: ws.write_formula(r, j, _link_formula(str(v)), link, str(v))
+                elif isinstance(v, bool): ws.write_boolean(r, j, v)
+                elif isinstance(v, (int, float)): ws.write_number(r, j, v)
+                else: ws.write_string(r, j, str(v))
+            r += 1
+    wb.close()
+    return buf.getvalue()
+
+
+# 형식 -> (확장자, MIME, 변환 함수)
+FORMATS = {
+    'CSV': ('csv', 'text/csv', to_csv),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', to_parquet),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', to_xlsx),
+}
+
+
+def available_formats():
+    """설치된 라이브러리로 만들 수 있는 형식만 (xlsxwriter 가 없으면 XLSX 제외)"""
+    try:
+        import xlsxwriter  # noqa: F401
+        return list(FORMATS)
+    except ImportError:
+        return [f for f in FORMATS if f != 'XLSX']
+
+
+def export_bytes(df, fmt):
+    """결과 프레임(압축 스키마) -> 내보낼 파일 바이트"""
+    return FORMATS[fmt][2](export_frame(df))
+
+
+def export_file_name(stem, fmt):
+    return f"{stem}.{FORMATS[fmt][0]}"
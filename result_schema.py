@@ -0,0 +1,99 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 검색 결과 DataFrame 압축 스키마
+# 세션/기록/캐시에 쌓이는 결과 세트가 많아져서 행당 메모리를 줄인다.
+#   - url / thumbnail / is_shorts 는 저장하지 않고 화면에 그릴 때 video_id, duration_sec 로 만든다
+#   - 성과지표 / 떡상등급은 순서 있는 categorical (정렬도 등급 순서대로)
+#   - 개수 컬럼은 가장 작은 정수형, 비율은 float32, 반복되는 채널/키워드 문자열은 categorical
+#   - 제목/채널 한글은 여기서 NFC 정규화 (수집 시점 1번 -> 내보내기에서는 다시 하지 않음)
+# 리스트 뷰(st.data_editor)에는 보이는 컬럼 + 행 키만 잘라서 보낸다 (숨긴 컬럼도 Arrow 로 직렬화되어 매 리런 전송되므로)
+# ============================================================================
+
+import json
+
+import pandas as pd
+
+from youtube_core import SHORTS_LIMIT_SEC
+
+DERIVED_COLS = ('url', 'thumbnail', 'is_shorts')
+PERFORMANCE_LEVELS = ["-", "👍 양호", "🔥 떡상", "🔥🔥 초대박"]
+BREAKOUT_LEVELS = ["", "👌 양호", "🔥 떡상", "🚀 초대박", "💎 전설"]
+INT_COLS = ('view_count', 'subscriber_count', 'comment_count', 'duration_sec', 'view_diff', 'view_delta', 'baseline_views')
+FLOAT_COLS = ('view_sub_ratio', 'outlier_score', 'growth_rate')
+CATEGORY_COLS = ('channel_id', 'channel', 'keywords')
+LIST_FIXED_COLS = ("selected", "thumbnail", "url", "title")
+LIST_DEFAULT_COLS = ("view_count", "subscriber_count", "performance", "breakout_grade", "view_sub_ratio")
+ROW_KEY = "_original_index"   # 화면 행 -> search_results 행 (data_editor 변경 반영용)
+
+
+def compact_results(df):
+    """결과 DataFrame -> 압축 스키마 (이미 압축된 프레임/옛 저장 데이터 모두 OK)"""
+    if df.empty: return df
+    df = df.drop(columns=[c for c in DERIVED_COLS if c in df.columns])
+    for col, levels in (('performance', PERFORMANCE_LEVELS), ('breakout_grade', BREAKOUT_LEVELS)):
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col].astype(str).where(df[col].notna(), levels[0]), categories=levels, ordered=True)
+    for col in INT_COLS:
+        if col in df.columns:
+            # view_diff / baseline_views 는 평균·중앙값이라 소수 -> 조회수 단위로 반올림
+            df[col] = pd.to_numeric(pd.to_numeric(df[col], errors='coerce').fillna(0).round(), downcast='integer')
+    for col in FLOAT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    for col in ('title', 'channel'):
+        # 이미 압축된 채널(categorical)은 정규화가 끝난 것
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].str.normalize('NFC')
+    for col in CATEGORY_COLS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if 'selected' in df.columns: df['selected'] = df['selected'].fillna(False).astype(bool)
+    return df
+
+
+def with_derived_columns(df):
+    """화면/내보내기 직전에 url, thumbnail(mqdefault = API medium 썸네일), is_shorts 를 붙인다"""
+    if df.empty: return df
+    df = df.copy()
+    vid = df['video_id'].astype(str)
+    df['url'] = "https://youtube.com/watch?v=" + vid
+    df['thumbnail'] = "https://i.ytimg.com/vi/" + vid + "/mqdefault.jpg"
+    df['is_shorts'] = df['duration_sec'] <= SHORTS_LIMIT_SEC
+    return df
+
+
+def project_columns(df, cols):
+    """리스트 뷰로 보낼 프레임: cols(순서 유지) + 행 키만. 없는 컬럼은 건너뜀"""
+    keep = [c for c in dict.fromkeys([*cols, ROW_KEY]) if c in df.columns]
+    return df[keep]
+
+
+def arrow_payload_bytes(df):
+    """브라우저로 보내는 크기 추정: Streamlit 과 같은 Arrow IPC 스트림으로 직렬화한 바이트 수"""
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def bytes_per_row(df):
+    return df.memory_usage(deep=True, index=True).sum() / len(df) if len(df) else 0.0
+
+
+def measure_result_sets(result_sets):
+    """
+    [(이름, 행 목록 또는 DataFrame)] -> 세트별 행당 바이트 (이전 스키마 vs 압축 스키마)
+    이전 스키마 = 저장된 행을 그대로 DataFrame 으로 + url/thumbnail/is_shorts 포함
+    """
+    out = []
+    for name, rows in result_sets:
+        if isinstance(rows, pd.DataFrame): rows = json.loads(rows.to_json(orient='records', force_ascii=False))
+        raw = pd.DataFrame(rows)
+        if raw.empty: continue
+        before = with_derived_columns(raw)
+        after = compact_results(raw)
+        b, a = bytes_per_row(before), bytes_per_row(after)
+        out.append({'set': name, 'rows': len(raw), 'before_bpr': round(b), 'after_bpr': round(a),
+                    'saving_pct': round((1 - a / b) * 100, 1) if b else 0.0})
+    return out
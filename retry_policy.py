@@ -0,0 +1,159 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 일시 오류 재시도 정책 + 엔드포인트별 서킷 브레이커
+#   - 재시도 대상: 5xx, 429, 403 rateLimitExceeded/userRateLimitExceeded, 연결/타임아웃 오류
+#     (quotaExceeded 는 하루가 지나야 풀리므로 재시도하지 않음)
+#   - 대기 시간: 지수 백오프 + full jitter, Retry-After 헤더가 있으면 그 값을 우선
+#   - 서킷 브레이커: 엔드포인트별 연속 실패가 쌓이면 잠시 호출 자체를 막고(open),
+#     reset_timeout 뒤 1건만 시험(half_open)해서 성공하면 다시 연다(closed)
+#     시험 호출이 결과 없이 끝나면(Stop/Rerun 등 BaseException) open 으로 되돌려 다음 호출이 다시 시험하고,
+#     시험 호출이 reset_timeout 이 지나도록 끝나지 않으면 다른 호출 1건에 시험을 다시 맡긴다
+#     속도 제한(429, 403 rateLimitExceeded/userRateLimitExceeded)은 재시도만 하고 실패로 세지 않는다
+#     (브레이커는 프로세스 공용이라 한 사용자의 한도 초과가 다른 사용자 호출까지 막으면 안 됨)
+# ============================================================================
+
+import random
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from telemetry import METRICS
+
+try:
+    import httpx
+    _TRANSPORT_ERRORS = (OSError, httplib2.HttpLib2Error, httpx.TransportError)
+except ImportError:
+    _TRANSPORT_ERRORS = (OSError, httplib2.HttpLib2Error)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"{endpoint} 일시 차단 중 (연속 실패, {retry_in:.0f}초 후 재시도)")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def is_rate_limited(exc):
+    """API 키(사용자)별 속도 제한 -> 서버는 정상"""
+    if not isinstance(exc, HttpError): return False
+    status = exc.resp.status
+    return status == 429 or (status == 403 and any(r in (exc.content or b'') for r in RATE_LIMIT_REASONS))
+
+
+def is_transient(exc):
+    """다시 시도하면 성공할 수 있는 오류인가"""
+    if isinstance(exc, HttpError):
+        return exc.resp.status in RETRY_STATUSES or is_rate_limited(exc)
+    return isinstance(exc, _TRANSPORT_ERRORS)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=8.0, sleep=time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+
+    def delay(self, attempt, exc=None):
+        """attempt(0부터) 번째 실패 후 대기 시간(초)"""
+        if isinstance(exc, HttpError):
+            retry_after = exc.resp.get('retry-after')
+            if retry_after and str(retry_after).isdigit(): return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    def __init__(self, endpoint, failure_threshold=5, reset_timeout=30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def _set(self, state):
+        if state != self.state:
+            self.state = state
+            METRICS.inc('circuit_transitions_total', endpoint=self.endpoint, state=state)
+
+    def before_call(self):
+        """호출 허용 여부 확인 (막혀 있으면 CircuitOpenError) -> 이 호출이 half_open 시험 호출이면 True"""
+        with self._lock:
+            if self.state == 'closed': return False
+            now = time.time()
+            since = now - (self.opened_at if self.state == 'open' else self.trial_at)
+            if since < self.reset_timeout: raise CircuitOpenError(self.endpoint, self.reset_timeout - since)
+            self._set('half_open')   # 이 호출 1건만 시험 (half_open 이었으면 멈춘 시험 호출 대신)
+            self.trial_at = now
+            return True
+
+    def abandon_trial(self):
+        """시험 호출이 성공/실패 없이 끝남 -> open 으로 (opened_at 은 그대로라 다음 호출이 바로 시험)"""
+        with self._lock:
+            if self.state == 'half_open': self._set('open')
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._set('closed')
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                self._set('open')
+
+    def snapshot(self):
+        with self._lock:
+            return {'endpoint': self.endpoint, 'state': self.state, 'failures': self.failures}
+
+
+DEFAULT_POLICY = RetryPolicy()
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(endpoint):
+    """엔드포인트별 브레이커 (프로세스 공용)"""
+    with _breakers_lock:
+        if endpoint not in _breakers: _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+def breaker_states():
+    with _breakers_lock:
+        return [b.snapshot() for b in _breakers.values()]
+
+
+def call_with_retry(fn, endpoint, policy=DEFAULT_POLICY, on_attempt=None):
+    """
+    fn() 을 정책에 따라 실행 -> 결과.
+    일시 오류만 재시도하고 서킷 실패로 센다 (속도 제한은 재시도만). 그 밖의 오류(304, 400, 404, quotaExceeded 등)는 바로 올린다.
+    on_attempt() 는 실제로 요청을 보낼 때마다 호출 (할당량 집계용).
+    """
+    breaker = breaker_for(endpoint)
+    for attempt in range(policy.max_attempts):
+        trial = breaker.before_call()
+        try:
+            if on_attempt: on_attempt()
+            result = fn()
+        except Exception as e:
+            if not is_transient(e):
+                breaker.record_success()   # 서버는 정상 응답 (304/4xx)
+                raise
+            if is_rate_limited(e): breaker.record_success()   # 서버는 정상, 이 키만 제한
+            else: breaker.record_failure()
+            if attempt + 1 >= policy.max_attempts: raise
+            policy.sleep(policy.delay(attempt, e))
+            continue
+        except BaseException:
+            if trial: breaker.abandon_trial()   # Stop/Rerun 등: 시험 결과를 모른 채 끝남 -> half_open 에 묶이지 않게
+            raise
+        breaker.record_success()
+        return result
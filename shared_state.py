@@ -0,0 +1,158 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 공유 상태 저장소 (여러 Streamlit 프로세스/레플리카용)
+# RateLimiter, 사용량 카운터, 스크립트/댓글 캐시, 검색 기록이 같은 저장소를 쓴다.
+#   - sqlite:///shared_state.db  : 한 서버 안의 여러 프로세스 (WAL 모드)
+#   - redis://host:6379/0        : 여러 서버 (Redis 프로토콜 호환 서버면 OK)
+# 값은 모두 JSON 으로 직렬화해서 저장한다.
+# ============================================================================
+
+import json
+import sqlite3
+import time
+
+DEFAULT_STATE_URL = "sqlite:///shared_state.db"
+
+
+class SqliteStateBackend:
+    """SQLite(WAL) 기반 키-값 + 리스트 저장소. 증가/선점은 단일 UPSERT 문이라 프로세스 간에도 원자적"""
+    def __init__(self, path="shared_state.db"):
+        self.path = path
+        with self._conn() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS lists (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value TEXT NOT NULL)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_lists_key ON lists(key, seq)")
+            con.execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    @staticmethod
+    def _expires(ttl):
+        return time.time() + ttl if ttl else None
+
+    def get(self, key):
+        with self._conn() as con:
+            row = con.execute("SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, json.dumps(value, ensure_ascii=False), self._expires(ttl)))
+
+    def delete(self, key):
+        with self._conn() as con:
+            con.execute("DELETE FROM kv WHERE key = ?", (key,))
+            con.execute("DELETE FROM lists WHERE key = ?", (key,))
+
+    def incr(self, key, amount=1, ttl=None):
+        """원자적 증가 -> 증가 후 값. ttl 은 키가 새로 생길 때만 적용 (Redis INCR+EXPIRE 와 동일)"""
+        now = time.time()
+        with self._conn() as con:
+            row = con.execute("""
+                INSERT INTO kv (key, value, expires) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value   = CASE WHEN kv.expires IS NOT NULL AND kv.expires <= ? THEN excluded.value
+                                   ELSE CAST(kv.value AS INTEGER) + excluded.value END,
+                    expires = CASE WHEN kv.expires IS NOT NULL AND kv.expires <= ? THEN excluded.expires
+                                   ELSE kv.expires END
+                RETURNING value""", (key, amount, self._expires(ttl), now, now)).fetchone()
+        return int(row[0])
+
+    def set_if_absent(self, key, value, ttl=None):
+        """키가 없을(또는 만료됐을) 때만 저장 -> 저장했으면 True (Redis SET NX)"""
+        now = time.time()
+        with self._conn() as con:
+            cur = con.execute("""
+                INSERT INTO kv (key, value, expires) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires
+                WHERE kv.expires IS NOT NULL AND kv.expires <= ?""",
+                (key, json.dumps(value, ensure_ascii=False), self._expires(ttl), now))
+            return cur.rowcount == 1
+
+    def ttl(self, key):
+        """남은 유효시간(초). 키가 없거나 만료 없음이면 None"""
+        with self._conn() as con:
+            row = con.execute("SELECT expires FROM kv WHERE key = ?", (key,)).fetchone()
+        if not row or row[0] is None: return None
+        return max(row[0] - time.time(), 0)
+
+    def keys(self, prefix):
+        with self._conn() as con:
+            rows = con.execute("SELECT key FROM kv WHERE key >= ? AND key < ? AND (expires IS NULL OR expires > ?)",
+                               (prefix, prefix + "\U0010ffff", time.time())).fetchall()
+        return [r[0] for r in rows]
+
+    def push(self, key, value, max_len=None):
+        """리스트 앞쪽(최신)에 추가, max_len 넘으면 오래된 것 삭제 (Redis LPUSH+LTRIM)"""
+        with self._conn() as con:
+            con.execute("INSERT INTO lists (key, value) VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+            if max_len:
+                con.execute("""DELETE FROM lists WHERE key = ? AND seq NOT IN
+                               (SELECT seq FROM lists WHERE key = ? ORDER BY seq DESC LIMIT ?)""", (key, key, max_len))
+
+    def list(self, key, limit=None):
+        """최신순"""
+        with self._conn() as con:
+            rows = con.execute("SELECT value FROM lists WHERE key = ? ORDER BY seq DESC LIMIT ?", (key, limit or -1)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+
+class RedisStateBackend:
+    """
+    Redis 프로토콜 저장소. client 에 redis-py 호환 객체(예: fakeredis.FakeRedis)를 넣으면
+    실제 서버 없이도 동작을 확인할 수 있다.
+    """
+    def __init__(self, url=None, client=None, prefix="miner:"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.r = client
+        self.prefix = prefix
+
+    def _k(self, key): return self.prefix + key
+
+    def get(self, key):
+        raw = self.r.get(self._k(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.r.set(self._k(key), json.dumps(value, ensure_ascii=False), px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key):
+        self.r.delete(self._k(key))
+
+    def incr(self, key, amount=1, ttl=None):
+        val = self.r.incrby(self._k(key), amount)
+        if ttl and val == amount: self.r.pexpire(self._k(key), int(ttl * 1000))
+        return int(val)
+
+    def set_if_absent(self, key, value, ttl=None):
+        return bool(self.r.set(self._k(key), json.dumps(value, ensure_ascii=False), nx=True, px=int(ttl * 1000) if ttl else None))
+
+    def ttl(self, key):
+        ms = self.r.pttl(self._k(key))
+        return ms / 1000 if ms is not None and ms >= 0 else None
+
+    def keys(self, prefix):
+        n = len(self.prefix)
+        return [k.decode()[n:] if isinstance(k, bytes) else k[n:] for k in self.r.scan_iter(match=self._k(prefix) + "*")]
+
+    def push(self, key, value, max_len=None):
+        pipe = self.r.pipeline()
+        pipe.lpush(self._k(key), json.dumps(value, ensure_ascii=False))
+        if max_len: pipe.ltrim(self._k(key), 0, max_len - 1)
+        pipe.execute()
+
+    def list(self, key, limit=None):
+        return [json.loads(v) for v in self.r.lrange(self._k(key), 0, (limit or 0) - 1)]
+
+
+def get_state_backend(url=DEFAULT_STATE_URL):
+    """STATE_BACKEND URL -> 저장소 객체"""
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisStateBackend(url)
+    if url.startswith("sqlite:///"):
+        return SqliteStateBackend(url[len("sqlite:///"):])
+    raise ValueError(f"지원하지 않는 STATE_BACKEND: {url}")
@@ -0,0 +1,102 @@
+# ============================================================================
+# [YouTube to Sheets] - 시트 업로드 핵심 로직 (Streamlit 비의존)
+# streamlit_app.upload_to_sheets 는 인증/시트 열기만 하고 여기로 넘긴다.
+# sheet 는 gspread Worksheet (get_all_values / append_row / append_rows) 호환 객체면 된다.
+# ============================================================================
+
+import json
+from datetime import datetime
+
+from telemetry import instrument
+
+DEFAULT_HEADERS = ['URL', 'title', 'category', 'subcategory', 'type', 'processed', 'processed_date', 'result_index']
+
+
+def _find_col(header_map, keys):
+    for key in keys:
+        if key in header_map: return header_map[key]
+    return -1
+
+
+def scan_existing(existing_data, header_map):
+    """기존 데이터 분석 (중복 체크용 URL 집합, 최대 인덱스)"""
+    url_idx = _find_col(header_map, ['url', 'link', '주소'])                  # URL 컬럼 (url, link, 주소 등)
+    index_idx = _find_col(header_map, ['result_index', 'index', '인덱스'])    # Index 컬럼 (result_index, index, 인덱스 등)
+    existing_urls = set()
+    max_index = 0
+    for row in existing_data[1:]:  # 헤더 제외
+        if not row: continue
+        # URL 수집
+        if url_idx != -1 and len(row) > url_idx:
+            existing_urls.add(row[url_idx])
+        elif url_idx == -1 and len(row) > 0:  # 매핑 실패 시 첫 번째 컬럼 가정
+            existing_urls.add(row[0])
+        # Max Index 계산
+        if index_idx != -1 and len(row) > index_idx:
+            val = row[index_idx]
+        elif index_idx == -1 and len(row) > 6:  # 매핑 실패 시 7번째(인덱스 6) 컬럼 가정 (기존 로직 호환)
+            val = row[6]
+        else:
+            continue
+        if val.isdigit(): max_index = max(max_index, int(val))
+    return existing_urls, max_index
+
+
+def build_sheet_rows(existing_data, data_list, category, subcategory, type_text, today=None):
+    """
+    기존 시트 데이터 + 새 항목 -> (추가할 행 목록, 중복 개수)
+    헤더 이름(대소문자 무시)에 맞춰 값을 배치하고, 이미 있는 URL 은 건너뛴다.
+    """
+    headers = existing_data[0]
+    header_map = {h.lower().strip(): i for i, h in enumerate(headers)}
+    existing_urls, max_index = scan_existing(existing_data, header_map)
+    today = today or datetime.now().strftime('%Y-%m-%d')
+
+    rows_to_append = []
+    duplicate_count = 0
+    current_index = max_index + 1
+    for data in data_list:
+        if data['url'] in existing_urls:
+            duplicate_count += 1
+            continue
+
+        # 헤더에 맞춰 행 데이터 생성 (기본값 빈 문자열)
+        row = [''] * len(headers)
+        def set_col(keys, value):
+            for key in keys:
+                if key.lower() in header_map:
+                    row[header_map[key.lower()]] = str(value)
+                    return
+
+        set_col(['url', 'link', '주소'], data['url'])
+        set_col(['title', '제목'], data['title'])
+        set_col(['category', '카테고리'], category)
+        set_col(['subcategory', '서브카테고리'], subcategory)
+        set_col(['type', '유형', 'post_type'], type_text)
+        set_col(['processed', '처리여부', 'posted'], '✓')
+        set_col(['processed_date', '처리일', 'posted_date', 'posted_time'], today)
+        set_col(['result_index', 'index', '인덱스'], str(current_index))
+
+        rows_to_append.append(row)
+        current_index += 1
+    return rows_to_append, duplicate_count
+
+
+def append_to_sheet(sheet, data_list, category, subcategory, type_text):
+    """시트 읽기 -> 행 생성 -> 한 번에 추가. (추가 개수, 중복 개수)"""
+    with instrument("sheets", "read") as call:
+        existing_data = sheet.get_all_values()
+        call['size'] = len(json.dumps(existing_data, ensure_ascii=False).encode('utf-8'))
+
+    if not existing_data:
+        # 헤더가 없는 경우 기본 헤더 생성 및 추가
+        with instrument("sheets", "append"):
+            sheet.append_row(DEFAULT_HEADERS)
+        existing_data = [DEFAULT_HEADERS]
+
+    rows_to_append, duplicate_count = build_sheet_rows(existing_data, data_list, category, subcategory, type_text)
+    if rows_to_append:
+        with instrument("sheets", "append") as call:
+            call['size'] = len(json.dumps(rows_to_append, ensure_ascii=False).encode('utf-8'))
+            sheet.append_rows(rows_to_append)
+    return len(rows_to_append), duplicate_count
@@ -9,6 +9,9 @@ import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
 import pickle
+from telemetry import instrument, record_swallowed
+from sheets_core import append_to_sheet
+from admission import AdmissionController, Overloaded
 
 # 상태 저장 파일명
 STATE_FILE = 'app_state.pkl'
@@ -22,6 +25,12 @@ st.set_page_config(
 
 # === Helper Functions ===
 
+# 동시 시트 업로드 제한 (프로세스 공용, 넘치면 대기 후 차단)
+@st.cache_resource
+def get_admission():
+    return AdmissionController()
+
+
 def save_state(state_data):
     """상태를 파일에 저장"""
     try:
@@ -220,109 +229,21 @@ def upload_to_sheets(creds_file, sheet_url, data_list, category, subcategory, ty
         
         # 시트 열기
         try:
-            sheet = client.open_by_url(sheet_url).worksheet(sheet_name)
+            with instrument("sheets", "open"):
+                sheet = client.open_by_url(sheet_url).worksheet(sheet_name)
         except gspread.exceptions.WorksheetNotFound:
             st.error(f"'{sheet_name}' 시트를 찾을 수 없습니다.")
             return 0, 0
             
-        # 기존 데이터 읽기
-        existing_data = sheet.get_all_values()
-        
-        # 헤더 처리
-        headers = []
-        if existing_data:
-            headers = existing_data[0]
-        else:
-            # 헤더가 없는 경우 기본 헤더 생성 및 추가
-            headers = ['URL', 'title', 'category', 'subcategory', 'type', 'processed', 'processed_date', 'result_index']
-            sheet.append_row(headers)
-            existing_data = [headers]
-            
-        # 헤더 매핑 (소문자로 변환하여 인덱스 저장)
-        header_map = {h.lower().strip(): i for i, h in enumerate(headers)}
-        
-        # 필수 컬럼 인덱스 찾기
-        url_idx = -1
-        index_idx = -1
-        
-        # URL 컬럼 찾기 (url, link, 주소 등)
-        for key in ['url', 'link', '주소']:
-            if key in header_map:
-                url_idx = header_map[key]
-                break
-                
-        # Index 컬럼 찾기 (result_index, index, 인덱스 등)
-        for key in ['result_index', 'index', '인덱스']:
-            if key in header_map:
-                index_idx = header_map[key]
-                break
-        
-        existing_urls = set()
-        max_index = 0
-        
-        # 기존 데이터 분석 (중복 체크 및 Max Index)
-        if len(existing_data) > 1:
-            for row in existing_data[1:]: # 헤더 제외
-                if not row: continue
-                
-                # URL 수집
-                if url_idx != -1 and len(row) > url_idx:
-                    existing_urls.add(row[url_idx])
-                elif url_idx == -1 and len(row) > 0: # 매핑 실패 시 첫 번째 컬럼 가정
-                    existing_urls.add(row[0])
-                    
-                # Max Index 계산
-                if index_idx != -1 and len(row) > index_idx:
-                    val = row[index_idx]
-                    if val.isdigit():
-                        max_index = max(max_index, int(val))
-                elif index_idx == -1 and len(row) > 6: # 매핑 실패 시 7번째(인덱스 6) 컬럼 가정 (기존 로직 호환)
-                    val = row[6]
-                    if val.isdigit():
-                        max_index = max(max_index, int(val))
-        
-        # 데이터 준비
-        rows_to_append = []
-        duplicate_count = 0
-        current_index = max_index + 1
-        
-        for data in data_list:
-            if data['url'] in existing_urls:
-                duplicate_count += 1
-                continue
-            
-            # 헤더에 맞춰 행 데이터 생성 (기본값 빈 문자열)
-            row = [''] * len(headers)
-            
-            def set_col(keys, value):
-                for key in keys:
-                    if key.lower() in header_map:
-                        row[header_map[key.lower()]] = str(value)
-                        return
-            
-            # 데이터 매핑
-            set_col(['url', 'link', '주소'], data['url'])
-            set_col(['title', '제목'], data['title'])
-            set_col(['category', '카테고리'], category)
-            set_col(['subcategory', '서브카테고리'], subcategory)
-            set_col(['type', '유형', 'post_type'], type_text)
-            set_col(['processed', '처리여부', 'posted'], '✓')
-            set_col(['processed_date', '처리일', 'posted_date', 'posted_time'], datetime.now().strftime('%Y-%m-%d'))
-            set_col(['result_index', 'index', '인덱스'], str(current_index))
-            
-            # 매핑되지 않은 필수 데이터 처리 (헤더가 없거나 매핑 실패 시 기본 위치에 할당 시도)
-            # 주의: 동적 매핑을 사용하므로, 헤더가 명확하지 않으면 데이터가 누락될 수 있음.
-            # 호환성을 위해 URL이 매핑되지 않았으면 첫 번째에 넣는 등의 처리는 하지 않음 (헤더가 있을 것이라 가정)
-            
-            rows_to_append.append(row)
-            current_index += 1
-            
-        if rows_to_append:
-            sheet.append_rows(rows_to_append)
-            
-        return len(rows_to_append), duplicate_count
+        # 읽기 / 중복 체크 / 행 생성 / 추가 (sheets_core)
+        with get_admission().admit('sheets'):
+            return append_to_sheet(sheet, data_list, category, subcategory, type_text)
         
+    except Overloaded as e:
+        st.warning(e.message)
+        return 0, 0
     except Exception as e:
+        record_swallowed('sheets_upload', e)
         st.error(f"업로드 중 오류 발생: {e}")
         return 0, 0
 
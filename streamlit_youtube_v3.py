@@ -5,19 +5,40 @@
 import streamlit as st
 import os
 from datetime import datetime, timedelta, date
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pandas as pd
-import pickle
 import io
 import yt_dlp
 import glob
 import re
 import json
 import uuid
+import hashlib
+import html
 import time
 import random
-import unicodedata  # <--- 이 줄을 추가하세요 (한글 자소 합치기용)
+from collections import deque
+from velocity import SnapshotStore, SnapshotCollector, add_velocity_columns
+from channel_watch import ChannelWatchStore, ChannelWatcher
+from keyword_watch import KeywordWatchStore, KeywordScheduler, INTERVAL_OPTIONS_MIN
+from text_index import TextIndex
+from prefetch import Prefetcher, PREFETCH_TOP_N, PREFETCH_UNIT_BUDGET
+from admission import AdmissionController, Overloaded
+from data_lake import DataLake, LakeCompactor
+from result_export import FORMATS as EXPORT_FORMATS, available_formats, export_bytes, export_file_name
+from response_cache import SearchCache, SingleFlight, search_cache_key
+from shared_state import DEFAULT_STATE_URL, get_state_backend
+from telemetry import METRICS, instrument, record_swallowed, configure_json_logging, start_metrics_server, RerunProfiler
+from retry_policy import breaker_states
+from result_schema import (compact_results, with_derived_columns, measure_result_sets, project_columns, arrow_payload_bytes,
+                           LIST_FIXED_COLS, LIST_DEFAULT_COLS, ROW_KEY)
+
+_rerun_start = time.perf_counter()  # 프로파일링 모드: 리런 시작 시각
+from youtube_core import (
+    build_service, build_search_params, fetch_channel_stats, fetch_video_items,
+    build_result_row, passes_filters, mine_keywords, mine_time_sliced, fetch_comments, refresh_statistics,
+    compute_channel_baselines, apply_channel_baselines, add_api_call_hook, parse_subtitle_text, SHORTS_LIMIT_SEC,
+)
 
 # === [1] 기본 설정 및 시크릿 로드 ===
 st.set_page_config(
@@ -105,116 +126,337 @@ st.markdown("""
 
 # 이번 달 암호
 CURRENT_MONTH_PW = st.secrets.get("MONTHLY_PW", "donjjul0717")
+# YouTube API 호출 엔진 ("google" = googleapiclient, "async" = httpx 비동기 엔진)
+API_BACKEND = st.secrets.get("API_BACKEND", "google")
+# 채널 기준선: 최근 업로드 N개 조회수 중앙값 (0 이면 끄고 채널 누적 평균 사용)
+BASELINE_UPLOADS = int(st.secrets.get("BASELINE_UPLOADS", 10))
+# 프로파일링 모드 (?profile=1 또는 PROFILE 시크릿): 리런마다 구간별 시간 기록, 세션당 최근 N회 보관
+PROFILE_MODE = st.query_params.get("profile") == "1" or bool(st.secrets.get("PROFILE", False))
+PROFILE_HISTORY = int(st.secrets.get("PROFILE_HISTORY", 50))
+if PROFILE_MODE and '_profile_runs' not in st.session_state:
+    st.session_state._profile_runs = deque(maxlen=PROFILE_HISTORY)
+profiler = RerunProfiler(PROFILE_MODE, st.session_state.get('_profile_runs'), start=_rerun_start)
 
 # === [2] 상태 관리 및 속도 제한 ===
-STATE_FILE = 'app_state.pkl'
+# 공유 상태 저장소: 여러 프로세스/레플리카가 같은 속도 제한·캐시·기록을 보도록
+# (sqlite:///파일 = 한 서버, redis://호스트 = 여러 서버)
+STATE_BACKEND = st.secrets.get("STATE_BACKEND", DEFAULT_STATE_URL)
+SCRIPT_CACHE_TTL = 7 * 86400   # 스크립트/댓글 캐시 보관 기간 (초)
+HISTORY_MAX = 100              # 검색 기록 최대 보관 개수
+
+@st.cache_resource
+def get_shared_state():
+    return get_state_backend(STATE_BACKEND)
+
+state_store = get_shared_state()
 
 @st.cache_resource
 class RateLimiter:
+    """전체 프로세스 공통 호출 간격 제한 (저장소의 set_if_absent + TTL 로 선점)"""
     def __init__(self):
-        self.last_called = 0
-    def try_acquire(self, min_interval=10):
-        now = time.time()
-        elapsed = now - self.last_called
-        if elapsed < min_interval:
-            return False, int(min_interval - elapsed) + 1
-        self.last_called = now
-        return True, 0
+        self.store = state_store
+    def try_acquire(self, min_interval=10, name="transcript"):
+        key = f"ratelimit:{name}"
+        if self.store.set_if_absent(key, time.time(), ttl=min_interval):
+            return True, 0
+        return False, int(self.store.ttl(key) or 0) + 1
 
 limiter = RateLimiter()
 
+# 동시 실행 제한 (프로세스 공용): 검색 / 대본 추출 각각 동시 실행 수 + 대기열, 넘치면 안내 후 차단
+# 시크릿 [ADMISSION] 표로 조정 가능 (예: search = { limit = 6, max_queue = 20 })
+@st.cache_resource
+def get_admission(): return AdmissionController(st.secrets.get("ADMISSION", {}))
+
+admission = get_admission()
+
+USAGE_TTL = 40 * 86400   # 일별 사용량 보관 기간 (관리자 화면용)
+FREE_SEARCH_LIMIT = 10
+FREE_SCRIPT_LIMIT = 5
+
+def usage_user_id_from_key(api_key): return "k" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+def usage_user_id(api_key):
+    """사용자 식별자: API 키 해시 (새로고침/다른 세션에서도 동일). 키가 없으면 URL 의 uid"""
+    if api_key: return usage_user_id_from_key(api_key)
+    if not st.query_params.get("uid"): st.query_params["uid"] = uuid.uuid4().hex[:12]
+    return "u" + st.query_params["uid"]
+
+def record_usage(uid, metric, amount=1):
+    """일별 카운터 원자적 증가 (사용자별 + 전체 합계). 날짜가 키에 들어가므로 자정에 자동 초기화"""
+    day = str(date.today())
+    if state_store.set_if_absent(f"usage:{day}:seen:{uid}", 1, ttl=USAGE_TTL):
+        state_store.incr(f"usage:{day}:_all:users", ttl=USAGE_TTL)
+    state_store.incr(f"usage:{day}:_all:{metric}", amount, ttl=USAGE_TTL)
+    return state_store.incr(f"usage:{day}:{uid}:{metric}", amount, ttl=USAGE_TTL)
+
+def usage_summary(days=14):
+    """관리자용: 최근 N일 일별 합계"""
+    rows = []
+    for i in range(days):
+        day = str(date.today() - timedelta(days=i))
+        rows.append({'date': day, **{m: state_store.get(f"usage:{day}:_all:{m}") or 0 for m in ('users', 'search', 'script', 'units')}})
+    return pd.DataFrame(rows)
+
 class UsageManager:
+    """
+    사용량 카운터 (공유 저장소, 사용자별 일 단위).
+    구독자도 집계는 하고(용량 계획용), 한도는 체험판에만 적용한다.
+    """
     def __init__(self):
-        if 'usage_data' not in st.session_state:
-            st.session_state.usage_data = {'date': str(date.today()), 'search_count': 0, 'script_count': 0}
-            
-    def check_reset(self):
-        today = str(date.today())
-        if st.session_state.usage_data['date'] != today:
-            st.session_state.usage_data = {'date': today, 'search_count': 0, 'script_count': 0}
-            
+        self.uid = None
+
+    def bind(self, api_key):
+        self.uid = usage_user_id(api_key)
+
+    def _count(self, metric):
+        if not self.uid: return 0
+        return state_store.get(f"usage:{date.today()}:{self.uid}:{metric}") or 0
+
     def is_pro(self):
         return st.session_state.get("is_subscriber", False)
 
     def can_search(self):
-        self.check_reset()
         if self.is_pro(): return True
-        return st.session_state.usage_data['search_count'] < 10
+        return self._count('search') < FREE_SEARCH_LIMIT
 
     def increment_search(self):
-        if not self.is_pro(): st.session_state.usage_data['search_count'] += 1
+        if self.uid: record_usage(self.uid, 'search')
 
     def can_download_script(self):
-        self.check_reset()
         if self.is_pro(): return True
-        return st.session_state.usage_data['script_count'] < 5
+        return self._count('script') < FREE_SCRIPT_LIMIT
 
     def increment_script(self):
-        if not self.is_pro(): st.session_state.usage_data['script_count'] += 1
+        if self.uid: record_usage(self.uid, 'script')
     
-    # [수정] 누락되었던 함수 추가됨
     def get_status(self):
-        self.check_reset()
-        return st.session_state.usage_data
+        return {'date': str(date.today()), 'search_count': self._count('search'), 'script_count': self._count('script')}
 
 usage_mgr = UsageManager()
 
+# YouTube API 호출 단위(units) 집계: 호출한 API 키의 사용자에게 기록 (백그라운드 스레드에서도 동작)
+@st.cache_resource
+def register_usage_hook():
+    add_api_call_hook(lambda api_key, endpoint, units: record_usage(usage_user_id_from_key(api_key), 'units', units))
+    return True
+
+register_usage_hook()
+
+# 외부 호출 계측: JSON 로그(표준출력) + METRICS_PORT 시크릿이 있으면 /metrics 서버
+@st.cache_resource
+def setup_telemetry():
+    configure_json_logging()
+    port = int(st.secrets.get("METRICS_PORT", 0))
+    if port:
+        try: start_metrics_server(port)
+        except OSError as e: record_swallowed('metrics_server', e)  # 다른 프로세스가 이미 포트 사용 중
+    return True
+
+setup_telemetry()
+
+# 조회수 속도 추적 (프로세스당 1개, 백그라운드 수집)
+@st.cache_resource
+def get_velocity_collector():
+    interval_min = int(st.secrets.get("VELOCITY_INTERVAL_MIN", 30))
+    collector = SnapshotCollector(SnapshotStore(), interval_sec=interval_min * 60, backend=API_BACKEND)
+    collector.start()
+    return collector
+
+velocity = get_velocity_collector()
+
+# 채널 감시 (프로세스당 1개, 백그라운드 점검 - 채널당 1 unit)
+@st.cache_resource
+def get_channel_watcher():
+    interval_min = int(st.secrets.get("CHANNEL_WATCH_INTERVAL_MIN", 60))
+    watcher = ChannelWatcher(ChannelWatchStore(), interval_sec=interval_min * 60, backend=API_BACKEND)
+    watcher.start()
+    return watcher
+
+channel_watcher = get_channel_watcher()
+
 # === [3] 헬퍼 함수 ===
 def save_editor_changes():
     """리스트 뷰 변경사항 반영"""
     state = st.session_state["list_view_editor"]
     current_df = st.session_state.get("_current_filtered_df", None)
     for display_idx, changes in state["edited_rows"].items():
-        if current_df is not None and "_original_index" in current_df.columns:
-            original_idx = current_df.at[int(display_idx), "_original_index"]
+        if current_df is not None and ROW_KEY in current_df.columns:
+            original_idx = current_df.at[int(display_idx), ROW_KEY]
         else:
             original_idx = int(display_idx)
         for col, val in changes.items():
             st.session_state.search_results.at[original_idx, col] = val
 
-def save_state(state_data):
-    try:
-        with open(STATE_FILE, 'wb') as f: pickle.dump(state_data, f)
+def sort_results(df, sort_opt):
+    """정렬 옵션 적용 (화면 / 내보내기 공용). 급상승순은 속도 지표가 없으면 붙여서 정렬"""
+    if "조회수" in sort_opt: return df.sort_values('view_count', ascending=False)
+    if "떡상" in sort_opt: return df.sort_values('view_sub_ratio', ascending=False) # 변수명 view_sub_ratio 유지
+    if "성과" in sort_opt: return df.sort_values('performance', ascending=False)
+    if "급상승" in sort_opt:
+        if 'views_per_hour' not in df.columns: df = add_velocity_columns(df, velocity.store)
+        return df.sort_values('views_per_hour', ascending=False)
+    return df.sort_values('published_at', ascending=False) # 기본
+
+def build_result_view(results, filter_opt, sort_opt):
+    """화면용 프레임: 속도 지표 병합 -> 필터 -> 정렬 -> url/thumbnail/is_shorts, 행 키(_original_index) 부여"""
+    df = add_velocity_columns(results, velocity.store)
+    if filter_opt == "숏폼": 
+        df = df[df['duration_sec'] <= SHORTS_LIMIT_SEC]
+    elif filter_opt == "롱폼": 
+        df = df[df['duration_sec'] > SHORTS_LIMIT_SEC]
+    
+    df = sort_results(df, sort_opt)
+    df = with_derived_columns(df)  # 보이는 행에만 url / thumbnail / is_shorts 생성
+    df[ROW_KEY] = df.index
+    return df.reset_index(drop=True)
+
+def cached_result_view(filter_opt, sort_opt):
+    """
+    보기 상태(결과 세트, 필터, 정렬, 속도 수집 시각)가 직전 리런과 같으면 만들어 둔 프레임을 재사용.
+    체크박스 선택만 매번 search_results 에서 다시 맞추고, 바뀌었으면 리스트 뷰 투영 캐시를 비운다.
+    """
+    results = st.session_state.search_results
+    sig = (filter_opt, sort_opt, velocity.last_run)
+    cache = st.session_state.get("_view_cache")
+    if cache and cache['src'] is results and cache['sig'] == sig:
+        df = cache['df']
+        sel = results['selected'].reindex(df[ROW_KEY]).to_numpy(dtype=bool)
+        if (sel != df['selected'].to_numpy()).any():
+            df['selected'] = sel
+            cache['proj'].clear()
+        return df, cache
+    # src 를 들고 있어야 옛 결과 세트의 id 가 재사용되어 잘못 적중하는 일이 없다
+    cache = {'src': results, 'sig': sig, 'df': build_result_view(results, filter_opt, sort_opt), 'proj': {}}
+    st.session_state["_view_cache"] = cache
+    return cache['df'], cache
+
+def df_to_records(df):
+    """DataFrame -> JSON 저장 가능한 list[dict] (numpy 타입 제거)"""
+    return json.loads(df.to_json(orient='records', force_ascii=False))
+
+def state_key(uid):
+    """마지막 결과 세트도 사용자별 (usage_user_id 기준 - 다른 사용자/레플리카가 덮어쓰거나 보지 않게)"""
+    return f"app_state:{uid}"
+
+def save_state(uid, state_data):
+    try: state_store.set(state_key(uid), {k: df_to_records(v) for k, v in state_data.items()})
     except: pass
 
-def load_state():
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, 'rb') as f: return pickle.load(f)
-        except: pass
-    return {}
+def load_state(uid):
+    try:
+        saved = state_store.get(state_key(uid)) or {}
+        return {k: pd.DataFrame(v) for k, v in saved.items()}
+    except: return {}
+
+# 스크립트/댓글 캐시 (공유 저장소, 다른 세션에서 받은 것도 재사용)
+def get_cached_script(video_id): return state_store.get(f"script:{video_id}")
+def put_cached_script(video_id, text): state_store.set(f"script:{video_id}", text, ttl=SCRIPT_CACHE_TTL)
+# 댓글은 수집 페이지 수(구독자 10 / 체험판 3)가 달라서 키에 포함
+def get_cached_comments(video_id, pages): return state_store.get(f"comments:{video_id}:{pages}")
+def put_cached_comments(video_id, pages, comments): state_store.set(f"comments:{video_id}:{pages}", comments, ttl=SCRIPT_CACHE_TTL)
+
+# 대본/댓글 전문 검색 색인 (받아 온 대본/댓글을 바로 색인, 내용이 같으면 건너뜀)
+@st.cache_resource
+def get_text_index(): return TextIndex()
+
+text_index = get_text_index()
 
-def parse_iso_duration(duration_str):
-    if not duration_str: return 0
-    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_str)
-    if not match: return 0
-    h, m, s = match.groups()
-    return (int(h or 0)*3600) + (int(m or 0)*60) + int(s or 0)
+def index_text(video_id, kind, body, title=""):
+    df = st.session_state.get('search_results', pd.DataFrame())
+    ch = df.loc[df['video_id'] == video_id, 'channel'] if not df.empty else []
+    try: text_index.upsert(video_id, kind, body, title, str(ch.iloc[0]) if len(ch) else "")
+    except Exception as e: record_swallowed('text_index', e)   # 색인 실패가 대본/댓글 표시를 막지 않게
 
-def convert_to_kst(utc_str):
-    if not utc_str: return ""
+# 채굴 데이터 레이크 (data_lake/ 아래 Parquet, 날짜/키워드 파티션): 검색/새로고침/감시 결과와 새로 받은 대본·댓글을 쌓는다
+@st.cache_resource
+def get_data_lake():
+    compactor = LakeCompactor(DataLake(), interval_sec=int(st.secrets.get("LAKE_COMPACT_MIN", 60)) * 60)
+    compactor.start()
+    return compactor
+
+lake_compactor = get_data_lake()
+data_lake = lake_compactor.lake
+
+def lake_keyword_of(video_id):
+    """영상이 검색된 키워드 (다중 키워드 결과면 keywords 컬럼, 아니면 마지막 검색어)"""
+    df = st.session_state.get('search_results', pd.DataFrame())
+    if not df.empty and 'keywords' in df.columns:
+        kws = df.loc[df['video_id'] == video_id, 'keywords']
+        if len(kws): return str(kws.iloc[0]).split(", ")[0]
+    return st.session_state.get('lake_keyword')
+
+def lake_append(kind, *args, **kwargs):
+    """kind = 'results' / 'text', 첫 인자는 owner (usage_user_id). 저장 실패가 검색/모달을 막지 않게"""
+    try: return (data_lake.append_results if kind == 'results' else data_lake.append_text)(*args, **kwargs)
+    except Exception as e: record_swallowed('data_lake', e)
+
+def history_key(uid):
+    """검색 기록은 사용자별 리스트 (usage_user_id 기준 - 다른 사용자의 검색어/결과가 보이지 않게)"""
+    return f"search_history:{uid}"
+
+def add_search_history(uid, keywords, results_df, **conditions):
+    """검색 기록 저장 (최신순, 최대 HISTORY_MAX 개)"""
     try:
-        dt_utc = datetime.strptime(utc_str, "%Y-%m-%dT%H:%M:%SZ")
-        return (dt_utc + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M")
-    except: return utc_str
+        state_store.push(history_key(uid), {
+            'ts': datetime.now().strftime("%Y-%m-%d %H:%M"),
+            'keywords': list(keywords),
+            'conditions': conditions,
+            'count': len(results_df),
+            'results': df_to_records(results_df),
+        }, max_len=HISTORY_MAX)
+    except: pass
 
-# 세션 초기화
-if 'search_results' not in st.session_state:
-    saved = load_state()
+def record_watch_run(job, result):
+    """키워드 감시 실행 결과 -> 데이터 레이크 (전체 스냅샷), 새 영상 -> 작업 소유자의 검색 기록 (스케줄러 스레드에서 호출)"""
+    lake_append('results', job['owner'], result['rows'], 'watch', job['keyword'])
+    if not result['new']: return
+    try:
+        state_store.push(history_key(job['owner']), {
+            'ts': datetime.now().strftime("%Y-%m-%d %H:%M"),
+            'keywords': [f"⏰ {job['keyword']}"],
+            'conditions': {'watch_job': job['id'], 'duration': job['duration'], 'min_view': job['min_view'], 'min_sub': job['min_sub']},
+            'count': len(result['new']),
+            'results': json.loads(json.dumps(result['new'], ensure_ascii=False, default=str)),
+        }, max_len=HISTORY_MAX)
+    except Exception as e: record_swallowed('watch_history', e)
+
+# 키워드 감시 스케줄러 (프로세스당 1개, 실행 시각이 된 작업을 1분마다 확인)
+@st.cache_resource
+def get_keyword_scheduler():
+    scheduler = KeywordScheduler(KeywordWatchStore(), backend=API_BACKEND, on_result=record_watch_run)
+    scheduler.start()
+    return scheduler
+
+keyword_scheduler = get_keyword_scheduler()
+
+# 세션 초기화 (저장된 결과 복원은 사용자를 알게 된 뒤 restore_session_state 에서)
+if 'search_results' not in st.session_state: st.session_state.search_results = pd.DataFrame()
+
+def restore_session_state(uid):
+    """사용자(uid)가 정해지면 그 사용자가 마지막으로 저장한 결과를 한 번 복원 (세션 결과가 비어 있을 때만)"""
+    if st.session_state.get('_restored_uid') == uid: return
+    st.session_state._restored_uid = uid
+    if not st.session_state.search_results.empty: return
+    saved = load_state(uid)
     if saved: st.session_state.update(saved)
-    if 'search_results' not in st.session_state: st.session_state.search_results = pd.DataFrame()
-    if 'comments_map' not in st.session_state: st.session_state.comments_map = {}
-    if 'scripts_map' not in st.session_state: st.session_state.scripts_map = {}
     if not st.session_state.search_results.empty:
         for c in ['view_sub_ratio', 'view_diff', 'duration_sec']:
             if c not in st.session_state.search_results.columns:
                 st.session_state.search_results[c] = 0
-        # is_shorts 컬럼 추가 (기존 데이터 호환, 180초 기준)
-        if 'is_shorts' not in st.session_state.search_results.columns:
-            st.session_state.search_results['is_shorts'] = st.session_state.search_results['duration_sec'] < 180
+        # 압축 스키마로 (옛 저장 데이터의 url/thumbnail/is_shorts 는 버림)
+        st.session_state.search_results = compact_results(st.session_state.search_results)
 
 # === [4] 핵심 기능 함수 (검색, 스크립트, 댓글) ===
-def get_youtube_transcript(video_id):
+def get_youtube_transcript(video_id, queue_wait=None):
+    """queue_wait: 동시 추출 대기열에서 기다릴 최대 초 (None = 기본값, 0 = 자리가 없으면 바로 포기)"""
+    try:
+        with admission.admit('transcript', queue_wait):
+            return _extract_transcript(video_id)
+    except Overloaded as e:
+        return None, e.message
+
+def _extract_transcript(video_id):
     success, wait = limiter.try_acquire(10)
     if not success: return None, f"🚦 잠시 대기 ({wait}초)"
     time.sleep(random.uniform(0.5, 1.5))
@@ -232,57 +474,97 @@ def get_youtube_transcript(video_id):
         ydl_opts = {'skip_download': True, 'writesubtitles': True, 'writeautomaticsub': True, 'subtitleslangs': ['ko'], 'outtmpl': temp, 'quiet': True, 'no_warnings': True}
         if os.path.exists('cookies.txt'): ydl_opts['cookiefile'] = 'cookies.txt'
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl: ydl.download([url])
-        
-        files = [f for f in glob.glob(f"{temp}*") if not f.endswith('.part')]
+        with instrument("yt_dlp", "subtitles") as call:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl: ydl.download([url])
+            files = [f for f in glob.glob(f"{temp}*") if not f.endswith('.part')]
+            call['size'] = sum(os.path.getsize(f) for f in files)
+            if not files: call['outcome'] = 'no_subtitles'
         if not files: return None, "자막 없음"
         
-        full_text = ""
         with open(files[0], 'r', encoding='utf-8') as f:
-            content = f.read()
-            # JSON/VTT 파싱 로직 간소화
-            lines = [re.sub(r'<[^>]+>', '', l).strip() for l in content.splitlines()]
-            full_text = " ".join([l for l in lines if l and '-->' not in l and l != 'WEBVTT' and not l.isdigit()])
-            
+            full_text = parse_subtitle_text(f.read())
+
         for f in glob.glob(f"{temp}*"): os.remove(f)
         return full_text if full_text.strip() else None, "내용 없음" if not full_text.strip() else None
     except Exception as e:
+        record_swallowed('transcript', e)
         for f in glob.glob(f"{temp}*"): 
             try: os.remove(f)
             except: pass
         return None, "추출 실패"
 
-def get_video_comments(api_key, video_id):
+def comment_pages(): return 10 if usage_mgr.is_pro() else 3
+
+def get_video_comments(api_key, video_id, errors=None):
     if not api_key: return []
     try:
-        youtube = build("youtube", "v3", developerKey=api_key)
-        all_c = []
-        token = None
-        pages = 0
-        max_pages = 10 if usage_mgr.is_pro() else 3
-        
-        while pages < max_pages:
-            res = youtube.commentThreads().list(part="snippet,replies", videoId=video_id, maxResults=50, order="relevance", textFormat="plainText", pageToken=token).execute()
-            for item in res.get("items", []):
-                c = item["snippet"]["topLevelComment"]["snippet"]
-                all_c.append({"author": c["authorDisplayName"], "text": c["textDisplay"], "likes": c["likeCount"], "date": c["publishedAt"][:10]})
-                if "replies" in item:
-                    for r in item["replies"]["comments"]:
-                        rs = r["snippet"]
-                        all_c.append({"author": rs["authorDisplayName"], "text": f"[대댓글] {rs['textDisplay']}", "likes": rs["likeCount"], "date": rs["publishedAt"][:10]})
-            token = res.get("nextPageToken")
-            pages += 1
-            if not token: break
-        all_c.sort(key=lambda x: x["likes"], reverse=True)
-        return all_c
-    except: return []
+        youtube = build_service(api_key, API_BACKEND)
+        return fetch_comments(youtube, video_id, comment_pages(), errors=errors)
+    except Exception as e:
+        record_swallowed('comments', e)  # 댓글 사용 중지 영상 등 -> 빈 목록
+        return []
+
+# 대본/댓글 미리 받기 (프로세스당 스레드 1개): 검색 직후 떡상지표 상위 N개를 캐시에 채워 두면 모달이 바로 열린다
+PREFETCH_N = int(st.secrets.get("PREFETCH_TOP_N", PREFETCH_TOP_N))
+PREFETCH_BUDGET = int(st.secrets.get("PREFETCH_UNIT_BUDGET", PREFETCH_UNIT_BUDGET))
+PREFETCH_SCRIPT_INTERVAL = 20   # 미리 받는 대본은 20초에 1개까지 (공용 10초 간격 중 나머지는 사용자 요청 몫)
+
+def _index_prefetched(video_id, kind, body, ctx):
+    try: text_index.upsert(video_id, kind, body, ctx['title'], ctx['channel'])
+    except Exception as e: record_swallowed('text_index', e)
+
+def _prefetch_script(video_id, ctx):
+    if not limiter.try_acquire(PREFETCH_SCRIPT_INTERVAL, "prefetch_transcript")[0]: return 'rate_limited'
+    content, err = get_youtube_transcript(video_id, queue_wait=0)   # 사용자 추출이 몰려 있으면 양보
+    if err: return 'rate_limited' if err.startswith("🚦") else 'failed' if err == "추출 실패" else 'empty'
+    put_cached_script(video_id, content)
+    _index_prefetched(video_id, 'script', content, ctx)
+    lake_append('text', ctx['owner'], 'script', video_id, content, ctx['keyword'], ctx['title'], ctx['channel'])
+    return 'done'
+
+def _prefetch_comments(video_id, ctx):
+    errors = []
+    comments = fetch_comments(build_service(ctx['api_key'], API_BACKEND), video_id, ctx['pages'], errors=errors)
+    if errors: return 'failed'   # 부분 결과는 모달과 마찬가지로 캐시하지 않음
+    if not comments: return 'empty'
+    put_cached_comments(video_id, ctx['pages'], comments)
+    body = "\n".join(c['text'] for c in comments)
+    _index_prefetched(video_id, 'comments', body, ctx)
+    lake_append('text', ctx['owner'], 'comments', video_id, body, ctx['keyword'], ctx['title'], ctx['channel'], items=len(comments))
+    return 'done'
+
+@st.cache_resource
+def get_prefetcher():
+    prefetcher = Prefetcher({
+        'script': (lambda vid, ctx: get_cached_script(vid) is not None, _prefetch_script),
+        'comments': (lambda vid, ctx: get_cached_comments(vid, ctx['pages']) is not None, _prefetch_comments),
+    })
+    prefetcher.start()
+    return prefetcher
+
+prefetcher = get_prefetcher()
+
+def prefetch_owner():
+    if '_prefetch_owner' not in st.session_state: st.session_state._prefetch_owner = uuid.uuid4().hex
+    return st.session_state._prefetch_owner
+
+def schedule_prefetch(api_key, results):
+    """새 검색 결과의 떡상지표 상위 N개 대본/댓글 미리 받기 (구독자만: 체험판은 대본 일일 한도가 있어서)"""
+    if not api_key or not usage_mgr.is_pro() or PREFETCH_N <= 0 or results.empty: return 0
+    pages = comment_pages()
+    jobs = []
+    for r in results.nlargest(PREFETCH_N, 'view_sub_ratio').itertuples():
+        ctx = {'title': str(r.title), 'channel': str(r.channel), 'keyword': lake_keyword_of(r.video_id), 'owner': usage_mgr.uid}
+        jobs += [('script', r.video_id, ctx), ('comments', r.video_id, {**ctx, 'api_key': api_key, 'pages': pages, 'units': pages})]
+    prefetcher.submit(prefetch_owner(), jobs, PREFETCH_BUDGET)
+    return len(jobs)
 
 def run_api_test(api_key):
     """API 키 연결 테스트 함수"""
     if not api_key: return [("❌", "키를 입력해주세요.")]
     try:
         # 가벼운 쿼리로 테스트
-        build("youtube", "v3", developerKey=api_key).search().list(q="test", part="id", maxResults=1).execute()
+        build_service(api_key, API_BACKEND).search().list(q="test", part="id", maxResults=1, fields="items/id").execute()
         return [("✅", "정상 연결되었습니다!")]
     except HttpError as e:
         if e.resp.status == 403:
@@ -294,17 +576,70 @@ def run_api_test(api_key):
 # 👆👆 [여기까지 추가] 👆👆
 
 
-# 👇👇 [수정 후] - 언더바를 모두 제거하여 변경 시 무조건 새로 검색하게 함 👇👇
-@st.cache_data(show_spinner=False)
+# 검색 결과 디스크 캐시 (st.cache_data 대체)
+# - 키: 정규화된 검색 조건 (API 키 제외) / TTL + 용량 제한 / 여러 프로세스가 같은 파일 공유
+@st.cache_resource
+def get_search_cache():
+    return SearchCache(
+        ttl_sec=int(st.secrets.get("SEARCH_CACHE_TTL_MIN", 360)) * 60,
+        max_bytes=int(st.secrets.get("SEARCH_CACHE_MAX_MB", 200)) * 1024 * 1024,
+    )
+
+search_cache = get_search_cache()
+
+# 같은 조건의 검색이 여러 세션에서 동시에 들어오면 1번만 실행하고 결과를 나눠 받는다 (프로세스 공용)
+@st.cache_resource
+def get_search_flight(): return SingleFlight("search")
+
+search_flight = get_search_flight()
+
+def warn_partial(errors, n):
+    """재시도 후에도 실패한 요청이 있을 때: 받은 만큼은 보여주고 안내"""
+    more = f" 외 {len(errors) - 1}건" if len(errors) > 1 else ""
+    if not n: st.error(f"검색 오류: {errors[0]}{more}")
+    else: st.warning(f"⚠️ 일부 요청이 실패해 {n}개 결과만 표시합니다. ({errors[0]}{more})")
+
+def coalesced_search(key, live, size=len):
+    """
+    검색 캐시 -> (없으면) 같은 조건으로 진행 중인 검색에 합류 -> (없으면) 직접 실행
+    live(errors) -> 저장할 값. 오류가 있거나 결과가 비면 캐시에 넣지 않는다. size(값) = 결과 개수
+    """
+    cached = search_cache.get(key)
+    if cached is not None:
+        st.toast("⚡ 최근 같은 조건의 검색 결과를 재사용했습니다.")
+        return cached
+    def _run():
+        errors = []
+        if admission.saturated('search'): st.toast("⏳ 검색이 몰려 있어 순서를 기다립니다...", icon="🚦")
+        with admission.admit('search'):   # 합류한 세션은 자리를 차지하지 않음
+            value = live(errors)
+        if not errors and size(value): search_cache.put(key, value)  # 오류/부분/빈 결과는 저장하지 않음
+        return value, errors
+    if search_flight.in_flight(key):
+        with st.spinner("⏳ 같은 조건의 검색이 진행 중입니다. 끝나면 결과를 함께 받습니다..."):
+            (value, errors), shared = search_flight.do(key, _run)
+    else:
+        (value, errors), shared = search_flight.do(key, _run)
+    if shared: st.toast("🤝 진행 중이던 같은 조건의 검색 결과를 함께 받았습니다. (할당량 절약)")
+    if errors: warn_partial(errors, size(value))
+    return value
+
 def search_youtube(api_key, keyword, limit_count, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0):
     if not api_key: return []
+    key = search_cache_key(keyword, limit_count, p_after, p_before, duration_mode, min_view, min_sub,
+                           mode="single", baseline=BASELINE_UPLOADS)
+    return coalesced_search(key, lambda errors: _search_youtube_live(
+        api_key, keyword, limit_count, p_after, p_before, duration_mode, min_view, min_sub, errors))
+
+def _search_youtube_live(api_key, keyword, limit_count, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0, errors=None):
     try:
-        youtube = build("youtube", "v3", developerKey=api_key)
+        youtube = build_service(api_key, API_BACKEND)
         results = []
         token = None
         target = min(limit_count, 50)
         
         seen_ids = set() # 중복 방지
+        all_ch_stats = {} # 기준선 계산용 (페이지 전체)
         
         pb = st.progress(0); st_text = st.empty()
         max_loop_count = 0 
@@ -313,136 +648,133 @@ def search_youtube(api_key, keyword, limit_count, p_after, p_before, duration_mo
             max_loop_count += 1
             st_text.text(f"채굴 중... ({len(results)}/{target}) - 조건에 맞는 영상을 찾는 중입니다.")
 
-            params = {
-                'q': keyword, 
-                'part': "id,snippet", 
-                'maxResults': min(50, target-len(results) + 20), 
-                'type': "video", 
-                'pageToken': token, 
-                'order': "relevance"
-            }
-            if p_after: params['publishedAfter'] = p_after
-            if p_before: params['publishedBefore'] = p_before
-
-            if duration_mode == "숏폼 (3분 이하)":
-                params['videoDuration'] = 'short' 
-            
-            res = youtube.search().list(**params).execute()
-            v_ids = [i['id']['videoId'] for i in res.get('items', [])]
-            
-            if not v_ids: break
-            
-            ch_ids = [i['snippet']['channelId'] for i in res.get('items', [])]
-            
-            # 채널 통계
-            ch_stats = {}
-            if ch_ids:
-                c_res = youtube.channels().list(part="statistics", id=','.join(set(ch_ids))).execute()
-                for c in c_res.get('items',[]): 
-                    ch_stats[c['id']] = {
-                        'sub': int(c['statistics'].get('subscriberCount',0)), 
-                        'view': int(c['statistics'].get('viewCount',0)), 
-                        'vid': int(c['statistics'].get('videoCount',0))
-                    }
-            
-            v_res = youtube.videos().list(part="snippet,statistics,contentDetails", id=','.join(v_ids)).execute()
-            for v in v_res.get('items',[]):
+            params = build_search_params(keyword, min(50, target-len(results) + 20), p_after, p_before, duration_mode, token)
+            try:
+                res = youtube.search().list(**params).execute()
+                v_ids = [i['id']['videoId'] for i in res.get('items', [])]
+                if not v_ids: break
+                ch_ids = [i['snippet']['channelId'] for i in res.get('items', [])]
+
+                # 채널 통계 / 영상 상세 (50개 단위 배치)
+                ch_stats = fetch_channel_stats(youtube, ch_ids)
+                v_items = fetch_video_items(youtube, v_ids)
+            except Exception as e:
+                # 재시도 후에도 실패: 앞 페이지까지의 결과는 살린다 (첫 페이지 실패는 오류)
+                if not results or errors is None: raise
+                errors.append(f"{max_loop_count}페이지: {e}")
+                break
+            all_ch_stats.update(ch_stats)
+            for vid in v_ids:
                 if len(results) >= target: break
-
-                vid = v['id']
-                if vid in seen_ids: continue # 중복 제거
+                v = v_items.get(vid)
+                if not v or vid in seen_ids: continue # 중복 제거
                 seen_ids.add(vid)
 
-                sn = v['snippet']
-                stt = v.get('statistics',{})
-                cnt = v.get('contentDetails',{})
-                
-                vc = int(stt.get('viewCount',0))
-                cid = sn.get('channelId')
-                cst = ch_stats.get(cid, {'sub':0, 'view':0, 'vid':0})
-                sub = cst['sub']
-                
-                if vc < min_view: continue  
-                if sub < min_sub: continue
-
-                # ---------------------------------------------------------
-                # [1] 성과지표 (Performance): 채널 평균 조회수 대비 성과 (기존 유지)
-                # ---------------------------------------------------------
-                avg = cst['view']/cst['vid'] if cst['vid'] > 0 else 0
-                perf = "-"
-                if avg > 0:
-                    diff_r = (vc - avg)/avg * 100
-                    if diff_r >= 200: perf = "🔥🔥 초대박"
-                    elif diff_r >= 100: perf = "🔥 떡상"
-                    elif diff_r >= 50: perf = "👍 양호"
-
-                # ---------------------------------------------------------
-                # [2] 떡상지표 (Breakout): 구독자 대비 조회수 비율 + 등급 아이콘(NEW)
-                # ---------------------------------------------------------
-                ratio = vc / sub if sub > 0 else 0
-                
-                # 떡상지표 등급 (4단계)
-                b_grade = ""
-                if ratio >= 5.0: b_grade = "💎 전설"
-                elif ratio >= 2.0: b_grade = "🚀 초대박"
-                elif ratio >= 1.0: b_grade = "🔥 떡상"
-                elif ratio >= 0.5: b_grade = "👌 양호"
-                
-                duration_sec = parse_iso_duration(cnt.get('duration',''))
-                is_shorts = duration_sec <= 180
-                
-                if duration_mode == "숏폼 (3분 이하)" and duration_sec > 180: continue 
-                if duration_mode == "롱폼 (3분 초과)" and duration_sec <= 180: continue 
-                
-                results.append({
-                    'video_id': vid, 
-                    'selected': False,
-                    'thumbnail': sn.get('thumbnails',{}).get('medium',{}).get('url',''),
-                    'url': f"https://youtube.com/watch?v={vid}",
-                    'title': unicodedata.normalize('NFC', sn.get('title','')), 
-                    'channel': unicodedata.normalize('NFC', sn.get('channelTitle','')),
-                    'view_count': vc, 
-                    'subscriber_count': sub, 
-                    'comment_count': int(stt.get('commentCount',0)),
-                    'published_at': convert_to_kst(sn.get('publishedAt','')),
-                    
-                    'view_sub_ratio': ratio,      # 떡상지표 (숫자)
-                    'breakout_grade': b_grade,    # 떡상등급 (아이콘+텍스트) - [NEW]
-                    
-                    'view_diff': vc - avg,
-                    'performance': perf,          # 성과지표 (평균대비)
-                    
-                    'duration_sec': duration_sec, 
-                    'is_shorts': is_shorts
-                })  
+                # 성과지표(채널 평균 대비) / 떡상지표(구독자 대비) 계산은 youtube_core 참고
+                cst = ch_stats.get(v['snippet'].get('channelId'), {'sub':0, 'view':0, 'vid':0})
+                row = build_result_row(v, cst)
+                if not passes_filters(row, min_view, min_sub, duration_mode): continue
+                results.append(row)
             
             pb.progress(min(len(results)/target, 1.0))
             token = res.get('nextPageToken')
             if not token: break
         
+        # 채널 기준선 (결과에 나온 채널 전체를 한 번에)
+        if BASELINE_UPLOADS and results:
+            st_text.text("채널 기준선 계산 중... (최근 업로드 중앙값)")
+            used = {r['channel_id'] for r in results}
+            baselines = compute_channel_baselines(api_key, {c: all_ch_stats[c] for c in used if c in all_ch_stats}, BASELINE_UPLOADS, API_BACKEND)
+            apply_channel_baselines(results, baselines)
+        
         pb.empty(); st_text.empty()
         return results
     except Exception as e:
-        st.error(f"검색 오류: {e}")
+        errors.append(str(e))   # warn_partial 이 표시 (합류한 세션에도 같은 안내)
         return []
 
+def search_youtube_multi(api_key, keywords, limit_count, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0):
+    """다중 키워드 채굴 (키워드 전체 기준 중복 제거 + 50개 단위 배치 보강)"""
+    if not api_key or not keywords: return []
+    key = search_cache_key(list(keywords), limit_count, p_after, p_before, duration_mode, min_view, min_sub,
+                           mode="multi", baseline=BASELINE_UPLOADS)
+    return coalesced_search(key, lambda errors: _search_youtube_multi_live(
+        api_key, keywords, limit_count, p_after, p_before, duration_mode, min_view, min_sub, errors))
+
+def _search_youtube_multi_live(api_key, keywords, limit_count, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0, errors=None):
+    try:
+        pb = st.progress(0); st_text = st.empty()
+        def _progress(done, total, msg):
+            pb.progress(min(done/total, 1.0) if total else 0.0)
+            st_text.text(msg)
+        results = mine_keywords(
+            api_key, list(keywords), limit_count, p_after, p_before, duration_mode,
+            min_view, min_sub, max_workers=8 if API_BACKEND == "async" else 4,
+            on_progress=_progress, backend=API_BACKEND, baseline_uploads=BASELINE_UPLOADS, errors=errors
+        )
+        pb.empty(); st_text.empty()
+        return results
+    except Exception as e:
+        errors.append(str(e))
+        return []
+
+def search_youtube_deep(api_key, keyword, target_count, unit_budget, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0):
+    """기간 분할 딥 채굴 -> (결과, 구간별 커버리지)"""
+    if not api_key or not keyword: return [], []
+    key = search_cache_key(keyword, target_count, p_after, p_before, duration_mode, min_view, min_sub,
+                           mode="deep", budget=int(unit_budget), baseline=BASELINE_UPLOADS)
+    value = coalesced_search(key, lambda errors: _search_youtube_deep_live(
+        api_key, keyword, target_count, unit_budget, p_after, p_before, duration_mode, min_view, min_sub, errors),
+        size=lambda v: len(v['results']))
+    return value['results'], value['slices']
+
+def _search_youtube_deep_live(api_key, keyword, target_count, unit_budget, p_after, p_before, duration_mode="전체", min_view=0, min_sub=0, errors=None):
+    try:
+        pb = st.progress(0); st_text = st.empty()
+        def _progress(done, total, msg):
+            pb.progress(min(done/total, 1.0) if total else 0.0)
+            st_text.text(msg)
+        results, slices = mine_time_sliced(
+            api_key, keyword, target_count, p_after, p_before, duration_mode, min_view, min_sub,
+            unit_budget=unit_budget, max_workers=8 if API_BACKEND == "async" else 4,
+            on_progress=_progress, backend=API_BACKEND, baseline_uploads=BASELINE_UPLOADS, errors=errors
+        )
+        pb.empty(); st_text.empty()
+        return {'results': results, 'slices': slices}
+    except Exception as e:
+        errors.append(str(e))
+        return {'results': [], 'slices': []}
+
+def refresh_search_results(api_key):
+    """현재 결과의 조회수/구독자 통계만 다시 받기 (재검색 없음, 50개당 1 unit)"""
+    try:
+        youtube = build_service(api_key, API_BACKEND)
+        baseline_fn = (lambda cs: compute_channel_baselines(api_key, cs, BASELINE_UPLOADS, API_BACKEND)) if BASELINE_UPLOADS else None
+        return refresh_statistics(youtube, st.session_state.search_results, baseline_fn)
+    except Exception as e:
+        st.error(f"새로고침 오류: {e}")
+        return None
+
 # === [5] 팝업 (모달) ===
 @st.dialog("스크립트 확인")
 def open_script_modal(video_id, title):
     limit = 5
-    is_cached = video_id in st.session_state.scripts_map
+    content = get_cached_script(video_id)
+    is_cached = content is not None
+    prefetcher.record_open('script', video_id, is_cached)
     
     if not usage_mgr.is_pro() and not is_cached and not usage_mgr.can_download_script():
         st.error(f"🔒 일일 스크립트 추출 한도({limit}회) 초과!"); return
 
     if not is_cached:
         with st.spinner("⛏️ 대본 채굴 중..."):
-            text, err = get_youtube_transcript(video_id)
+            content, err = get_youtube_transcript(video_id)
             if err: st.error(err); return
-            st.session_state.scripts_map[video_id] = text
-            if not usage_mgr.is_pro(): usage_mgr.increment_script()
+            put_cached_script(video_id, content)
+            usage_mgr.increment_script()
+            lake_append('text', usage_mgr.uid, 'script', video_id, content, lake_keyword_of(video_id), title)
+    index_text(video_id, 'script', content, title)   # 캐시 적중도 색인 (예전 캐시 보충)
 
-    content = st.session_state.scripts_map.get(video_id, "")
     c1, c2 = st.columns([2,1])
     c1.write(f"길이: {len(content):,}자")
     c2.download_button("💾 저장 (TXT)", content, f"script_{video_id}.txt", use_container_width=True)
@@ -451,11 +783,19 @@ def open_script_modal(video_id, title):
 @st.dialog("댓글 확인")
 def open_comment_modal(video_id, title, key):
     if not key: st.error("키 필요"); return
-    if video_id not in st.session_state.comments_map:
+    comments = get_cached_comments(video_id, comment_pages())
+    prefetcher.record_open('comments', video_id, comments is not None)
+    if comments is None:
         with st.spinner("댓글 로딩..."):
-            st.session_state.comments_map[video_id] = get_video_comments(key, video_id)
-    
-    comments = st.session_state.comments_map.get(video_id, [])
+            errors = []
+            comments = get_video_comments(key, video_id, errors)
+            if errors: st.caption(f"⚠️ 일부 페이지를 가져오지 못했습니다: {errors[0]}")
+            elif comments:  # 실패(빈/부분 결과)는 저장 안 함
+                put_cached_comments(video_id, comment_pages(), comments)
+                lake_append('text', usage_mgr.uid, 'comments', video_id, "\n".join(c['text'] for c in comments), lake_keyword_of(video_id), title,
+                            items=len(comments))
+    if comments: index_text(video_id, 'comments', "\n".join(c['text'] for c in comments), title)
+
     txt = io.StringIO()
     for c in comments: txt.write(f"[{c['author']}] {c['likes']}👍\n{c['text']}\n---\n")
     
@@ -475,6 +815,49 @@ def open_comment_modal(video_id, title, key):
 
 def update_sel(idx): st.session_state.search_results.at[idx, 'selected'] = st.session_state[f"chk_{idx}"]
 
+# 채굴 데이터 분석 페이지 (사이드바 '📊 채굴 데이터 분석' 에서 열기). 현재 사용자(owner)의 데이터만,
+# owner/기간/키워드 조건은 파티션 가지치기에 그대로 쓰인다
+def render_lake_page():
+    st.title("📊 채굴 데이터 분석")
+    owner = usage_mgr.uid
+    ls = data_lake.stats(owner)
+    st.caption(f"데이터 레이크: 파티션 {ls['partitions']:,}개 · 파일 {ls['files']:,}개 · {ls['bytes'] / 1e6:.1f} MB"
+               + (f" | 마지막 압축: {datetime.fromtimestamp(lake_compactor.last_run).strftime('%m-%d %H:%M')}" if lake_compactor.last_run else ""))
+    if not ls['files']:
+        st.info("아직 쌓인 데이터가 없습니다. 검색/새로고침/대본·댓글 확인 결과가 자동으로 저장됩니다."); return
+    try: import duckdb  # noqa: F401
+    except ImportError:
+        st.error("분석에는 duckdb 패키지가 필요합니다. (pip install duckdb)"); return
+
+    c1, c2 = st.columns([1, 2])
+    rng = c1.date_input("기간", (date.today() - timedelta(days=30), date.today()), key="lake_range")
+    kws = c2.multiselect("키워드 (비우면 전체)", data_lake.keywords(owner), key="lake_keywords")
+    if not isinstance(rng, (tuple, list)) or len(rng) != 2:
+        st.caption("기간의 끝 날짜를 선택해주세요."); return
+
+    t0 = time.perf_counter()
+    top = data_lake.top_breakout_channels(owner, rng[0], rng[1], kws)
+    grades = data_lake.grade_distribution(owner, rng[0], rng[1], kws)
+    durations = data_lake.duration_vs_ratio(owner, rng[0], rng[1], kws)
+    st.caption(f"조회 {(time.perf_counter() - t0) * 1000:.0f} ms · 영상은 (키워드, 영상)별 가장 최근 스냅샷 기준")
+    if grades.empty:
+        st.info("선택한 기간/키워드에 해당하는 데이터가 없습니다."); return
+
+    tab1, tab2, tab3 = st.tabs(["🏆 떡상 채널", "📶 키워드별 등급 분포", "⏱️ 영상 길이 vs 떡상지표"])
+    with tab1:
+        st.caption("🚀 초대박 / 💎 전설 등급 영상이 많은 채널")
+        st.dataframe(top.rename(columns={'channel': '채널', 'breakouts': '떡상 영상', 'best_ratio': '최고 떡상지표', 'channel_id': '채널 ID'}),
+                     hide_index=True, use_container_width=True)
+    with tab2:
+        pivot = grades.pivot_table(index='keyword', columns='grade', values='videos', fill_value=0)
+        st.bar_chart(pivot)
+        st.dataframe(pivot, use_container_width=True)
+    with tab3:
+        st.bar_chart(durations.set_index('duration')[['median_ratio']])
+        st.dataframe(durations.rename(columns={'duration': '영상 길이', 'videos': '영상 수', 'median_ratio': '떡상지표 중앙값',
+                                               'avg_ratio': '떡상지표 평균', 'breakout_pct': '🚀/💎 비율(%)'}).round(2),
+                     hide_index=True, use_container_width=True)
+
 # ============================================================================
 # [6] 메인 UI 레이아웃
 # ============================================================================
@@ -486,6 +869,8 @@ st.markdown("""
 *"베타 버전인 만큼 버그가 있을 수 있습니다. 우리가 함께 이 프로그램을 완성해 나가는 겁니다."*
 """)
 
+profiler.lap('setup')  # 페이지 설정, CSS, 상태/캐시 초기화
+
 # --- Sidebar UI ---
 with st.sidebar:
     st.header("🔑 기본 설정")
@@ -500,6 +885,8 @@ with st.sidebar:
     
     if u_key != saved_key:
         st.query_params["api_key"] = u_key
+    usage_mgr.bind(u_key)
+    restore_session_state(usage_mgr.uid)
 
     # API 연결 확인
     if u_key:
@@ -532,17 +919,38 @@ with st.sidebar:
         st.info("💎 현재 **구독자(무제한)** 모드입니다.")
     else:
         stt = usage_mgr.get_status()
-        st.warning(f"📅 체험판: 검색 {stt['search_count']}/10회 | 스크립트 {stt['script_count']}/5회")
+        st.warning(f"📅 체험판: 검색 {stt['search_count']}/{FREE_SEARCH_LIMIT}회 | 스크립트 {stt['script_count']}/{FREE_SCRIPT_LIMIT}회")
 
     st.divider()
     
     # 3. 검색 조건 (여기가 중요합니다!)
     st.header("검색 조건")
     st.caption("키워드")
-    kw = st.text_input("키워드", value="60대 후회 사연", label_visibility="collapsed") # 추천 키워드 기본값 적용
+    multi_mode = st.toggle("📚 다중 키워드 모드", value=False, disabled=not usage_mgr.is_pro(), help="여러 키워드를 한 번에 채굴합니다. (구독자 전용)")
+    if multi_mode and usage_mgr.is_pro():
+        kw_text = st.text_area("키워드 목록", value="60대 후회 사연", height=120, label_visibility="collapsed", help="한 줄에 하나씩 (쉼표 구분도 가능)")
+        kw_list = tuple(dict.fromkeys(k.strip() for k in re.split(r'[\n,]', kw_text) if k.strip()))
+        st.caption(f"키워드 {len(kw_list)}개")
+        kw = kw_list[0] if kw_list else ""
+    else:
+        multi_mode = False
+        kw_list = ()
+        kw = st.text_input("키워드", value="60대 후회 사연", label_visibility="collapsed") # 추천 키워드 기본값 적용
     
-    limit_cnt = 50 if usage_mgr.is_pro() else 30
-    st.caption(f"최대 검색 결과: {limit_cnt}개")
+    deep_mode = False
+    if not multi_mode:
+        deep_mode = st.toggle("⏱️ 기간 분할 딥 채굴", value=False, disabled=not usage_mgr.is_pro(),
+                              help="기간을 잘게 나눠 검색 한도(수백 개) 이상을 모읍니다. 결과가 꽉 찬 구간은 자동으로 반으로 나눕니다. (구독자 전용)")
+        deep_mode = deep_mode and usage_mgr.is_pro()
+    if deep_mode:
+        c_dp1, c_dp2 = st.columns(2)
+        with c_dp1: limit_cnt = st.selectbox("목표 영상 수", [500, 1000, 2000, 5000], index=1)
+        with c_dp2: unit_budget = st.number_input("검색 할당량 (units)", min_value=400, max_value=50000, value=5000, step=400,
+                                                  help="search.list 1페이지 = 100 units. 통계 보강(50개당 1 unit)은 별도입니다.")
+        st.caption(f"최대 검색 {unit_budget // 100}페이지 · 기간 '전체'는 최근 1년을 나눕니다.")
+    else:
+        limit_cnt = 50 if usage_mgr.is_pro() else 30
+        st.caption(f"최대 검색 결과: {limit_cnt}개")
     
     # [날짜 계산 로직 복구]
     st.caption("기간")
@@ -582,54 +990,262 @@ with st.sidebar:
     )
 
     st.write("") 
-    if st.button("🔍 검색 시작", type="primary", use_container_width=True):
+    search_clicked = st.button("🔍 검색 시작", type="primary", use_container_width=True)
+
+    # 4. 최근 검색 기록 (공유 저장소, 사용자별)
+    with st.expander("🕘 최근 검색 기록"):
+        history = state_store.list(history_key(usage_mgr.uid), limit=10)
+        if not history: st.caption("아직 기록이 없습니다.")
+        can_export = bool(history) and usage_mgr.is_pro()
+        if can_export:
+            hist_fmt = st.selectbox("기록 내보내기 형식", available_formats(), key="hist_export_fmt")
+        for h_i, h in enumerate(history):
+            hc1, hc2, hc3 = st.columns([3, 1, 1])
+            hc1.caption(f"{h['ts']} | {', '.join(h['keywords'])[:30]} ({h['count']}개)")
+            if can_export and h['results']:
+                # 결과 세트 전체 (선택 여부와 무관), 누를 때만 변환
+                hc3.download_button("⬇️", key=f"hist_dl_{h_i}", help=f"이 검색 결과 전체를 {hist_fmt} 로 받기",
+                                    data=lambda rows=h['results'], f=hist_fmt: export_bytes(
+                                        sort_results(compact_results(pd.DataFrame(rows)), "기본순"), f),
+                                    file_name=export_file_name(f"youtube_history_{h_i + 1}", hist_fmt),
+                                    mime=EXPORT_FORMATS[hist_fmt][1], use_container_width=True)
+            if hc2.button("열기", key=f"hist_{h_i}", use_container_width=True):
+                st.session_state.search_results = compact_results(pd.DataFrame(h['results']))
+                st.session_state.slice_report = []
+                st.session_state.lake_keyword = h['keywords'][0] if h['keywords'] else None
+                st.rerun()
+
+    # 5. 채널 감시 (고정 채널의 새 업로드 -> 떡상 피드)
+    pinned = channel_watcher.store.pinned(usage_mgr.uid)   # 내가 고정한 채널만 (키가 없으면 비어 있음)
+    with st.expander(f"📌 채널 감시 ({len(pinned)})"):
+        if not pinned: st.caption("결과에서 영상을 선택하고 '📌 채널 고정'을 누르면 그 채널의 새 업로드를 추적합니다.")
+        else:
+            last = datetime.fromtimestamp(channel_watcher.last_run).strftime("%m-%d %H:%M") if channel_watcher.last_run else "-"
+            cw_error = channel_watcher.errors.get(usage_mgr.uid)
+            st.caption(f"{channel_watcher.interval_sec // 60}분마다 자동 점검 · 마지막: {last} · 1회 약 {len(pinned)} units (+ 영상 50개당 1 unit)"
+                       + (f" | ⚠️ {cw_error}" if cw_error else ""))
+            cw1, cw2 = st.columns(2)
+            if cw1.button("🔄 지금 점검", use_container_width=True):
+                if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+                else:
+                    with st.spinner("채널 새 업로드 확인 중..."):
+                        summary = channel_watcher.poll_once(usage_mgr.uid)
+                    if summary: st.toast(f"📌 새 영상 {summary['new']}개 · 새 떡상 {len(summary['breakouts'])}개")
+            if cw2.button("결과로 보기", use_container_width=True):
+                watched_rows = channel_watcher.store.rows(usage_mgr.uid)
+                if watched_rows:
+                    st.session_state.search_results = compact_results(pd.DataFrame(watched_rows)).sort_values(
+                        'view_sub_ratio', ascending=False).reset_index(drop=True)
+                    st.session_state.slice_report = []
+                    st.rerun()
+                else: st.toast("아직 점검한 영상이 없습니다.")
+            feed = channel_watcher.store.breakouts(usage_mgr.uid, limit=10)
+            if feed: st.caption("🔔 떡상 피드")
+            for b_ts, r in feed:
+                # 제목/채널은 외부 입력 -> HTML 이스케이프 (링크 텍스트의 [] 는 마크다운 링크를 깨므로 ())
+                link_title = html.escape(r['title'][:28] or r['video_id']).replace('[', '(').replace(']', ')')
+                st.markdown(f"{html.escape(r['breakout_grade'] or r['performance'])} [{link_title}](https://youtube.com/watch?v={r['video_id']})  \n"
+                            f"<small>{html.escape(r['channel'])} · 조회수 {r['view_count']:,} · {datetime.fromtimestamp(b_ts).strftime('%m-%d %H:%M')}</small>",
+                            unsafe_allow_html=True)
+            drop = st.multiselect("고정 해제", [c['channel_id'] for c in pinned],
+                                  format_func=lambda cid: next(c['title'] for c in pinned if c['channel_id'] == cid))
+            if drop and st.button("선택 채널 해제", use_container_width=True):
+                channel_watcher.store.unpin(usage_mgr.uid, drop)
+                st.rerun()
+
+    if search_clicked:
         if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
         elif not usage_mgr.can_search(): st.error("🔒 일일 검색 한도 초과!"); st.info("구독자 비밀번호를 입력하세요!")
         else:
             st.session_state.trigger = True
-            st.session_state.comments_map = {}
-            st.session_state.scripts_map = {}
             usage_mgr.increment_search()
+            prefetcher.cancel(prefetch_owner())   # 이전 검색의 미리 받기는 중단
+            st.session_state.lake_page = False    # 분석 페이지를 보고 있었으면 결과 화면으로
+
+    # 6. 키워드 감시 (현재 검색 조건을 저장해 주기적으로 증분 실행 -> 🚀/💎 알림)
+    watch_jobs = keyword_scheduler.store.jobs(usage_mgr.uid)   # 내 작업만 (실행은 작업마다 등록한 사용자의 키로)
+    n_unread = keyword_scheduler.store.unread_count(usage_mgr.uid)
+    with st.expander(f"⏰ 키워드 감시 ({len(watch_jobs)})" + (f" · 🔔 {n_unread}" if n_unread else "")):
+        kw1, kw2 = st.columns([1, 1])
+        w_interval = kw1.selectbox("실행 간격", INTERVAL_OPTIONS_MIN, index=2, format_func=lambda m: f"{m // 60}시간마다",
+                                   label_visibility="collapsed")
+        if kw2.button("➕ 현재 조건 감시", use_container_width=True, disabled=not usage_mgr.is_pro() or multi_mode or deep_mode,
+                      help="위 키워드/기간/영상 길이/최소 조건으로 자동 검색합니다. 두 번째 실행부터는 직전 실행 이후 올라온 영상만 찾습니다. (구독자 전용)"):
+            if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+            elif not kw.strip(): st.toast("키워드를 입력해주세요!")
+            else:
+                keyword_scheduler.store.add_job(usage_mgr.uid, u_key, kw, p_after, prd, dur_option, min_view_input, min_sub_input,
+                                                limit_cnt, w_interval)
+                st.toast(f"⏰ '{kw}' 감시 추가 (곧 첫 실행)")
+                st.rerun()
+        for job in watch_jobs:
+            jc1, jc2, jc3 = st.columns([3, 1, 1])
+            last = datetime.fromtimestamp(job['last_run']).strftime("%m-%d %H:%M") if job['last_run'] else "대기"
+            jc1.caption(f"{'▶' if job['enabled'] else '⏸'} {job['keyword'][:20]} · {job['interval_min'] // 60}h · 마지막 {last}"
+                        + (f" (새 {job['last_count']})" if job['last_run'] else "") + (" · 밀린 영상 이어 찾는 중" if job['backfill_before'] else "")
+                        + (f" ⚠️ {job['last_error'][:40]}" if job['last_error'] else ""))
+            if jc2.button("⏸" if job['enabled'] else "▶", key=f"wjob_toggle_{job['id']}", use_container_width=True):
+                keyword_scheduler.store.set_enabled(usage_mgr.uid, job['id'], not job['enabled'])
+                st.rerun()
+            if jc3.button("🗑", key=f"wjob_del_{job['id']}", use_container_width=True):
+                keyword_scheduler.store.remove_job(usage_mgr.uid, job['id'])
+                st.rerun()
+        if watch_jobs and st.button("▶️ 지금 모두 실행", use_container_width=True):
+            if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+            else:
+                for job in watch_jobs:
+                    if job['enabled']: keyword_scheduler.store.run_now(usage_mgr.uid, job['id'])
+                with st.spinner("감시 키워드 검색 중..."):
+                    ran = keyword_scheduler.run_due(usage_mgr.uid)
+                st.toast(f"⏰ {ran}개 작업 실행")
+                st.rerun()   # 알림 수/기록 다시 그리기
+        alerts = keyword_scheduler.store.alerts(usage_mgr.uid, limit=15)
+        if alerts:
+            st.caption("🔔 떡상 알림 (🚀 초대박 / 💎 전설)")
+            for a in alerts:
+                r = a['row']
+                link_title = html.escape(r['title'][:28] or r['video_id']).replace('[', '(').replace(']', ')')
+                st.markdown(f"{'' if a['is_read'] else '🆕 '}{html.escape(r['breakout_grade'])} [{link_title}](https://youtube.com/watch?v={r['video_id']})  \n"
+                            f"<small>{html.escape(a['keyword'])} · {html.escape(r['channel'])} · 조회수 {r['view_count']:,} · 구독자 대비 {r['view_sub_ratio']:.1f}배</small>",
+                            unsafe_allow_html=True)
+            if n_unread and st.button("모두 읽음", use_container_width=True):
+                keyword_scheduler.store.mark_all_read(usage_mgr.uid)
+                st.rerun()
+
+    # 7. 대본/댓글 전문 검색 (확인한 대본·댓글 전체에서)
+    with st.expander("🔎 대본·댓글 검색"):
+        ix_stats = text_index.stats()
+        st.caption(f"색인: 영상 {ix_stats['videos']:,}개 · 문서 {ix_stats['docs']:,}개 · {ix_stats['chars']:,}자 (대본/댓글을 열면 자동 추가)")
+        fts_q = st.text_input("검색어", placeholder="예: 퇴직금 후회", label_visibility="collapsed", key="fts_query")
+        fts_kind = st.radio("대상", ["전체", "대본", "댓글"], horizontal=True, label_visibility="collapsed", key="fts_kind")
+        if fts_q.strip():
+            t0 = time.perf_counter()
+            hits = text_index.search(fts_q, limit=20, kind={"대본": 'script', "댓글": 'comments'}.get(fts_kind))
+            st.caption(f"{len(hits)}건 · {(time.perf_counter() - t0) * 1000:.0f} ms")
+            for h in hits:
+                link_title = html.escape(h['title'][:30] or h['video_id']).replace('[', '(').replace(']', ')')
+                st.markdown(f"{'📜' if h['kind'] == 'script' else '💬'} [{link_title}](https://youtube.com/watch?v={h['video_id']})"
+                            f" <small>{html.escape(h['channel'])}</small>  \n<small>{h['snippet']}</small>", unsafe_allow_html=True)
+
+    # 8. 채굴 데이터 분석 (내가 쌓은 검색/새로고침 결과를 DuckDB 로 집계)
+    with st.expander("📊 채굴 데이터 분석"):
+        st.toggle("분석 페이지 열기", key="lake_page", help="기간·키워드별 떡상 채널, 등급 분포, 영상 길이별 떡상지표")
+        if st.button("🗜️ 지금 압축", use_container_width=True, help="작은 Parquet 파일이 많이 쌓인 파티션을 하나로 합칩니다."):
+            done = lake_compactor.compact_once()
+            st.toast(f"🗜️ 파티션 {done['partitions']}개 압축 (파일 {done['files']}개 줄임)" if done else f"압축 실패: {lake_compactor.last_error}")
+
+    # 9. 관리자 (ADMIN_PW 시크릿이 설정된 경우에만 표시)
+    ADMIN_PW = st.secrets.get("ADMIN_PW", "")
+    if ADMIN_PW:
+        with st.expander("🛠️ 관리자"):
+            if st.text_input("관리자 비밀번호", type="password", key="admin_pw") == ADMIN_PW:
+                st.caption("📊 일별 사용량 (전체 사용자 합계)")
+                summary = usage_summary()
+                st.dataframe(summary.rename(columns={'date': '날짜', 'users': '사용자', 'search': '검색', 'script': '스크립트', 'units': 'API units'}),
+                             hide_index=True, use_container_width=True)
+                st.bar_chart(summary.set_index('date')[['search', 'script']])
+
+                st.caption("📡 외부 호출 지표 (이 프로세스)")
+                calls = pd.DataFrame(METRICS.snapshot())
+                if calls.empty: st.info("아직 기록된 호출이 없습니다.")
+                else:
+                    st.dataframe(calls[['kind', 'target', 'calls', 'errors', 'retries', 'avg_ms', 'p50_ms', 'p95_ms', 'avg_bytes']].rename(columns={
+                        'kind': '종류', 'target': '대상', 'calls': '호출', 'errors': '실패', 'retries': '재시도',
+                        'avg_ms': '평균(ms)', 'p50_ms': 'p50(ms)', 'p95_ms': 'p95(ms)', 'avg_bytes': '평균 크기(B)'}),
+                        hide_index=True, use_container_width=True)
+                st.download_button("⬇️ Prometheus 텍스트", METRICS.render_prometheus(), "metrics.txt", use_container_width=True)
+                sf = search_flight.stats()
+                st.caption(f"🤝 동시 동일 검색 합치기: 실행 {sf['leaders']}회 · 합류 {sf['coalesced']}회"
+                           f" ({sf['coalesced'] / max(sf['leaders'] + sf['coalesced'], 1) * 100:.0f}% 절약) · 진행 중 {sf['in_flight']}건")
+                pf = prefetcher.stats()
+                done = sum(v for (_, o), v in pf['jobs'].items() if o == 'done')
+                st.caption(f"⚡ 대본/댓글 미리 받기: 완료 {done}건 · 대기 {pf['queued']}건 · 모달 {pf['opens']}회 중 즉시 열림 "
+                           f"{pf['hit_rate'] * 100:.0f}% (미리 받은 덕분 {pf['prefetch_hit_rate'] * 100:.0f}%)")
+                st.caption("🚦 동시 실행 제한 (active = 실행 중, waiting = 대기열, shed = 차단)")
+                st.dataframe(pd.DataFrame(admission.stats()), hide_index=True, use_container_width=True)
+                st.caption("📦 결과 세트 메모리 (행당 바이트: 이전 스키마 → 압축 스키마)")
+                sets = [('현재 세션', st.session_state.search_results)] + \
+                       [(f"{h['ts']} {', '.join(h['keywords'])[:20]}", h['results']) for h in state_store.list(history_key(usage_mgr.uid), limit=20)]
+                mem = pd.DataFrame(measure_result_sets(sets))
+                if not mem.empty:
+                    st.dataframe(mem.rename(columns={'set': '결과 세트', 'rows': '행', 'before_bpr': '이전 B/행', 'after_bpr': '압축 B/행', 'saving_pct': '절감(%)'}),
+                                 hide_index=True, use_container_width=True)
+                breakers = breaker_states()
+                if breakers:
+                    st.caption("🔌 엔드포인트 서킷 상태 (open = 연속 실패로 일시 차단)")
+                    st.dataframe(pd.DataFrame(breakers).rename(columns={'endpoint': '엔드포인트', 'state': '상태', 'failures': '연속 실패'}),
+                                 hide_index=True, use_container_width=True)
+
+profiler.lap('sidebar')
+
+# === 분석 페이지 (켜져 있으면 검색 결과 대신 표시) ===
+if st.session_state.get('lake_page'):
+    render_lake_page()
+    st.stop()
 
 # === Main Content (함수 호출부) ===
 if st.session_state.get('trigger', False):
     st.session_state.trigger = False
     
-    # 검색 함수 호출
-    res = search_youtube(
-        u_key, kw, limit_cnt, p_after, p_before, dur_option, min_view_input, min_sub_input
-    )
+    # 검색 함수 호출 (동시 검색 대기열이 넘치면 shed = Overloaded)
+    shed = None
+    try:
+        if multi_mode:
+            res = search_youtube_multi(
+                u_key, kw_list, limit_cnt, p_after, p_before, dur_option, min_view_input, min_sub_input
+            )
+        elif deep_mode:
+            res, st.session_state.slice_report = search_youtube_deep(
+                u_key, kw, limit_cnt, unit_budget, p_after, p_before, dur_option, min_view_input, min_sub_input
+            )
+        else:
+            res = search_youtube(
+                u_key, kw, limit_cnt, p_after, p_before, dur_option, min_view_input, min_sub_input
+            )
+    except Overloaded as e:
+        res, shed = [], e
     
-    if res:
+    if not deep_mode or shed: st.session_state.slice_report = []
+    if shed: st.warning(shed.message)
+    elif res:
         # 1. 일단 결과를 데이터프레임으로 만듭니다.
         df_temp = pd.DataFrame(res)
         
         # 🛡️ [핵심 수정] video_id가 같은 중복 데이터는 여기서 강제로 삭제합니다.
         # (keep='first'는 첫 번째 발견된 것만 남기고 나머지는 버린다는 뜻입니다)
         df_temp = df_temp.drop_duplicates(subset=['video_id'], keep='first').reset_index(drop=True)
+        df_temp = compact_results(df_temp)  # 좁은 정수형/categorical, url·썸네일은 화면에서 생성
         
         # 2. 중복이 제거된 깔끔한 데이터를 세션에 저장합니다.
         st.session_state.search_results = df_temp
-        save_state({'search_results':st.session_state.search_results})
+        velocity.store.append(dict(zip(df_temp['video_id'], df_temp['view_count'])))  # 첫 스냅샷
+        st.session_state.lake_keyword = None if multi_mode else kw   # 다중 키워드 행은 keywords 컬럼으로 파티션
+        lake_append('results', usage_mgr.uid, df_temp, 'search', st.session_state.lake_keyword)
+        save_state(usage_mgr.uid, {'search_results':st.session_state.search_results})
+        add_search_history(usage_mgr.uid, kw_list if multi_mode else [kw], df_temp, period=prd, duration=dur_option,
+                           min_view=int(min_view_input), min_sub=int(min_sub_input))
         
         # 떡상지표 정렬
         if 'view_sub_ratio' in st.session_state.search_results.columns:
             st.session_state.search_results = st.session_state.search_results.sort_values(
                 by='view_sub_ratio', ascending=False
             ).reset_index(drop=True)
+        schedule_prefetch(u_key, st.session_state.search_results)
             
         # 결과 메시지 (중복 제거 후의 실제 개수를 보여줍니다)
         st.toast(f"🎉 채굴 완료! 중복을 제외하고 {len(st.session_state.search_results)}개의 영상을 찾았습니다.", icon="⛏️")
         st.balloons()        
     else: 
         st.warning(f"설정하신 조건(조회수 {min_view_input}회 이상, 구독자 {min_sub_input}명 이상)에 맞는 영상을 찾지 못했습니다.")
+profiler.lap('search')
+
 # 결과 화면
 if not st.session_state.search_results.empty:
     st.divider()
     
     # 👇👇 [추가됨] 등급 아이콘 설명 가이드 (Legend) 👇👇
     with st.expander("ℹ️ 등급 아이콘 설명 보기", expanded=False):
-        st.markdown("""
+        st.markdown(f"""
         **[떡상지표 등급 기준]** (구독자 수 대비 조회수 비율)
         * 💎 **전설 (5.0배↑)** : 구독자 수의 5배 이상 조회된 레전드 영상
         * 🚀 **초대박 (2.0배↑)** : 구독자 수의 2배 이상 조회된 영상
@@ -637,13 +1253,71 @@ if not st.session_state.search_results.empty:
         * 👌 **양호 (0.5배↑)** : 구독자 수의 절반 이상이 시청함
         
         ---
-        **[성과지표 기준]** (채널 평균 조회수 대비)
+        **[성과지표 기준]** (채널 최근 업로드 {BASELINE_UPLOADS}개의 조회수 중앙값 대비, 없으면 채널 평균 대비)
         * 🔥🔥 **초대박**: 평소 조회수보다 200% 이상 잘 나옴
         * 🔥 **떡상**: 평소보다 100% 이상 잘 나옴
         * 👍 **양호**: 평소보다 50% 이상 잘 나옴
         """)
     # 👆👆 ------------------------------------------ 👆👆
 
+    # 딥 채굴 구간별 커버리지
+    if st.session_state.get('slice_report'):
+        sl = pd.DataFrame(st.session_state.slice_report)
+        n_trunc = int(sl['status'].isin(['truncated', 'skipped', 'failed']).sum())
+        with st.expander(f"⏱️ 기간 분할 커버리지: 구간 {len(sl)}개 · 검색 {int(sl['pages'].sum())}페이지"
+                         + (f" · 덜 받은 구간 {n_trunc}개" if n_trunc else " · 전 구간 수집 완료")):
+            st.caption("complete = 구간 전부 수집 / split = 꽉 차서 둘로 나눔 / truncated = 꽉 찼지만 더 못 나눔 / skipped = 목표·예산 도달로 미실행")
+            sl['after'] = sl['after'].str[:16].str.replace('T', ' ')
+            sl['before'] = sl['before'].str[:16].str.replace('T', ' ')
+            st.dataframe(sl.rename(columns={'after': '시작(UTC)', 'before': '끝(UTC)', 'depth': '분할 깊이', 'pages': '페이지',
+                                            'found': '수집', 'new': '신규', 'status': '상태'}),
+                         hide_index=True, use_container_width=True)
+
+    # 통계 새로고침 (재검색 없이 videos/channels.list 만 호출)
+    c_ref1, c_ref2 = st.columns([1.5, 6.5])
+    if c_ref1.button("🔄 통계 새로고침", use_container_width=True, help="검색 없이 현재 결과의 조회수/구독자 수만 다시 가져옵니다. (할당량 50개당 1 unit)"):
+        if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+        else:
+            with st.spinner("📈 최신 통계 가져오는 중..."):
+                refreshed = refresh_search_results(u_key)
+            if refreshed is not None:
+                refreshed = compact_results(refreshed)
+                st.session_state.search_results = refreshed
+                velocity.store.append(dict(zip(refreshed['video_id'], refreshed['view_count'])))
+                lake_append('results', usage_mgr.uid, refreshed, 'refresh', st.session_state.get('lake_keyword'))
+                st.session_state.last_refreshed = datetime.now().strftime("%Y-%m-%d %H:%M")
+                save_state(usage_mgr.uid, {'search_results':st.session_state.search_results})
+                st.rerun()
+    if st.session_state.get('last_refreshed'):
+        c_ref2.caption(f"마지막 새로고침: {st.session_state.last_refreshed} (조회수 증가량/증가율은 직전 새로고침 대비)")
+
+    # 속도 추적: 현재 결과를 백그라운드 수집 대상에 등록
+    c_vel1, c_vel2 = st.columns([1.5, 6.5])
+    if c_vel1.button("📈 속도 추적", use_container_width=True, help=f"현재 결과의 조회수를 {velocity.interval_sec // 60}분마다 자동으로 기록해 시간당 조회수/가속도를 계산합니다."):
+        if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+        else:
+            # 내 추적 목록에 내 키로 등록 (수집도 이 키로)
+            velocity.store.watch(usage_mgr.uid, u_key, st.session_state.search_results['video_id'].tolist())
+            st.toast(f"📈 {len(st.session_state.search_results)}개 영상 추적 시작!")
+    n_watched = len(velocity.store.watched_ids(usage_mgr.uid)) if u_key else 0
+    if n_watched:
+        last = datetime.fromtimestamp(velocity.last_run).strftime("%H:%M") if velocity.last_run else "-"
+        vel_error = velocity.errors.get(u_key)
+        c_vel2.caption(f"추적 중: {n_watched}개 | 마지막 수집: {last}" + (f" | ⚠️ {vel_error}" if vel_error else ""))
+
+    # 채널 고정: 선택한 영상의 채널을 감시 목록에 추가 (검색 없이 새 업로드 추적)
+    c_pin1, c_pin2 = st.columns([1.5, 6.5])
+    if c_pin1.button("📌 채널 고정", use_container_width=True, help="선택한 영상의 채널을 감시합니다. 새 업로드는 검색(100 units) 대신 업로드 목록(채널당 1 unit)으로 확인합니다."):
+        picked = st.session_state.search_results[st.session_state.search_results['selected']]
+        if not u_key: st.toast("API Key를 입력해주세요!", icon="🚨")
+        elif picked.empty: st.toast("먼저 영상을 선택해주세요!", icon="📌")
+        else:
+            # 내 감시 목록에 내 키로 고정 (자동 점검도 이 키로)
+            chans = picked[['channel_id', 'channel']].astype(str).drop_duplicates('channel_id')
+            added = channel_watcher.store.pin(usage_mgr.uid, u_key, list(chans.itertuples(index=False, name=None)))
+            st.toast(f"📌 채널 {added}개 고정 (이미 고정: {len(chans) - added}개)")
+    c_pin2.caption("고정한 채널은 사이드바 '📌 채널 감시'에서 확인합니다.")
+
     # 상단 컨트롤 바 (리스트/카드, 필터, 버튼)
     c_top = st.columns([1.5, 3, 2, 1.5])
     
@@ -656,23 +1330,13 @@ if not st.session_state.search_results.empty:
         c_f1, c_f2 = st.columns([2, 2])
         filter_opt = c_f1.radio("필터", ["전체", "숏폼", "롱폼"], horizontal=True, label_visibility="collapsed")
         # [표준안 적용] 정렬 옵션 명칭 통일 ('떡상지표순')
-        sort_opt = c_f2.selectbox("정렬", ["기본순 (최신날짜)", "조회수 높은순", "떡상지표순", "성과지표순"], label_visibility="collapsed")
-    
-    # 데이터 필터링 & 정렬 적용
-    df = st.session_state.search_results.copy()
-    if filter_opt == "숏폼": 
-        df = df[df['is_shorts'] == True]
-    elif filter_opt == "롱폼": 
-        df = df[df['is_shorts'] == False]
+        sort_opt = c_f2.selectbox("정렬", ["기본순 (최신날짜)", "조회수 높은순", "떡상지표순", "성과지표순", "급상승순 (시간당 조회수)"], label_visibility="collapsed")
     
-    if "조회수" in sort_opt: df = df.sort_values('view_count', ascending=False)
-    elif "떡상" in sort_opt: df = df.sort_values('view_sub_ratio', ascending=False) # 변수명 view_sub_ratio 유지
-    elif "성과" in sort_opt: df = df.sort_values('performance', ascending=False)
-    else: df = df.sort_values('published_at', ascending=False) # 기본
-    
-    df["_original_index"] = df.index
-    df = df.reset_index(drop=True)
+    # 데이터 필터링 & 정렬 적용 (속도 지표는 스냅샷 저장소에서 붙임, 보기 상태가 같으면 재사용)
+    df, view_cache = cached_result_view(filter_opt, sort_opt)
     st.session_state["_current_filtered_df"] = df
+    profiler.lap('filter_sort')  # 범례/새로고침/속도 버튼 + 속도 컬럼 병합 + 필터/정렬
+    profiler.note(rows=len(st.session_state.search_results), shown=len(df), view=view)
 
     # 3. 전체 선택/해제
     with c_top[2]:
@@ -688,51 +1352,26 @@ if not st.session_state.search_results.empty:
                 st.session_state[f"chk_{i}"]=False
             st.rerun()
 
-    # 4. CSV 다운로드 (우측 끝)
+    # 4. 내보내기 (우측 끝) - CSV / Parquet / XLSX, 파일은 버튼을 눌렀을 때만 만든다
     with c_top[3]:
-        # 1. 체크된 항목만 가져오기
-        sel_rows = st.session_state.search_results[st.session_state.search_results['selected']].copy()
+        sel_rows = st.session_state.search_results[st.session_state.search_results['selected']]
         sel_count = len(sel_rows)
         
         st.caption(f"선택: {sel_count}개")
         
         if usage_mgr.is_pro():
+            export_fmt = st.selectbox("내보내기 형식", available_formats(), key="export_fmt", label_visibility="collapsed")
             if sel_count > 0:
-                # 👇👇 [핵심 추가] 화면에 보이는 '정렬 옵션'을 그대로 적용 👇👇
-                if "조회수" in sort_opt: 
-                    sel_rows = sel_rows.sort_values('view_count', ascending=False)
-                # [표준안 적용] 정렬 키워드 '떡상지표'로 통일
-                elif "떡상지표" in sort_opt: 
-                    sel_rows = sel_rows.sort_values('view_sub_ratio', ascending=False)
-                elif "성과" in sort_opt: 
-                    sel_rows = sel_rows.sort_values('performance', ascending=False)
-                elif "영상길이" in sort_opt: 
-                    sel_rows = sel_rows.sort_values('duration_sec', ascending=False)
-                else: 
-                    sel_rows = sel_rows.sort_values('published_at', ascending=False) # 기본값
-                # 👆👆 ---------------------------------------------------- 👆👆
-
-                export_df = sel_rows
-                
-                # 한글 자소 분리 방지 (NFC 정규화)
-                for col in ['title', 'channel']: 
-                    if col in export_df.columns:
-                        export_df[col] = export_df[col].apply(
-                            lambda x: unicodedata.normalize('NFC', str(x)) if isinstance(x, str) else x
-                        )
-
-                # CSV 변환 (사용자가 보기 편한 컬럼 순서로 배치)
-                csv = export_df[['thumbnail','title', 'url', 'view_count', 'published_at', 'view_sub_ratio', 'performance', 'duration_sec', 'view_diff', 'subscriber_count', 'comment_count', 'is_shorts', 'channel', 'video_id']].to_csv(index=False).encode('utf-8-sig')
-                
+                # 화면에 보이는 정렬 옵션을 그대로 적용 (정렬/변환은 다운로드 시점에)
                 st.download_button(
-                    label="📥 CSV 다운로드", 
-                    data=csv, 
-                    file_name="youtube_selected_data.csv", 
-                    mime="text/csv", 
+                    label=f"📥 {export_fmt} 다운로드", 
+                    data=lambda rows=sel_rows, s=sort_opt, f=export_fmt: export_bytes(sort_results(rows, s), f), 
+                    file_name=export_file_name("youtube_selected_data", export_fmt), 
+                    mime=EXPORT_FORMATS[export_fmt][1], 
                     use_container_width=True
                 )
             else:
-                st.button("📥 CSV 다운로드", disabled=True, use_container_width=True, help="리스트에서 영상을 먼저 선택해주세요.")
+                st.button(f"📥 {export_fmt} 다운로드", disabled=True, use_container_width=True, help="리스트에서 영상을 먼저 선택해주세요.")
         else:
             st.button("🔒 CSV (구독자용)", disabled=True, use_container_width=True, help="구독자 전용 기능입니다.")
 
@@ -744,15 +1383,20 @@ if not st.session_state.search_results.empty:
         "performance",       # 성과지표 (평균 대비)
         "breakout_grade",    # 떡상등급 (아이콘) [NEW]
         "view_sub_ratio",    # 떡상지표 (숫자)
-        "duration_sec"
+        "duration_sec",
+        "keywords",          # 다중 키워드 모드에서 매칭된 키워드
+        "view_delta",        # 새로고침 후 조회수 증가량
+        "growth_rate",       # 새로고침 후 조회수 증가율(%)
+        "views_per_hour",    # 시간당 조회수 (속도 추적)
+        "acceleration",      # 시간당 조회수 변화량 (속도 추적)
+        "outlier_score",     # 조회수 / 채널 기준선 (최근 업로드 중앙값)
+        "baseline_views"     # 채널 기준선 조회수
     ]
+    optional_cols = [c for c in optional_cols if c in df.columns]
     
     # 2. [초기화] 세션 상태 안전 초기화
     if "view_options_selected" not in st.session_state:
-        st.session_state.view_options_selected = [
-            "view_count", "subscriber_count", 
-            "performance", "breakout_grade", "view_sub_ratio" # 기본 선택에 포함
-        ]
+        st.session_state.view_options_selected = list(LIST_DEFAULT_COLS)  # 조회수/구독자/성과/떡상등급/떡상지표
 
     # 3. [UI] 컬럼 선택 기능
     if view == "리스트":
@@ -761,24 +1405,38 @@ if not st.session_state.search_results.empty:
             selected_cols = st.multiselect(
                 "📊 리스트 표시 항목:",
                 options=optional_cols,
-                default=st.session_state.view_options_selected,
+                default=[c for c in st.session_state.view_options_selected if c in optional_cols],
                 format_func=lambda x: {
                     "view_count": "조회수", "subscriber_count": "구독자수", 
                     "comment_count": "댓글수", "published_at": "발행시간", 
                     "performance": "성과지표(평균비)", 
                     "breakout_grade": "떡상등급", # [NEW]
                     "view_sub_ratio": "떡상지표(숫자)",
-                    "duration_sec": "영상길이"
+                    "duration_sec": "영상길이",
+                    "keywords": "키워드",
+                    "view_delta": "조회수 증가량",
+                    "growth_rate": "증가율(%)",
+                    "views_per_hour": "시간당 조회수",
+                    "acceleration": "가속도",
+                    "outlier_score": "이상치 점수(기준선 대비)",
+                    "baseline_views": "채널 기준선"
                 }.get(x, x)
             )
         st.session_state.view_options_selected = selected_cols
     else:
-        selected_cols = st.session_state.view_options_selected
+        selected_cols = [c for c in st.session_state.view_options_selected if c in optional_cols]
 
 # === [리스트 뷰] ===
     if view == "리스트":
-        fixed_cols = ["selected", "thumbnail", "url", "title"]
-        final_col_order = fixed_cols + selected_cols
+        final_col_order = list(LIST_FIXED_COLS) + selected_cols
+        # 보이는 컬럼 + 행 키만 브라우저로 보낸다 (투영도 보기 상태별로 캐시)
+        proj_key = tuple(final_col_order)
+        if proj_key not in view_cache['proj']:
+            view_cache['proj'] = {proj_key: project_columns(df, final_col_order)}
+        list_df = view_cache['proj'][proj_key]
+        if profiler.enabled:
+            profiler.note(payload_kb=round(arrow_payload_bytes(list_df) / 1024, 1),
+                          payload_full_kb=round(arrow_payload_bytes(df) / 1024, 1), cols=len(list_df.columns))
 
         # CSS 숨김 처리 (그대로 유지)
         st.markdown("""<style>[data-testid="stDataFrameToolbarButton"]:first-of-type,button[kind="icon"][title*="column"],div[data-testid="stDataFrameToolbar"] button:first-child {display: none !important; visibility: hidden !important;}</style>""", unsafe_allow_html=True)
@@ -788,7 +1446,7 @@ if not st.session_state.search_results.empty:
         dynamic_height = min((len(df) + 1) * 35 + 3, 1500)
 
         st.data_editor(
-            df, 
+            list_df, 
             key="list_view_editor",
             column_order=final_col_order, 
             column_config={
@@ -804,11 +1462,18 @@ if not st.session_state.search_results.empty:
                 "duration_sec": st.column_config.NumberColumn("길이(초)", format="%d초"),
                 
                 # [수정] 두 지표 분리 표시
-                "performance": st.column_config.TextColumn("성과지표", help="채널 평균 조회수 대비 성과"),
+                "performance": st.column_config.TextColumn("성과지표", help="채널 기준선(최근 업로드 중앙값) 대비 성과"),
                 "breakout_grade": st.column_config.TextColumn("떡상등급", help="구독자 대비 조회수 등급"),
                 "view_sub_ratio": st.column_config.NumberColumn("떡상지표", format="%.2f", help="조회수 / 구독자수"),
+                "keywords": st.column_config.TextColumn("키워드", help="이 영상이 검색된 키워드"),
+                "view_delta": st.column_config.NumberColumn("증가량", format="%d", help="직전 새로고침 대비 조회수 증가량"),
+                "growth_rate": st.column_config.NumberColumn("증가율", format="%.2f%%", help="직전 새로고침 대비 조회수 증가율"),
+                "views_per_hour": st.column_config.NumberColumn("시간당 조회수", format="%.1f", help="최근 두 스냅샷 사이의 시간당 조회수"),
+                "acceleration": st.column_config.NumberColumn("가속도", format="%.2f", help="시간당 조회수의 변화량 (조회수/시간²)"),
+                "outlier_score": st.column_config.NumberColumn("이상치", format="%.2f배", help="조회수 / 채널 최근 업로드 조회수 중앙값"),
+                "baseline_views": st.column_config.NumberColumn("채널 기준선", format="%d", help="채널 최근 업로드 조회수 중앙값"),
             },
-            disabled=["url", "title"] + optional_cols,
+            disabled=["url", "title"] + selected_cols,
             hide_index=True, 
             use_container_width=True, 
             height=800, 
@@ -857,3 +1522,18 @@ if not st.session_state.search_results.empty:
                         if c_b3.button("💬 댓글", key=f"c_{orig_idx}", use_container_width=True): 
 
                             open_comment_modal(row['video_id'], row['title'], u_key)
+
+    profiler.lap('render')  # 선택/CSV, 컬럼 옵션, 리스트(data_editor) 또는 카드 루프
+
+# === [프로파일링 패널] ===
+if profiler.enabled:
+    profiler.finish()
+    with st.expander(f"⏱️ 리런 프로파일 (최근 {len(profiler.history)}회)", expanded=False):
+        runs = pd.DataFrame(list(profiler.history)[::-1])
+        sections = [c for c in ['setup', 'sidebar', 'search', 'filter_sort', 'render'] if c in runs.columns]
+        st.caption("구간별 소요 시간(ms). 맨 위가 이번 리런입니다. (st.rerun 으로 끊긴 리런은 제외)")
+        summary = runs[sections + ['total']].agg(['mean', 'median', lambda x: x.quantile(0.95), 'max']).round(1)
+        summary.index = ['평균', '중앙값', 'p95', '최대']
+        st.dataframe(summary, use_container_width=True)
+        st.bar_chart(runs[::-1].reset_index(drop=True)[sections])
+        st.dataframe(runs, hide_index=True, use_container_width=True)
@@ -0,0 +1,251 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 외부 호출 계측 (시간 / 응답 크기 / 재시도 / 결과)
+# YouTube API(엔드포인트별), yt-dlp 추출, Google Sheets 읽기/쓰기를 감싸서
+#   - 프로세스 내 히스토그램/카운터로 집계
+#   - Prometheus 텍스트 형식으로 노출 (관리자 화면 또는 METRICS_PORT 의 /metrics)
+#   - 호출마다 JSON 한 줄 로그 (logger: miner.calls)
+# ============================================================================
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)                   # 초
+SIZE_BUCKETS = (1_000, 5_000, 20_000, 100_000, 500_000, 2_000_000, 10_000_000)        # 바이트
+
+call_log = logging.getLogger("miner.calls")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, b in enumerate(self.buckets):
+            if value <= b:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 경계 기준 근사 분위수"""
+        if not self.count: return 0.0
+        target, acc = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """(이름, 라벨) 별 카운터/히스토그램/게이지 모음 (스레드 안전)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            k = self._key(name, labels)
+            self.counters[k] = self.counters.get(k, 0) + amount
+
+    def set(self, name, value, **labels):
+        """게이지: 현재 값 (대기열 길이 등)"""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            k = self._key(name, labels)
+            if k not in self.histograms: self.histograms[k] = Histogram(buckets)
+            self.histograms[k].observe(value)
+
+    def snapshot(self):
+        """관리자 화면용 표: kind/target 별 호출 수, 오류 수, p50/p95 지연, 평균 응답 크기"""
+        with self._lock:
+            rows = {}
+            for (name, labels), h in self.histograms.items():
+                lb = dict(labels)
+                if name != 'external_call_duration_seconds': continue
+                r = rows.setdefault((lb['kind'], lb['target']), {'kind': lb['kind'], 'target': lb['target'], 'calls': 0, 'errors': 0,
+                                                                  '_sum': 0.0, '_hists': []})
+                r['calls'] += h.count
+                r['_sum'] += h.sum
+                r['_hists'].append(h)
+                if lb['outcome'] not in ('ok', 'not_modified'): r['errors'] += h.count
+            for (name, labels), h in self.histograms.items():
+                lb = dict(labels)
+                if name == 'external_call_payload_bytes' and (lb['kind'], lb['target']) in rows:
+                    rows[(lb['kind'], lb['target'])]['avg_bytes'] = h.sum / h.count if h.count else 0
+            for (name, labels), v in self.counters.items():
+                lb = dict(labels)
+                if name == 'external_call_retries_total' and (lb['kind'], lb['target']) in rows:
+                    rows[(lb['kind'], lb['target'])]['retries'] = v
+            out = []
+            for r in rows.values():
+                merged = Histogram(LATENCY_BUCKETS)
+                for h in r.pop('_hists'):
+                    merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+                    merged.count += h.count
+                r['avg_ms'] = r.pop('_sum') / r['calls'] * 1000 if r['calls'] else 0
+                r['p50_ms'] = merged.quantile(0.5) * 1000
+                r['p95_ms'] = merged.quantile(0.95) * 1000
+                r.setdefault('avg_bytes', 0)
+                r.setdefault('retries', 0)
+                out.append(r)
+            return sorted(out, key=lambda r: (r['kind'], r['target']))
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식"""
+        def fmt_labels(labels, extra=None):
+            items = list(labels) + (list(extra.items()) if extra else [])
+            if not items: return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), v in sorted(self.counters.items()):
+                    if n == name: lines.append(f"{name}{fmt_labels(labels)} {v}")
+            for name in sorted({n for n, _ in self.gauges}):
+                lines.append(f"# TYPE {name} gauge")
+                for (n, labels), v in sorted(self.gauges.items()):
+                    if n == name: lines.append(f"{name}{fmt_labels(labels)} {v}")
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), h in sorted(self.histograms.items(), key=lambda x: x[0]):
+                    if n != name: continue
+                    acc = 0
+                    for b, c in zip(h.buckets, h.counts):
+                        acc += c
+                        lines.append(f"{name}_bucket{fmt_labels(labels, {'le': b})} {acc}")
+                    lines.append(f"{name}_bucket{fmt_labels(labels, {'le': '+Inf'})} {h.count}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {h.sum}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def record_call(kind, target, duration, outcome, size=None, retries=0, error=None):
+    """외부 호출 1건 기록 (히스토그램 + JSON 로그)"""
+    METRICS.observe('external_call_duration_seconds', duration, kind=kind, target=target, outcome=outcome)
+    METRICS.inc('external_call_total', kind=kind, target=target, outcome=outcome)
+    if size is not None:
+        METRICS.observe('external_call_payload_bytes', size, buckets=SIZE_BUCKETS, kind=kind, target=target)
+    if retries:
+        METRICS.inc('external_call_retries_total', retries, kind=kind, target=target)
+    call_log.info(json.dumps({
+        'ts': round(time.time(), 3), 'kind': kind, 'target': target, 'duration_ms': round(duration * 1000, 1),
+        'outcome': outcome, 'bytes': size, 'retries': retries, 'error': error,
+    }, ensure_ascii=False))
+
+
+@contextmanager
+def instrument(kind, target):
+    """
+    with instrument("youtube_api", "videos") as call:
+        ...
+        call['size'] = 응답 바이트 수   (선택)
+        call['retries'] = 재시도 횟수   (선택)
+        call['outcome'] = "not_modified" 등 (선택, 기본 ok / 예외 시 예외 이름)
+    예외는 기록 후 그대로 다시 올린다.
+    """
+    call = {'size': None, 'retries': 0, 'outcome': 'ok'}
+    t0 = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        status = getattr(getattr(e, 'resp', None), 'status', None)
+        if call['outcome'] != 'ok': outcome = call['outcome']
+        elif status == 304: outcome = 'not_modified'   # ETag 조건부 요청 -> 정상 결과
+        elif status: outcome = f"http_{status}"
+        else: outcome = type(e).__name__
+        record_call(kind, target, time.perf_counter() - t0, outcome, call['size'], call['retries'],
+                    None if outcome == 'not_modified' else str(e)[:200])
+        raise
+    record_call(kind, target, time.perf_counter() - t0, call['outcome'], call['size'], call['retries'])
+
+
+def record_swallowed(where, exc):
+    """사용자에게는 빈 결과/안내 문구로 넘기는 예외도 지표 + 로그로 남긴다"""
+    METRICS.inc('swallowed_errors_total', where=where, error=type(exc).__name__)
+    call_log.warning(json.dumps({'ts': round(time.time(), 3), 'where': where, 'error': type(exc).__name__,
+                                 'message': str(exc)[:200]}, ensure_ascii=False))
+
+
+def configure_json_logging(level=logging.INFO):
+    """miner.calls 로그를 표준출력에 JSON 한 줄씩 (중복 등록 방지)"""
+    if not call_log.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(message)s"))
+        call_log.addHandler(h)
+        call_log.setLevel(level)
+        call_log.propagate = False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404); self.end_headers(); return
+        body = METRICS.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Prometheus 스크레이프용 /metrics 서버 (데몬 스레드)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+class RerunProfiler:
+    """
+    Streamlit 리런 1회의 구간별 소요 시간 (프로파일링 모드에서만 기록).
+    lap(name) = 직전 lap 이후 경과 시간을 name 구간에 더함, finish() = history(ring buffer)에 1건 추가.
+    st.rerun()/st.stop() 으로 중간에 끊긴 리런은 기록되지 않는다.
+    """
+    def __init__(self, enabled, history, start=None):
+        self.enabled = enabled
+        self.history = history          # collections.deque(maxlen=N)
+        self.t0 = self._last = start or time.perf_counter()
+        self.sections = {}
+        self.meta = {}
+
+    def lap(self, name):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def note(self, **meta):
+        if self.enabled: self.meta.update(meta)
+
+    def finish(self):
+        if not self.enabled: return
+        run = {'ts': time.strftime("%H:%M:%S"), **{k: round(v, 1) for k, v in self.sections.items()},
+               'total': round((time.perf_counter() - self.t0) * 1000, 1), **self.meta}
+        self.history.append(run)
+        return run
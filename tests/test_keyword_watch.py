@@ -0,0 +1,110 @@
+# ============================================================================
+# keyword_watch 증분 실행 테스트 - 게시 시각이 있는 가짜 검색 결과로 run_job 을 여러 번 돌린다
+#   - 증분 실행은 최신순(order=date) + publishedAfter=watermark
+#   - 직전 실행 이후 새 영상이 limit_count 개를 넘어도 빠지는 영상 없이 다음 실행들에서 이어 찾는다
+#
+#   python -m pytest -q tests
+# ============================================================================
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest  # noqa: E402
+
+import youtube_core  # noqa: E402
+from keyword_watch import KeywordWatchStore, run_job  # noqa: E402
+from replay import ReplayService, load_fixtures, _vid  # noqa: E402
+
+OWNER, API_KEY = "u-test", "test-key"
+T0 = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def _ts(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class DatedSearch(ReplayService):
+    """검색 결과 = 게시 시각이 있는 영상 목록 (publishedAfter/Before, order, 페이지 토큰 반영). 요청 기록"""
+    def __init__(self):
+        super().__init__(load_fixtures(os.path.join(ROOT, "benchmarks", "fixtures"))[0], n_channels=5)
+        self.catalog = []    # (video_id, publishedAt)
+        self.searches = []
+
+    def publish(self, n, start, step=timedelta(minutes=1)):
+        ids = [_vid('dated', len(self.catalog) + i) for i in range(n)]
+        self.catalog += [(vid, _ts(start + step * i)) for i, vid in enumerate(ids)]
+        return ids
+
+    def _search(self, q, maxResults=50, pageToken=None, order="relevance", publishedAfter=None, publishedBefore=None, **_):
+        self.searches.append({'order': order, 'publishedAfter': publishedAfter, 'publishedBefore': publishedBefore})
+        hits = [(vid, ts) for vid, ts in self.catalog
+                if (not publishedAfter or ts >= publishedAfter) and (not publishedBefore or ts <= publishedBefore)]
+        hits.sort(key=lambda h: h[1] if order == "date" else h[0], reverse=order == "date")
+        start = int(pageToken or 0)
+        body = {'items': [{'id': {'videoId': vid}, 'snippet': {'channelId': self.channel_of(vid), 'publishedAt': ts}}
+                          for vid, ts in hits[start:start + maxResults]]}
+        if start + maxResults < len(hits): body['nextPageToken'] = str(start + maxResults)
+        return body
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    svc = DatedSearch()
+    monkeypatch.setattr(youtube_core, "build_service", lambda *a, **k: svc)
+    return svc
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KeywordWatchStore(str(tmp_path / "watch.db"))
+
+
+def _run(store, job_id, now):
+    job = next(j for j in store.jobs(OWNER) if j['id'] == job_id)
+    return run_job(job['api_key'], store, job, baseline_uploads=0, now=now)
+
+
+def test_backlog_over_limit_is_not_skipped(fake, store):
+    job_id = store.add_job(OWNER, API_KEY, "사연", p_after=_ts(T0), limit_count=10)
+    first = set(fake.publish(5, T0 + timedelta(hours=1)))
+    assert {r['video_id'] for r in _run(store, job_id, T0 + timedelta(days=1))['new']} == first
+
+    # 다음 실행 전까지 limit_count 의 3배가 넘는 새 영상
+    backlog = set(fake.publish(35, T0 + timedelta(days=1, hours=1)))
+    second_now = T0 + timedelta(days=2)
+    got, runs = set(), 0
+    while runs < 10:
+        runs += 1
+        result = _run(store, job_id, second_now + timedelta(hours=runs))
+        assert not result['errors'] and len(result['rows']) <= 10
+        got |= {r['video_id'] for r in result['new']}
+        job = store.jobs(OWNER)[0]
+        if job['backfill_before'] is None: break
+        assert job['watermark'] == "2024-05-01T22:00:00Z"    # 밀린 구간을 다 찾기 전에는 watermark 를 옮기지 않는다
+    assert got == backlog
+    assert runs > 1
+    assert all(s['order'] == "date" for s in fake.searches[1:])
+    assert job['watermark'] == _ts(second_now + timedelta(hours=1) - timedelta(hours=2))   # 밀린 구간을 시작한 실행 기준
+
+    # 밀린 구간이 끝난 뒤에는 새 영상만
+    latest = set(fake.publish(3, second_now + timedelta(hours=2)))
+    assert {r['video_id'] for r in _run(store, job_id, second_now + timedelta(days=1))['new']} == latest
+
+
+def test_failed_run_keeps_watermark(fake, store, monkeypatch):
+    job_id = store.add_job(OWNER, API_KEY, "사연", p_after=_ts(T0), limit_count=10)
+    fake.publish(5, T0 + timedelta(hours=1))
+    _run(store, job_id, T0 + timedelta(days=1))
+    before = store.jobs(OWNER)[0]
+
+    def _fail(*a, **k): raise RuntimeError("quota")
+    monkeypatch.setattr(fake, "_search", _fail)
+    result = _run(store, job_id, T0 + timedelta(days=2))
+    after = store.jobs(OWNER)[0]
+    assert result['errors'] and after['last_error']
+    assert after['watermark'] == before['watermark'] and after['backfill_before'] is None
@@ -0,0 +1,81 @@
+# ============================================================================
+# retry_policy 서킷 브레이커 테스트 - half_open 시험 호출이 끝나지 않거나 BaseException 으로 끝나는 경우
+#
+#   python -m pytest -q tests
+# ============================================================================
+
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httplib2  # noqa: E402
+import pytest  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+import retry_policy  # noqa: E402
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_retry  # noqa: E402
+
+
+class Clock:
+    def __init__(self): self.now = 1000.0
+    def time(self): return self.now
+
+
+class Stop(BaseException):
+    """Streamlit StopException / RerunException 처럼 Exception 이 아닌 중단"""
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(retry_policy, "time", SimpleNamespace(time=c.time, sleep=lambda s: None))
+    return c
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    b = CircuitBreaker("test", failure_threshold=1, reset_timeout=30.0)
+    monkeypatch.setattr(retry_policy, "breaker_for", lambda endpoint: b)
+    return b
+
+
+def _fail():
+    raise HttpError(httplib2.Response({'status': 503}), b'')
+
+
+def _open(breaker, clock):
+    with pytest.raises(HttpError):
+        call_with_retry(_fail, "test", RetryPolicy(max_attempts=1))
+    assert breaker.state == 'open'
+    clock.now += 30
+
+
+def test_base_exception_in_trial_does_not_wedge_half_open(breaker, clock):
+    _open(breaker, clock)
+    def _stop(): raise Stop()
+    with pytest.raises(Stop):
+        call_with_retry(_stop, "test")
+    assert breaker.state == 'open'
+    assert call_with_retry(lambda: "ok", "test") == "ok"   # 30초를 다시 기다리지 않고 바로 다음 시험
+    assert breaker.state == 'closed'
+
+
+def test_stale_half_open_trial_is_replaced(breaker, clock):
+    _open(breaker, clock)
+    assert breaker.before_call() is True       # 시험 호출 시작 후 응답 없음
+    with pytest.raises(CircuitOpenError) as e:
+        breaker.before_call()
+    assert e.value.retry_in == 30
+    clock.now += 30
+    assert call_with_retry(lambda: "ok", "test") == "ok"
+    assert breaker.state == 'closed'
+
+
+def test_rate_limit_does_not_open_breaker(breaker):
+    def _limited(): raise HttpError(httplib2.Response({'status': 429}), b'')
+    with pytest.raises(HttpError):
+        call_with_retry(_limited, "test", RetryPolicy(max_attempts=2, sleep=lambda s: None))
+    assert breaker.state == 'closed'
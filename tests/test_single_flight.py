@@ -0,0 +1,65 @@
+# ============================================================================
+# response_cache.SingleFlight 테스트 - leader 세션이 BaseException(Stop/Rerun)으로 끝날 때
+#   - 예외는 leader 에서만, 기다리던 호출 중 하나가 새 leader 가 되고 나머지는 그 결과를 받는다
+#   - stats() 와 singleflight_calls_total 지표가 같은 수를 센다
+#
+#   python -m pytest -q tests
+# ============================================================================
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from response_cache import SingleFlight  # noqa: E402
+from telemetry import METRICS  # noqa: E402
+
+
+class Stop(BaseException):
+    """Streamlit StopException / RerunException 처럼 Exception 이 아닌 중단"""
+
+
+def _calls(group, role):
+    return METRICS.counters.get(('singleflight_calls_total', (('group', group), ('role', role))), 0)
+
+
+def test_abandoned_leader_hands_over_and_metrics_match_stats():
+    sf = SingleFlight("test-abandon")
+    started, release = threading.Event(), threading.Event()
+    runs, results, stopped = [], [], []
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        raise Stop()
+
+    def follower_fn():
+        runs.append(1)
+        time.sleep(0.2)   # 나머지 호출이 새 leader 에 합류할 시간
+        return "fresh"
+
+    def lead():
+        try: sf.do("k", leader_fn)
+        except Stop as e: stopped.append(e)
+
+    leader = threading.Thread(target=lead)
+    followers = [threading.Thread(target=lambda: results.append(sf.do("k", follower_fn))) for _ in range(3)]
+    leader.start()
+    assert started.wait(5)
+    for t in followers: t.start()
+    deadline = time.time() + 5
+    while sf._flights["k"].waiters < len(followers) and time.time() < deadline: time.sleep(0.01)
+    release.set()
+    for t in [leader] + followers: t.join(5)
+
+    assert len(stopped) == 1                                # Stop 은 leader 에서만
+    assert len(runs) == 1                                   # 기다리던 호출 중 하나만 새 leader
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert {v for v, _ in results} == {"fresh"}
+    stats = sf.stats()
+    assert stats == {'leaders': 2, 'coalesced': 2, 'in_flight': 0}
+    assert _calls("test-abandon", 'leader') == stats['leaders']
+    assert _calls("test-abandon", 'coalesced') == stats['coalesced']
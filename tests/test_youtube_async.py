@@ -0,0 +1,164 @@
+# ============================================================================
+# youtube_async 엔진 테스트 - 로컬 http.server 에 가짜 YouTube API 를 띄워서 실제 HTTP 로 호출
+#   - 200 응답 / ETag 캐시 재검증(If-None-Match -> 304) / 5xx + Retry-After 재시도
+#   - googleapiclient 백엔드와 같은 서버를 상대로 mine_keywords 결과 비교
+# 응답 본문은 벤치마크의 ReplayService(합성 fixtures)가 만든다.
+#
+#   python -m pytest -q tests
+# ============================================================================
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest  # noqa: E402
+from googleapiclient.discovery import build  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+import retry_policy  # noqa: E402
+import youtube_async  # noqa: E402
+import youtube_core  # noqa: E402
+from replay import ReplayService, load_fixtures  # noqa: E402
+from response_cache import EtagCache, ETAG_CACHE  # noqa: E402
+from youtube_async import AsyncYouTubeService  # noqa: E402
+
+API_KEY = "test-key"
+
+
+class FakeYouTube:
+    """/youtube/v3/<endpoint>?... -> ReplayService 응답. 요청 기록 + 실패 응답 주입"""
+    def __init__(self):
+        self.replay = ReplayService(load_fixtures(os.path.join(ROOT, "benchmarks", "fixtures"))[0], n_channels=20)
+        self.requests = []      # (endpoint, params, headers)
+        self.failures = []      # 다음 요청들에 순서대로 돌려줄 (status, headers)
+        self.lock = threading.Lock()
+
+    def handle(self, path, query, headers):
+        endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+        params = {k: int(v) if v.isdigit() else v for k, v in parse_qsl(query)}
+        with self.lock:
+            self.requests.append((endpoint, params, headers))
+            if self.failures: return *self.failures.pop(0), b'{"error": {"code": 503}}'
+        body = getattr(self.replay, "_" + endpoint)(**{k: v for k, v in params.items() if k not in ('key', 'alt', 'fields')})
+        etag = body.get('etag')
+        if etag and headers.get('If-None-Match') == etag: return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'application/json', **({'ETag': etag} if etag else {})}, json.dumps(body).encode('utf-8')
+
+
+@pytest.fixture
+def server():
+    fake = FakeYouTube()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, headers, body = fake.handle(url.path, url.query, dict(self.headers))
+            self.send_response(status)
+            for k, v in headers.items(): self.send_header(k, v)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    fake.root = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    yield fake
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def services(server, monkeypatch):
+    """youtube_core.build_service 가 두 백엔드 모두 로컬 서버를 부르게 한다"""
+    engines = []
+    def _async(api_key, *a, **k):
+        engines.append(AsyncYouTubeService(api_key, server.root + "youtube/v3"))
+        return engines[-1]
+    monkeypatch.setattr(youtube_async, "get_async_service", _async)
+    monkeypatch.setattr(youtube_core, "build", lambda *a, **k: build(
+        "youtube", "v3", developerKey=API_KEY, static_discovery=True, client_options={'api_endpoint': server.root}))
+    yield server
+    for e in engines: e.close()
+
+
+def test_ok_response(server):
+    svc = AsyncYouTubeService(API_KEY, server.root + "youtube/v3")
+    try:
+        body = svc.videos().list(part="snippet", id="aaa,bbb").execute()
+    finally:
+        svc.close()
+    assert [v['id'] for v in body['items']] == ["aaa", "bbb"]
+    endpoint, params, headers = server.requests[0]
+    assert endpoint == "videos" and params['key'] == API_KEY
+    assert "gzip" in headers.get('Accept-Encoding', "")
+
+
+def test_not_modified_hits_etag_cache(server):
+    svc = AsyncYouTubeService(API_KEY, server.root + "youtube/v3")
+    cache = EtagCache()
+    try:
+        first = cache.execute('videos', svc.videos(), part="snippet", id="aaa")
+        second = cache.execute('videos', svc.videos(), part="snippet", id="aaa")
+    finally:
+        svc.close()
+    assert second == first
+    assert cache.stats == {'miss': 1, 'not_modified': 1, 'changed': 0}
+    assert 'If-None-Match' not in server.requests[0][2]
+    assert server.requests[1][2]['If-None-Match'] == first['etag']
+
+
+def test_server_error_retried_after_retry_after(services, monkeypatch):
+    slept = []
+    monkeypatch.setattr(retry_policy.DEFAULT_POLICY, "sleep", slept.append)
+    services.failures.append((503, {'Retry-After': '2'}))
+    youtube = youtube_core.build_service(API_KEY, backend="async")
+    body = youtube.channels().list(part="statistics", id="UCx").execute()
+    assert body['items'][0]['id'] == "UCx"
+    assert len(services.requests) == 2
+    assert slept == [2.0]    # 지수 백오프(임의값)가 아니라 Retry-After
+
+
+def test_error_keeps_response_headers(server):
+    server.failures.append((503, {'Retry-After': '7'}))
+    svc = AsyncYouTubeService(API_KEY, server.root + "youtube/v3")
+    try:
+        with pytest.raises(HttpError) as e:
+            svc.search().list(part="id", q="x").execute()
+    finally:
+        svc.close()
+    assert e.value.resp.status == 503
+    assert e.value.resp['retry-after'] == '7'
+
+
+def test_parity_with_googleapiclient(services):
+    results = {}
+    for backend in youtube_core.BACKENDS:
+        ETAG_CACHE._data.clear()   # 두 번째 백엔드도 처음부터 200 으로 받게
+        rows = youtube_core.mine_keywords(API_KEY, ["사연", "노후"], 60, backend=backend, baseline_uploads=0)
+        results[backend] = sorted(rows, key=lambda r: r['video_id'])
+    assert results['google']
+    assert results['async'] == results['google']
+
+
+def test_keys_share_one_engine(server):
+    base_url = server.root + "youtube/v3"
+    try:
+        a, b = youtube_async.get_async_service("key-a", base_url), youtube_async.get_async_service("key-b", base_url)
+        assert a.engine is b.engine    # 사용자(키)가 늘어도 루프 스레드 / 커넥션 풀 / 세마포어는 1개
+        a.videos().list(part="snippet", id="aaa").execute()
+        b.videos().list(part="snippet", id="bbb").execute()
+        a.close()                      # 공용 엔진은 파사드가 닫지 않는다
+        b.videos().list(part="snippet", id="ccc").execute()
+    finally:
+        youtube_async._engines.pop(base_url).close()
+    assert [params['key'] for _, params, _ in server.requests] == ["key-a", "key-b", "key-b"]
@@ -0,0 +1,136 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 대본/댓글 전문 검색 색인 (SQLite FTS5)
+# 한국어는 띄어쓰기 단위로 자르면 조사/어미 때문에 검색이 안 되므로 글자 2-gram 으로 색인한다.
+#   "몰랐습니다" -> 몰랐 랐습 습니 니다   (검색어도 같은 방식 -> 연속 2-gram 구문 검색)
+# 원문은 docs 테이블에 따로 두고, 스니펫(강조 표시)은 원문에서 만든다.
+# 문서 = (영상, 종류) 1건. 내용이 바뀐 문서만 다시 색인한다 (전체 재구축 없음).
+# ============================================================================
+
+import hashlib
+import html
+import re
+import sqlite3
+import time
+import unicodedata
+
+INDEX_DB = 'text_index.db'
+KINDS = ('script', 'comments')
+_WORD_RE = re.compile(r'\w+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id       INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    title    TEXT NOT NULL,
+    channel  TEXT NOT NULL,
+    body     TEXT NOT NULL,
+    digest   TEXT NOT NULL,
+    updated  INTEGER NOT NULL,
+    UNIQUE (video_id, kind)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(grams, tokenize='unicode61 remove_diacritics 0');
+"""
+
+
+def _normalize(text):
+    return unicodedata.normalize('NFC', text or "").lower()
+
+def _words(text):
+    return _WORD_RE.findall(_normalize(text))
+
+def _bigrams(word):
+    return [word] if len(word) < 2 else [word[i:i + 2] for i in range(len(word) - 1)]
+
+def ngram_tokens(text):
+    """색인용 문자열: 단어마다 글자 2-gram (한 글자 단어는 그대로)"""
+    return " ".join(g for w in _words(text) for g in _bigrams(w))
+
+def build_match_query(query):
+    """검색어 -> FTS5 MATCH 식 (단어마다 2-gram 구문, 전부 AND). 검색할 단어가 없으면 None"""
+    phrases = ['"' + " ".join(_bigrams(w)) + '"' for w in _words(query)]
+    return " AND ".join(phrases) or None
+
+def make_snippet(body, query, width=40, max_hits=3):
+    """원문에서 검색어 주변만 잘라 <mark> 강조 (HTML 이스케이프 완료)"""
+    body = unicodedata.normalize('NFC', body)
+    low = body.lower()
+    if len(low) != len(body): low = body   # 소문자 변환으로 길이가 바뀌는 드문 문자 -> 대소문자 구분
+    spans = []
+    for t in sorted(set(_words(query)), key=len, reverse=True):
+        for m in re.finditer(re.escape(t), low):
+            if not any(s < m.end() and m.start() < e for s, e in spans): spans.append((m.start(), m.end()))
+    spans = sorted(spans)[:max_hits]
+    if not spans: return html.escape(body[:width * 2]) + ("…" if len(body) > width * 2 else "")
+    # 강조 구간 앞뒤 width 글자씩, 겹치는 창은 합친다
+    windows = []
+    for s, e in spans:
+        lo, hi = max(0, s - width), min(len(body), e + width)
+        if windows and lo <= windows[-1][1]: windows[-1][1] = max(windows[-1][1], hi)
+        else: windows.append([lo, hi])
+    out = []
+    for lo, hi in windows:
+        piece, pos = [], lo
+        for s, e in spans:
+            if lo <= s and e <= hi:
+                piece += [html.escape(body[pos:s]), f"<mark>{html.escape(body[s:e])}</mark>"]
+                pos = e
+        piece.append(html.escape(body[pos:hi]))
+        out.append(("…" if lo > 0 else "") + "".join(piece) + ("…" if hi < len(body) else ""))
+    return " ".join(out)
+
+
+class TextIndex:
+    """대본/댓글 색인 (SQLite, 호출마다 새 연결)"""
+    def __init__(self, path=INDEX_DB):
+        self.path = path
+        with self._conn() as con:
+            con.executescript(_SCHEMA)
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def upsert(self, video_id, kind, body, title="", channel=""):
+        """문서 추가/갱신 -> 실제로 다시 색인했으면 True (내용이 같으면 건너뜀)"""
+        body = unicodedata.normalize('NFC', body or "")
+        if not body.strip(): return False
+        digest = hashlib.sha1(body.encode('utf-8')).hexdigest()
+        with self._conn() as con:
+            row = con.execute("SELECT id, digest FROM docs WHERE video_id = ? AND kind = ?", (video_id, kind)).fetchone()
+            if row and row[1] == digest: return False
+            if row:
+                con.execute("UPDATE docs SET title = ?, channel = ?, body = ?, digest = ?, updated = ? WHERE id = ?",
+                            (title, channel, body, digest, int(time.time()), row[0]))
+                doc_id = row[0]
+                con.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+            else:
+                doc_id = con.execute("INSERT INTO docs (video_id, kind, title, channel, body, digest, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                     (video_id, kind, title, channel, body, digest, int(time.time()))).lastrowid
+            con.execute("INSERT INTO docs_fts (rowid, grams) VALUES (?, ?)", (doc_id, ngram_tokens(body)))
+        return True
+
+    def remove(self, video_id, kind=None):
+        with self._conn() as con:
+            ids = [r[0] for r in con.execute("SELECT id FROM docs WHERE video_id = ? AND (? IS NULL OR kind = ?)", (video_id, kind, kind))]
+            con.executemany("DELETE FROM docs_fts WHERE rowid = ?", [(i,) for i in ids])
+            con.executemany("DELETE FROM docs WHERE id = ?", [(i,) for i in ids])
+
+    def search(self, query, limit=30, kind=None):
+        """-> [{'video_id', 'kind', 'title', 'channel', 'snippet'(HTML), 'score'}] (관련도순)"""
+        match = build_match_query(query)
+        if not match: return []
+        sql = """SELECT d.video_id, d.kind, d.title, d.channel, d.body, bm25(docs_fts) AS score
+                 FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+                 WHERE docs_fts MATCH ? AND (? IS NULL OR d.kind = ?)
+                 ORDER BY score LIMIT ?"""
+        with self._conn() as con:
+            rows = con.execute(sql, (match, kind, kind, limit)).fetchall()
+        return [{'video_id': v, 'kind': k, 'title': t, 'channel': c, 'snippet': make_snippet(b, query), 'score': round(-s, 3)}
+                for v, k, t, c, b, s in rows]
+
+    def stats(self):
+        with self._conn() as con:
+            n_docs, n_videos, n_chars = con.execute("SELECT COUNT(*), COUNT(DISTINCT video_id), COALESCE(SUM(LENGTH(body)), 0) FROM docs").fetchone()
+        return {'docs': n_docs, 'videos': n_videos, 'chars': n_chars}
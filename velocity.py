@@ -0,0 +1,173 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 조회수 속도(velocity) 추적
+# 단일 스냅샷(조회수/구독자) 으로는 "오래된 영상" 과 "지금 터지는 영상" 구분 불가
+# -> 추적 중인 영상의 조회수를 주기적으로 다시 찍어 시계열로 저장
+#    views_per_hour(시간당 조회수), acceleration(시간당 조회수의 변화량) 계산
+# 추적 목록은 사용자(owner)별이고, 수집은 추적을 등록한 사용자의 API 키로 한다 (다른 사용자 할당량을 쓰지 않게).
+# 조회수 스냅샷 자체는 공개 지표라 영상별로 함께 쓴다.
+# ============================================================================
+
+import sqlite3
+import threading
+import time
+
+from youtube_core import build_service, fetch_view_counts, chunked
+
+SNAPSHOT_DB = 'snapshots.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    video_id TEXT NOT NULL,
+    ts       INTEGER NOT NULL,   -- epoch 초
+    views    INTEGER NOT NULL,
+    PRIMARY KEY (video_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS watched (
+    owner    TEXT NOT NULL,      -- usage_user_id
+    video_id TEXT NOT NULL,
+    api_key  TEXT NOT NULL,      -- 수집에 쓸 owner 의 키
+    added_ts INTEGER NOT NULL,
+    PRIMARY KEY (owner, video_id)
+) WITHOUT ROWID;
+"""
+
+
+class SnapshotStore:
+    """
+    append-only 시계열 저장소 (SQLite, video_id+ts 클러스터드 키 -> 영상별 연속 저장)
+    연결은 호출마다 새로 열어서 스레드 간 공유 문제를 피한다.
+    """
+    def __init__(self, path=SNAPSHOT_DB):
+        self.path = path
+        with self._conn() as con:
+            con.executescript(_SCHEMA)
+
+    def _conn(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    # --- 추적 대상 ---
+    def watch(self, owner, api_key, video_ids):
+        """owner 의 추적 목록에 추가 (이미 있으면 수집 키만 갱신)"""
+        now = int(time.time())
+        with self._conn() as con:
+            con.executemany("""INSERT INTO watched VALUES (?, ?, ?, ?)
+                               ON CONFLICT(owner, video_id) DO UPDATE SET api_key = excluded.api_key""",
+                            [(owner, v, api_key, now) for v in video_ids])
+
+    def unwatch(self, owner, video_ids):
+        with self._conn() as con:
+            con.executemany("DELETE FROM watched WHERE owner = ? AND video_id = ?", [(owner, v) for v in video_ids])
+
+    def watched_ids(self, owner):
+        with self._conn() as con:
+            return [r[0] for r in con.execute("SELECT video_id FROM watched WHERE owner = ? ORDER BY added_ts", (owner,))]
+
+    def watched_by_key(self):
+        """수집용: {api_key: [video_id...]} (같은 키의 여러 영상은 한 번에)"""
+        out = {}
+        with self._conn() as con:
+            for key, vid in con.execute("SELECT DISTINCT api_key, video_id FROM watched ORDER BY api_key, video_id"):
+                out.setdefault(key, []).append(vid)
+        return out
+
+    # --- 스냅샷 ---
+    def append(self, view_counts, ts=None):
+        """{video_id: views} 를 한 시점의 스냅샷으로 추가"""
+        ts = int(ts or time.time())
+        with self._conn() as con:
+            con.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                            [(v, ts, int(n)) for v, n in view_counts.items()])
+
+    def prune(self, keep_days=30):
+        cutoff = int(time.time()) - keep_days * 86400
+        with self._conn() as con:
+            con.execute("DELETE FROM snapshots WHERE ts < ?", (cutoff,))
+
+    def series(self, video_id):
+        with self._conn() as con:
+            return con.execute("SELECT ts, views FROM snapshots WHERE video_id = ? ORDER BY ts", (video_id,)).fetchall()
+
+    def velocity(self, video_ids):
+        """
+        최근 스냅샷 3개로 계산 -> {video_id: (views_per_hour, acceleration)}
+        스냅샷 2개면 가속도 None, 1개 이하면 결과 없음.
+        """
+        out = {}
+        sql = """
+            SELECT video_id, ts, views FROM (
+                SELECT video_id, ts, views,
+                       ROW_NUMBER() OVER (PARTITION BY video_id ORDER BY ts DESC) AS rn
+                FROM snapshots WHERE video_id IN ({})
+            ) WHERE rn <= 3 ORDER BY video_id, ts
+        """
+        with self._conn() as con:
+            for batch in chunked(video_ids, 500):
+                rows = con.execute(sql.format(','.join('?' * len(batch))), batch).fetchall()
+                pts = {}
+                for vid, ts, views in rows: pts.setdefault(vid, []).append((ts, views))
+                for vid, p in pts.items():
+                    if len(p) < 2: continue
+                    rates = [(b[1] - a[1]) / max((b[0] - a[0]) / 3600, 1e-9) for a, b in zip(p, p[1:])]
+                    accel = None
+                    if len(rates) == 2:
+                        # 두 구간 중간점 사이 시간(시간 단위)으로 나눔 -> 조회수/시간²
+                        mid_gap = ((p[2][0] + p[1][0]) - (p[1][0] + p[0][0])) / 2 / 3600
+                        accel = (rates[1] - rates[0]) / max(mid_gap, 1e-9)
+                    out[vid] = (rates[-1], accel)
+        return out
+
+
+class SnapshotCollector:
+    """백그라운드에서 interval_sec 마다 추적 영상의 조회수를 videos.list(50개당 1 unit)로 다시 찍는다 (등록한 사용자의 키로)"""
+    def __init__(self, store, interval_sec=1800, backend="google"):
+        self.store = store
+        self.interval_sec = interval_sec
+        self.backend = backend
+        self.last_run = None
+        self.last_error = None
+        self.errors = {}    # api_key -> 마지막 수집 오류 (화면에는 그 키의 사용자에게만)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="velocity-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self.collect_once()
+
+    def collect_once(self):
+        """키별로 수집 -> 기록한 영상 수. 한 키가 실패해도 나머지 키는 계속"""
+        by_key = self.store.watched_by_key()
+        if not by_key: return 0
+        total, errors = 0, {}
+        for api_key, ids in by_key.items():
+            try:
+                counts = fetch_view_counts(build_service(api_key, self.backend), ids)
+                self.store.append(counts)
+                total += len(counts)
+            except Exception as e:
+                errors[api_key] = str(e)
+        self.store.prune()
+        self.errors = errors
+        self.last_error = next(iter(errors.values()), None)
+        if total or not errors: self.last_run = time.time()
+        return total
+
+
+def add_velocity_columns(df, store):
+    """결과 DataFrame 에 views_per_hour / acceleration 컬럼 붙이기 (스냅샷 없으면 NaN)"""
+    if df.empty: return df
+    vel = store.velocity(df['video_id'].tolist())
+    df = df.copy()
+    df['views_per_hour'] = df['video_id'].map(lambda v: vel[v][0] if v in vel else None).astype('float64')
+    df['acceleration'] = df['video_id'].map(lambda v: vel[v][1] if v in vel and vel[v][1] is not None else None).astype('float64')
+    return df
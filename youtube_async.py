@@ -0,0 +1,157 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 비동기 HTTP 엔진 (httpx + asyncio)
+# googleapiclient(httplib2)는 동기식 + 스레드 비안전 -> 병렬성 한계
+# 앱에서 쓰는 엔드포인트만 직접 호출하는 대체 백엔드
+# 엔진(루프 스레드 + 커넥션 풀 + 동시성 제한)은 프로세스에 1개, API 키는 요청마다 붙인다
+# (사용자마다 키가 달라도 스레드/소켓이 키 수만큼 늘지 않고, 동시 요청 수도 전체 합계로 제한된다)
+# ============================================================================
+
+import asyncio
+import threading
+
+import httpx
+import httplib2
+from googleapiclient.errors import HttpError
+
+try:
+    import h2  # noqa: F401  (설치되어 있으면 HTTP/2 사용)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+API_BASE_URL = "https://www.googleapis.com/youtube/v3"
+MAX_CONCURRENCY = 16   # 프로세스 전체 동시 요청 상한 (모든 API 키 합계)
+
+# 앱에서 사용하는 엔드포인트 (리소스명 -> URL 경로)
+ENDPOINTS = {
+    'search': 'search',
+    'videos': 'videos',
+    'channels': 'channels',
+    'commentThreads': 'commentThreads',
+    'playlistItems': 'playlistItems',
+}
+
+
+class AsyncYouTubeClient:
+    """
+    순수 asyncio 클라이언트 (API 키는 호출마다 key= 로).
+    - 커넥션 풀 공유 (httpx.AsyncClient 1개)
+    - HTTP/2 (h2 설치 시), gzip 응답 압축
+    - 세마포어로 동시 요청 수 제한 (이 클라이언트를 쓰는 모든 키 합계)
+    """
+    def __init__(self, base_url=API_BASE_URL, max_concurrency=MAX_CONCURRENCY, timeout=20.0):
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client = None
+        self._sem = None
+
+    def _ensure_client(self):
+        # AsyncClient/Semaphore 는 실행 중인 루프 안에서 만들어야 한다
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                headers={'Accept-Encoding': 'gzip'},
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def call(self, endpoint, key, headers=None, **params):
+        """GET {base_url}/{endpoint}?key=... -> JSON(dict). 실패(304 포함) 시 googleapiclient 와 같은 HttpError"""
+        if endpoint not in ENDPOINTS: raise ValueError(f"지원하지 않는 엔드포인트: {endpoint}")
+        client = self._ensure_client()
+        query = {k: v for k, v in params.items() if v is not None}
+        query['key'] = key
+        url = f"{self.base_url}/{ENDPOINTS[endpoint]}"
+        async with self._sem:
+            r = await client.get(url, params=query, headers=headers)
+        if r.status_code >= 300:
+            # 응답 헤더를 그대로 넘겨야 재시도 정책이 Retry-After 를 본다
+            raise HttpError(httplib2.Response({**r.headers, 'status': r.status_code}), r.content, uri=url)
+        return r.json()
+
+    async def gather(self, key, calls):
+        """[(endpoint, params), ...] 를 동시에 실행 (순서 유지)"""
+        return await asyncio.gather(*(self.call(ep, key, **p) for ep, p in calls))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# === googleapiclient 호환 동기 파사드 ===
+# youtube.search().list(**params).execute() 형태 그대로 쓸 수 있게 감싼다.
+# 이벤트 루프는 엔진의 전용 백그라운드 스레드 1개에서 돌고, execute() 는 어느 스레드에서
+# 호출해도 안전하다 (run_coroutine_threadsafe).
+
+class AsyncEngine:
+    """이벤트 루프 스레드 1개 + AsyncYouTubeClient 1개 (여러 API 키가 같이 쓴다)"""
+    def __init__(self, base_url=API_BASE_URL, max_concurrency=MAX_CONCURRENCY, timeout=20.0):
+        self.client = AsyncYouTubeClient(base_url, max_concurrency, timeout)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="yt-async-engine", daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        self.run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class _Request:
+    def __init__(self, service, endpoint, params):
+        self._service = service
+        self._endpoint = endpoint
+        self._params = params
+        self.headers = {}  # googleapiclient HttpRequest.headers 와 동일 (If-None-Match 등)
+
+    def execute(self):
+        svc = self._service
+        return svc.engine.run(svc.engine.client.call(self._endpoint, svc.api_key, headers=self.headers or None, **self._params))
+
+
+class _Resource:
+    def __init__(self, service, endpoint):
+        self._service = service
+        self._endpoint = endpoint
+
+    def list(self, **params):
+        return _Request(self._service, self._endpoint, params)
+
+
+class AsyncYouTubeService:
+    """API 키 1개용 파사드. engine 을 주면 그 엔진을 같이 쓰고, 안 주면 전용 엔진을 만들어 close() 때 닫는다"""
+    def __init__(self, api_key, base_url=API_BASE_URL, max_concurrency=MAX_CONCURRENCY, timeout=20.0, engine=None):
+        self.api_key = api_key
+        self._owns_engine = engine is None
+        self.engine = engine or AsyncEngine(base_url, max_concurrency, timeout)
+
+    def search(self): return _Resource(self, 'search')
+    def videos(self): return _Resource(self, 'videos')
+    def channels(self): return _Resource(self, 'channels')
+    def commentThreads(self): return _Resource(self, 'commentThreads')
+    def playlistItems(self): return _Resource(self, 'playlistItems')
+
+    def close(self):
+        if self._owns_engine: self.engine.close()
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(base_url=API_BASE_URL):
+    """프로세스 공용 엔진 (base_url 당 1개, 닫지 않고 계속 씀)"""
+    with _engines_lock:
+        if base_url not in _engines:
+            _engines[base_url] = AsyncEngine(base_url)
+        return _engines[base_url]
+
+def get_async_service(api_key, base_url=API_BASE_URL):
+    """키별 파사드 (가벼움, 캐시 안 함) -> 공용 엔진의 커넥션 풀 / 동시성 제한을 같이 쓴다"""
+    return AsyncYouTubeService(api_key, engine=get_engine(base_url))
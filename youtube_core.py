@@ -0,0 +1,642 @@
+# ============================================================================
+# [유튜브 떡상 채굴기] - 핵심 로직 (검색 / 통계 보강 / 지표 계산)
+# Streamlit 화면과 분리된 순수 로직 모음 (UI 코드 없음)
+# ============================================================================
+
+import json
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from googleapiclient.discovery import build
+
+from response_cache import ETAG_CACHE, BASELINE_CACHE
+from telemetry import instrument
+from retry_policy import call_with_retry
+
+SHORTS_LIMIT_SEC = 180   # 숏폼 기준 (3분)
+BATCH_SIZE = 50          # videos/channels.list 한 번에 조회 가능한 최대 ID 수
+MAX_SEARCH_PAGES = 10    # 키워드당 search().list 최대 페이지 수
+BASELINE_UPLOADS = 10    # 채널 기준선: 최근 업로드 N개의 중앙값
+BASELINE_MIN_AGE_H = 48  # 기준선 계산 시 제외할 갓 올라온 영상 (조회수가 아직 쌓이는 중)
+
+# === 응답 필드 마스크 (fields=) ===
+# 코드에서 실제로 읽는 키만 받아온다. 새로 읽는 키가 생기면 여기에도 추가할 것!
+SEARCH_FIELDS = "nextPageToken,items(id/videoId,snippet(channelId,publishedAt))"
+VIDEO_FIELDS = ("etag,items(id,snippet(channelId,title,channelTitle,publishedAt),"
+                "statistics(viewCount,commentCount),contentDetails/duration)")
+VIDEO_STATS_FIELDS = "etag,items(id,statistics/viewCount)"   # 조회수 스냅샷 전용
+CHANNEL_FIELDS = "etag,items(id,statistics(subscriberCount,viewCount,videoCount),contentDetails/relatedPlaylists/uploads)"
+PLAYLIST_FIELDS = "items/contentDetails(videoId,videoPublishedAt)"
+_COMMENT_SNIPPET = "snippet(authorDisplayName,textDisplay,likeCount,publishedAt)"
+COMMENT_FIELDS = f"nextPageToken,items(snippet/topLevelComment/{_COMMENT_SNIPPET},replies/comments/{_COMMENT_SNIPPET})"
+
+
+# === [1] 변환 헬퍼 ===
+def parse_iso_duration(duration_str):
+    if not duration_str: return 0
+    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_str)
+    if not match: return 0
+    h, m, s = match.groups()
+    return (int(h or 0)*3600) + (int(m or 0)*60) + int(s or 0)
+
+def convert_to_kst(utc_str):
+    if not utc_str: return ""
+    try:
+        dt_utc = datetime.strptime(utc_str, "%Y-%m-%dT%H:%M:%SZ")
+        return (dt_utc + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M")
+    except: return utc_str
+
+def chunked(items, size=BATCH_SIZE):
+    """리스트를 size 단위로 자르기 (API 배치 요청용)"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i+size]
+
+def unique(items):
+    """순서를 유지한 중복 제거"""
+    return list(dict.fromkeys(items))
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def parse_subtitle_text(content):
+    """yt-dlp 자막 파일(VTT/SRT) -> 본문 텍스트 한 줄 (태그/타임코드/번호/헤더 제거)"""
+    lines = [_TAG_RE.sub('', l).strip() for l in content.splitlines()]
+    return " ".join([l for l in lines if l and '-->' not in l and l != 'WEBVTT' and not l.isdigit()])
+
+
+# === [2] 지표 계산 ===
+def calc_performance(view_count, avg_view):
+    """성과지표: 채널 평균 조회수 대비"""
+    if avg_view <= 0: return "-"
+    diff_r = (view_count - avg_view)/avg_view * 100
+    if diff_r >= 200: return "🔥🔥 초대박"
+    if diff_r >= 100: return "🔥 떡상"
+    if diff_r >= 50: return "👍 양호"
+    return "-"
+
+def calc_breakout_grade(ratio):
+    """떡상등급: 구독자 대비 조회수 비율 (4단계)"""
+    if ratio >= 5.0: return "💎 전설"
+    if ratio >= 2.0: return "🚀 초대박"
+    if ratio >= 1.0: return "🔥 떡상"
+    if ratio >= 0.5: return "👌 양호"
+    return ""
+
+ALERT_GRADES = ("🚀 초대박", "💎 전설")   # 알림/감시 피드에 올릴 떡상등급
+
+def is_breakout(row):
+    """알림 대상: 떡상등급 🚀/💎 또는 채널 기준선 대비 초대박"""
+    return row.get('breakout_grade') in ALERT_GRADES or row.get('performance') == "🔥🔥 초대박"
+
+def build_result_row(v, cst):
+    """videos.list 항목 + 채널 통계 -> 결과 행(dict)
+    url / thumbnail / is_shorts 는 video_id, duration_sec 로 만들 수 있어 저장하지 않는다 (result_schema.with_derived_columns)"""
+    vid = v['id']
+    sn = v['snippet']
+    stt = v.get('statistics',{})
+    cnt = v.get('contentDetails',{})
+
+    vc = int(stt.get('viewCount',0))
+    sub = cst['sub']
+    avg = cst['view']/cst['vid'] if cst['vid'] > 0 else 0
+    ratio = vc / sub if sub > 0 else 0
+    duration_sec = parse_iso_duration(cnt.get('duration',''))
+
+    return {
+        'video_id': vid,
+        'channel_id': sn.get('channelId', ''),
+        'selected': False,
+        'title': unicodedata.normalize('NFC', sn.get('title','')),
+        'channel': unicodedata.normalize('NFC', sn.get('channelTitle','')),
+        'view_count': vc,
+        'subscriber_count': sub,
+        'comment_count': int(stt.get('commentCount',0)),
+        'published_at': convert_to_kst(sn.get('publishedAt','')),
+
+        'view_sub_ratio': ratio,                      # 떡상지표 (숫자)
+        'breakout_grade': calc_breakout_grade(ratio), # 떡상등급 (아이콘+텍스트)
+
+        'view_diff': vc - avg,
+        'performance': calc_performance(vc, avg),     # 성과지표 (평균대비)
+
+        'duration_sec': duration_sec,
+    }
+
+def passes_filters(row, min_view=0, min_sub=0, duration_mode="전체"):
+    """최소 조회수/구독자 및 영상 길이 조건 확인"""
+    if row['view_count'] < min_view: return False
+    if row['subscriber_count'] < min_sub: return False
+    if duration_mode == "숏폼 (3분 이하)" and row['duration_sec'] > SHORTS_LIMIT_SEC: return False
+    if duration_mode == "롱폼 (3분 초과)" and row['duration_sec'] <= SHORTS_LIMIT_SEC: return False
+    return True
+
+
+# === [3] YouTube API 호출 ===
+BACKENDS = ("google", "async")
+
+# 엔드포인트별 할당량 비용 (units)
+QUOTA_COST = {'search': 100, 'videos': 1, 'channels': 1, 'commentThreads': 1, 'playlistItems': 1}
+
+# API 호출마다 불리는 훅: fn(api_key, endpoint, units)  (사용량 집계 등)
+API_CALL_HOOKS = []
+
+def add_api_call_hook(fn):
+    if fn not in API_CALL_HOOKS: API_CALL_HOOKS.append(fn)
+
+def _notify_api_call(api_key, endpoint):
+    for fn in API_CALL_HOOKS:
+        try: fn(api_key, endpoint, QUOTA_COST.get(endpoint, 1))
+        except Exception: pass  # 집계 실패가 검색을 막으면 안 됨
+
+
+class _MeteredRequest:
+    """execute() 할 때마다 훅 호출 (성공/304/실패 모두 할당량이 차감되므로 재시도 포함 요청마다 기록)
+    + 엔드포인트별 지연/응답 크기(JSON 본문)/재시도/결과 계측
+    + 일시 오류(5xx/429/연결) 재시도 + 엔드포인트별 서킷 브레이커 (retry_policy)"""
+    def __init__(self, inner, api_key, endpoint):
+        self._inner = inner
+        self._api_key = api_key
+        self._endpoint = endpoint
+
+    @property
+    def headers(self): return self._inner.headers
+
+    def execute(self):
+        with instrument("youtube_api", self._endpoint) as call:
+            attempts = []
+            def _attempt():
+                if attempts: call['retries'] = len(attempts)
+                attempts.append(1)
+                _notify_api_call(self._api_key, self._endpoint)
+            body = call_with_retry(self._inner.execute, self._endpoint, on_attempt=_attempt)
+            call['size'] = len(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+        return body
+
+
+class _MeteredResource:
+    def __init__(self, inner, api_key, endpoint):
+        self._inner = inner
+        self._api_key = api_key
+        self._endpoint = endpoint
+
+    def list(self, **params):
+        return _MeteredRequest(self._inner.list(**params), self._api_key, self._endpoint)
+
+
+class _MeteredService:
+    """googleapiclient / async 엔진 서비스를 감싸서 호출을 집계"""
+    def __init__(self, inner, api_key):
+        self._inner = inner
+        self._api_key = api_key
+
+    def __getattr__(self, endpoint):
+        factory = getattr(self._inner, endpoint)
+        return lambda: _MeteredResource(factory(), self._api_key, endpoint)
+
+
+def build_service(api_key, backend="google"):
+    """
+    YouTube API 서비스 객체 생성.
+    - google: googleapiclient (기본, 스레드마다 따로 만들어야 함)
+    - async : youtube_async 엔진 (프로세스 공용 httpx 커넥션 풀 + 동시성 제한, 스레드 안전)
+    둘 다 youtube.search().list(**params).execute() 형태로 사용한다.
+    """
+    if backend == "async":
+        from youtube_async import get_async_service
+        return _MeteredService(get_async_service(api_key), api_key)
+    return _MeteredService(build("youtube", "v3", developerKey=api_key), api_key)
+
+class _ThreadServices:
+    """googleapiclient(httplib2)는 스레드 안전하지 않으므로 스레드마다 서비스 객체를 따로 만든다
+    (async 백엔드는 원래 스레드 안전하므로 하나를 공유)"""
+    def __init__(self, api_key, backend="google"):
+        self.api_key = api_key
+        self.backend = backend
+        self.local = threading.local()
+        self.shared = build_service(api_key, backend) if backend == "async" else None
+
+    def get(self):
+        if self.shared is not None: return self.shared
+        if not hasattr(self.local, 'youtube'):
+            self.local.youtube = build_service(self.api_key, self.backend)
+        return self.local.youtube
+
+def _record_partial(errors, where, exc):
+    """부분 결과로 넘어간 실패 기록 (errors 가 None 이면 무시)"""
+    if errors is not None: errors.append(f"{where}: {exc}")
+
+def build_search_params(keyword, max_results, p_after=None, p_before=None, duration_mode="전체", token=None, order="relevance"):
+    params = {
+        'q': keyword,
+        'part': "id,snippet",
+        'maxResults': max_results,
+        'type': "video",
+        'pageToken': token,
+        'order': order,
+        'fields': SEARCH_FIELDS
+    }
+    if p_after: params['publishedAfter'] = p_after
+    if p_before: params['publishedBefore'] = p_before
+    if duration_mode == "숏폼 (3분 이하)": params['videoDuration'] = 'short'
+    return params
+
+# etag_cache: 같은 ID 묶음을 다시 조회할 때 If-None-Match 로 재검증 (None 이면 캐시 안 씀)
+def fetch_channel_stats(youtube, ch_ids, etag_cache=ETAG_CACHE):
+    """채널 통계 (50개씩 묶어서 조회)"""
+    ch_stats = {}
+    for batch in chunked(unique(ch_ids)):
+        # contentDetails 는 같은 1 unit 안에서 업로드 재생목록 ID 를 같이 받기 위함
+        params = dict(part="statistics,contentDetails", id=','.join(batch), fields=CHANNEL_FIELDS)
+        if etag_cache is None: c_res = youtube.channels().list(**params).execute()
+        else: c_res = etag_cache.execute('channels', youtube.channels(), **params)
+        for c in c_res.get('items',[]):
+            ch_stats[c['id']] = {
+                'sub': int(c['statistics'].get('subscriberCount',0)),
+                'view': int(c['statistics'].get('viewCount',0)),
+                'vid': int(c['statistics'].get('videoCount',0)),
+                'uploads': c.get('contentDetails',{}).get('relatedPlaylists',{}).get('uploads','')
+            }
+    return ch_stats
+
+def fetch_video_items(youtube, v_ids, etag_cache=ETAG_CACHE):
+    """영상 상세 (50개씩 묶어서 조회) -> {video_id: item}"""
+    items = {}
+    for batch in chunked(unique(v_ids)):
+        params = dict(part="snippet,statistics,contentDetails", id=','.join(batch), fields=VIDEO_FIELDS)
+        if etag_cache is None: v_res = youtube.videos().list(**params).execute()
+        else: v_res = etag_cache.execute('videos', youtube.videos(), **params)
+        for v in v_res.get('items',[]):
+            items[v['id']] = v
+    return items
+
+def fetch_view_counts(youtube, v_ids, etag_cache=ETAG_CACHE):
+    """조회수만 (part=statistics, 50개씩) -> {video_id: viewCount}"""
+    counts = {}
+    for batch in chunked(unique(v_ids)):
+        params = dict(part="statistics", id=','.join(batch), fields=VIDEO_STATS_FIELDS)
+        if etag_cache is None: v_res = youtube.videos().list(**params).execute()
+        else: v_res = etag_cache.execute('videos', youtube.videos(), **params)
+        for v in v_res.get('items',[]):
+            counts[v['id']] = int(v.get('statistics',{}).get('viewCount',0))
+    return counts
+
+def fetch_comments(youtube, video_id, max_pages=3, errors=None):
+    """댓글 + 대댓글 수집 (좋아요 순 정렬)
+    첫 페이지 이후 실패(재시도 소진)는 그때까지 모은 댓글을 돌려주고 errors 에 기록한다."""
+    all_c = []
+    token = None
+    pages = 0
+    while pages < max_pages:
+        try:
+            res = youtube.commentThreads().list(part="snippet,replies", videoId=video_id, maxResults=50, order="relevance",
+                                                textFormat="plainText", pageToken=token, fields=COMMENT_FIELDS).execute()
+        except Exception as e:
+            if not pages: raise
+            _record_partial(errors, f"댓글 {pages + 1}페이지", e)
+            break
+        for item in res.get("items", []):
+            c = item["snippet"]["topLevelComment"]["snippet"]
+            all_c.append({"author": c["authorDisplayName"], "text": c["textDisplay"], "likes": c["likeCount"], "date": c["publishedAt"][:10]})
+            if "replies" in item:
+                for r in item["replies"]["comments"]:
+                    rs = r["snippet"]
+                    all_c.append({"author": rs["authorDisplayName"], "text": f"[대댓글] {rs['textDisplay']}", "likes": rs["likeCount"], "date": rs["publishedAt"][:10]})
+        token = res.get("nextPageToken")
+        pages += 1
+        if not token: break
+    all_c.sort(key=lambda x: x["likes"], reverse=True)
+    return all_c
+
+
+# === [4] 채널 기준선 (최근 업로드 중앙값) ===
+# 채널 평균(누적 조회수 / 영상 수)은 옛날 히트작에 끌려 올라가므로,
+# 최근 업로드 N개의 조회수 중앙값을 기준으로 "평소보다 얼마나 잘 나왔나"를 본다.
+def uploads_playlist_id(channel_id, ch_stat=None):
+    """업로드 재생목록 ID (channels.list 결과 우선, 없으면 UC -> UU 규칙)"""
+    if ch_stat and ch_stat.get('uploads'): return ch_stat['uploads']
+    return "UU" + channel_id[2:] if channel_id.startswith("UC") else ""
+
+def fetch_recent_upload_ids(youtube, playlist_id, n_uploads=BASELINE_UPLOADS, min_age_h=BASELINE_MIN_AGE_H):
+    """업로드 재생목록 1페이지(1 unit)에서 최근 영상 ID 최대 n개 (갓 올라온 영상 제외)"""
+    res = youtube.playlistItems().list(part="contentDetails", playlistId=playlist_id,
+                                       maxResults=min(50, n_uploads * 2), fields=PLAYLIST_FIELDS).execute()
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=min_age_h)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    ids = [i['contentDetails']['videoId'] for i in res.get('items', [])
+           if i.get('contentDetails',{}).get('videoPublishedAt', '') <= cutoff]
+    return ids[:n_uploads]
+
+def compute_channel_baselines(api_key, ch_stats, n_uploads=BASELINE_UPLOADS, backend="google", max_workers=4, cache=BASELINE_CACHE):
+    """
+    채널별 기준선(최근 업로드 n개 조회수 중앙값) -> {channel_id: median_views}
+    - 캐시(TTL)에 있는 채널은 건너뜀
+    - playlistItems.list 는 채널당 1회(동시 실행), 모은 영상 ID 는 결과 전체에서 합쳐 50개씩 videos.list
+    """
+    baselines = {}
+    todo = []
+    for cid, cst in ch_stats.items():
+        cached = cache.get(cid) if cache is not None else None
+        if cached is not None: baselines[cid] = cached
+        elif uploads_playlist_id(cid, cst): todo.append(cid)
+    if not todo or not api_key: return baselines
+
+    services = _ThreadServices(api_key, backend)
+    def _uploads(cid):
+        try: return cid, fetch_recent_upload_ids(services.get(), uploads_playlist_id(cid, ch_stats[cid]), n_uploads)
+        except Exception: return cid, []  # 재생목록 비공개 등 -> 기준선 없음(기존 평균 사용)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        recent = dict(ex.map(_uploads, todo))
+
+    try: views = fetch_view_counts(services.get(), [v for ids in recent.values() for v in ids])
+    except Exception: return baselines  # 기준선은 보조 지표 -> 실패해도 검색 결과는 유지
+    for cid, ids in recent.items():
+        vals = sorted(views[v] for v in ids if v in views)
+        if not vals: continue
+        mid = len(vals) // 2
+        baselines[cid] = vals[mid] if len(vals) % 2 else (vals[mid-1] + vals[mid]) / 2
+        if cache is not None: cache.put(cid, baselines[cid])
+    return baselines
+
+def apply_channel_baselines(rows, baselines):
+    """
+    결과 행(dict)에 기준선 지표 반영.
+    baseline_views : 채널 최근 업로드 중앙값 조회수
+    outlier_score  : 조회수 / 기준선 (1.0 = 평소 수준)
+    기준선이 있는 채널은 성과지표(performance)/view_diff 도 기준선 대비로 다시 계산.
+    """
+    for row in rows:
+        base = baselines.get(row.get('channel_id'))
+        if base:
+            row['baseline_views'] = base
+            row['outlier_score'] = row['view_count'] / base
+            row['view_diff'] = row['view_count'] - base
+            row['performance'] = calc_performance(row['view_count'], base)
+        else:
+            row['baseline_views'] = 0.0
+            row['outlier_score'] = 0.0
+    return rows
+
+
+# === [5] 통계 새로고침 (재검색 없이) ===
+# search().list(100 units) 없이 videos/channels.list(1 unit)만으로 지표를 다시 계산
+REFRESH_COLS = ['view_count', 'subscriber_count', 'comment_count', 'view_sub_ratio',
+                'breakout_grade', 'view_diff', 'performance']
+
+def refresh_statistics(youtube, df, baseline_fn=None):
+    """
+    기존 결과(DataFrame)의 video_id 로 통계만 다시 받아 지표 재계산.
+    view_delta  : 지난 갱신 이후 조회수 증가량
+    growth_rate : 지난 갱신 이후 조회수 증가율(%)
+    삭제/비공개 등으로 조회되지 않은 영상은 이전 값을 유지한다.
+    baseline_fn(ch_stats) -> {channel_id: 기준선} 을 주면 채널 기준선 지표도 다시 계산한다.
+    """
+    if df.empty: return df
+    v_items = fetch_video_items(youtube, df['video_id'].tolist())
+    ch_stats = fetch_channel_stats(youtube, [v['snippet'].get('channelId') for v in v_items.values()])
+    fresh = {}
+    for vid, v in v_items.items():
+        cst = ch_stats.get(v['snippet'].get('channelId'), {'sub':0, 'view':0, 'vid':0})
+        fresh[vid] = build_result_row(v, cst)
+    if not fresh: return df
+    if baseline_fn is not None: apply_channel_baselines(fresh.values(), baseline_fn(ch_stats))
+    cols = REFRESH_COLS + (['baseline_views', 'outlier_score'] if baseline_fn is not None else [])
+
+    out = df.copy()
+    old_views = out['view_count'].astype('int64')
+    # video_id 기준으로 새 값을 맞춰 붙이고, 없는 영상(NaN)은 기존 값으로 채움
+    aligned = pd.DataFrame.from_dict(fresh, orient='index')[cols].reindex(out['video_id']).set_axis(out.index)
+    merged = aligned.combine_first(out[[c for c in cols if c in out.columns]])
+    for c in cols:
+        # 압축 스키마(int32 등)에서 조회수가 범위를 넘을 수 있으므로 int64 로 (호출 측에서 다시 압축)
+        out[c] = merged[c].astype('int64') if c in ('view_count', 'subscriber_count', 'comment_count') else merged[c]
+    out['view_delta'] = out['view_count'] - old_views
+    out['growth_rate'] = (out['view_delta'] / old_views.where(old_views > 0) * 100).fillna(0.0)
+    return out
+
+
+# === [6] 다중 키워드 채굴 ===
+def collect_search_candidates(youtube, keyword, limit_count, p_after=None, p_before=None, duration_mode="전체",
+                              max_pages=MAX_SEARCH_PAGES, errors=None, info=None, order="relevance"):
+    """search().list 페이지만 돌면서 (video_id, channel_id) 후보 수집 (통계 조회 없음)
+    중간 페이지 실패 시 앞 페이지까지의 후보를 돌려주고 errors 에 기록한다.
+    info(dict) 를 넘기면 실제 요청한 페이지 수('pages'), 다음 페이지가 남았는지('more'),
+    받은 후보 중 가장 오래된 게시 시각('oldest', order="date" 면 끊긴 지점)을 채운다."""
+    found = {}
+    token = None
+    pages = 0
+    oldest = None
+    while len(found) < limit_count and pages < max_pages:
+        pages += 1
+        params = build_search_params(keyword, min(50, limit_count - len(found)), p_after, p_before, duration_mode, token, order)
+        try:
+            res = youtube.search().list(**params).execute()
+        except Exception as e:
+            if pages == 1: raise
+            _record_partial(errors, f"'{keyword}' 검색 {pages}페이지", e)
+            break
+        for i in res.get('items', []):
+            vid = i.get('id', {}).get('videoId')
+            if vid and vid not in found:
+                found[vid] = i['snippet']['channelId']
+                published = i['snippet'].get('publishedAt')
+                if published and (oldest is None or published < oldest): oldest = published
+        token = res.get('nextPageToken')
+        if not token or not res.get('items'): break
+    if info is not None:
+        info['pages'] = pages
+        info['more'] = bool(token)   # 끊긴 곳 뒤에 결과가 더 있음 (페이지 한도/개수 한도/중간 실패)
+        info['oldest'] = oldest
+    return found
+
+def mine_keywords(api_key, keywords, limit_count, p_after=None, p_before=None, duration_mode="전체",
+                  min_view=0, min_sub=0, max_workers=4, on_progress=None, backend="google", baseline_uploads=BASELINE_UPLOADS,
+                  errors=None, order="relevance", search_info=None):
+    """
+    여러 키워드를 한 번에 채굴.
+    1) 키워드별 검색을 max_workers 동시성으로 실행
+    2) video_id / channel_id 를 전체 키워드 기준으로 중복 제거
+    3) videos/channels.list 를 키워드 구분 없이 50개씩 꽉 채워서 조회
+    결과 행에는 해당 영상이 걸린 키워드 목록('keywords')이 붙는다.
+    baseline_uploads > 0 이면 결과에 등장한 채널 전체의 기준선을 한 번에 계산해 반영한다.
+    실패한 키워드/배치는 건너뛰고(errors 에 기록) 나머지 결과는 그대로 돌려준다.
+    search_info(dict) 를 넘기면 키워드별 검색 info (collect_search_candidates 참고) 를 채운다.
+    """
+    keywords = unique(k.strip() for k in keywords if k and k.strip())
+    if not api_key or not keywords: return []
+    services = _ThreadServices(api_key, backend)
+    report = on_progress or (lambda done, total, msg: None)
+
+    # 1) 키워드별 검색 (동시 실행)
+    vid_keywords = {}   # video_id -> [키워드...]
+    vid_channel = {}    # video_id -> channel_id
+    def _search(kw):
+        info = search_info.setdefault(kw, {}) if search_info is not None else None
+        try: return kw, collect_search_candidates(services.get(), kw, limit_count, p_after, p_before, duration_mode, errors=errors,
+                                                  info=info, order=order)
+        except Exception as e:
+            _record_partial(errors, f"'{kw}' 검색", e)
+            return kw, {}
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for kw, found in ex.map(_search, keywords):
+            for vid, cid in found.items():
+                vid_keywords.setdefault(vid, []).append(kw)
+                vid_channel[vid] = cid
+            done += 1
+            report(done, len(keywords), f"검색 중... ({done}/{len(keywords)} 키워드)")
+
+    results = _enrich_candidates(services, vid_keywords, vid_channel, limit_count, duration_mode, min_view, min_sub,
+                                 max_workers, report, baseline_uploads, errors)
+    report(1, 1, "완료")
+    return results
+
+def _enrich_candidates(services, vid_keywords, vid_channel, limit_count, duration_mode="전체", min_view=0, min_sub=0,
+                       max_workers=4, report=None, baseline_uploads=BASELINE_UPLOADS, errors=None):
+    """
+    검색 후보 -> 결과 행 (mine_keywords / mine_time_sliced 공용)
+    vid_keywords: {video_id: [키워드...]}, vid_channel: {video_id: channel_id}
+    videos/channels.list 50개 단위 배치 -> 행 생성/필터 -> 키워드당 최대 limit_count 개 -> 채널 기준선
+    """
+    report = report or (lambda done, total, msg: None)
+    def _batch(fetch, batch):
+        try: return fetch(services.get(), batch)
+        except Exception as e:
+            _record_partial(errors, f"{fetch.__name__} ({len(batch)}개)", e)
+            return {}
+
+    # 2~3) 전체 중복 제거 후 50개 단위 배치 조회 (동시 실행)
+    ch_ids = unique(vid_channel.values())
+    v_batches = list(chunked(vid_channel.keys()))
+    c_batches = list(chunked(ch_ids))
+    report(0, 1, f"통계 보강 중... (영상 {len(vid_channel)}개 / 채널 {len(ch_ids)}개)")
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        v_parts = ex.map(lambda b: _batch(fetch_video_items, b), v_batches)
+        c_parts = ex.map(lambda b: _batch(fetch_channel_stats, b), c_batches)
+        v_items = {k: v for part in v_parts for k, v in part.items()}
+        ch_stats = {k: v for part in c_parts for k, v in part.items()}
+
+    # 4) 행 생성 + 조건 필터 + 키워드 태깅 (키워드당 최대 limit_count 개)
+    results = []
+    per_kw = {}
+    for vid, kws in vid_keywords.items():
+        v = v_items.get(vid)
+        if not v: continue
+        cst = ch_stats.get(v['snippet'].get('channelId'), {'sub':0, 'view':0, 'vid':0})
+        row = build_result_row(v, cst)
+        if not passes_filters(row, min_view, min_sub, duration_mode): continue
+        kws = [k for k in kws if per_kw.get(k, 0) < limit_count]
+        if not kws: continue
+        for k in kws: per_kw[k] = per_kw.get(k, 0) + 1
+        row['keywords'] = ", ".join(kws)
+        results.append(row)
+    if baseline_uploads and results:
+        report(1, 1, "채널 기준선 계산 중...")
+        used = {r['channel_id'] for r in results}
+        baselines = compute_channel_baselines(services.api_key, {c: ch_stats[c] for c in used if c in ch_stats},
+                                              baseline_uploads, services.backend, max_workers)
+        apply_channel_baselines(results, baselines)
+    return results
+
+
+# === [7] 기간 분할 딥 채굴 ===
+# search().list 한 쿼리는 수백 개 근처에서 페이지가 끊긴다 -> 기간을 잘게 나눠 쿼리마다 새 한도를 받는다.
+# 구간 하나를 SLICE_PAGES 페이지까지 받고도 다음 페이지가 남으면(포화) 반으로 나눠 다시 찾는다.
+SLICE_PAGES = 4                    # 구간당 최대 페이지 (200개, 400 units)
+MIN_SLICE = timedelta(hours=6)     # 이보다 짧은 구간은 더 나누지 않음 (포화여도 'truncated')
+DEEP_DEFAULT_DAYS = 365            # 기간 '전체'일 때 나눌 범위 (최근 1년)
+_RFC3339 = "%Y-%m-%dT%H:%M:%SZ"
+
+def _to_utc(s):
+    return datetime.strptime(s, _RFC3339).replace(tzinfo=timezone.utc)
+
+def _fmt_utc(dt):
+    return dt.astimezone(timezone.utc).strftime(_RFC3339)
+
+def time_sliced_candidates(services, keyword, target_count, p_after=None, p_before=None, duration_mode="전체",
+                           unit_budget=5000, max_workers=4, report=None, errors=None, now=None):
+    """
+    기간 분할 검색 -> ({video_id: channel_id}, 구간별 커버리지 목록)
+    - 처음엔 전체 기간 1구간, 포화된 구간은 이등분해서 대기열에 추가 (먼저 끝난 구간부터 바로 다음 구간 실행)
+    - unit_budget: search().list 에 쓸 최대 units (페이지당 100). 구간마다 필요한 만큼 미리 떼고 남으면 돌려받는다
+    - target_count 개의 고유 영상이 모이면 새 구간은 시작하지 않는다
+    커버리지 status: complete(구간 전부 받음) / split(포화 -> 둘로 나눔) / truncated(포화지만 더 못 나눔·예산 소진) / failed
+    """
+    report = report or (lambda done, total, msg: None)
+    now = now or datetime.now(timezone.utc)
+    end = _to_utc(p_before) if p_before else now
+    start = _to_utc(p_after) if p_after else end - timedelta(days=DEEP_DEFAULT_DAYS)
+    page_cost = QUOTA_COST['search']
+    pages_left = unit_budget // page_cost
+    found, slices = {}, []
+    queue = deque([(start, end, 0)])
+
+    def _run(window, pages):
+        s, e, _ = window
+        info = {'pages': 0, 'more': False}
+        try:
+            got = collect_search_candidates(services.get(), keyword, pages * 50, _fmt_utc(s), _fmt_utc(e), duration_mode,
+                                            max_pages=pages, errors=errors, info=info)
+            return got, info, None
+        except Exception as ex:
+            return {}, {'pages': 1, 'more': False}, ex
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        running = {}
+        while True:
+            while queue and len(running) < max_workers and pages_left > 0 and len(found) < target_count:
+                window = queue.popleft()
+                allot = min(SLICE_PAGES, pages_left)
+                pages_left -= allot
+                running[ex.submit(_run, window, allot)] = (window, allot)
+            if not running: break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                (s, e, depth), allot = running.pop(fut)
+                got, info, exc = fut.result()
+                pages_left += allot - info['pages']
+                new = 0
+                for vid, cid in got.items():
+                    if vid not in found:
+                        found[vid] = cid
+                        new += 1
+                if exc is not None:
+                    _record_partial(errors, f"'{keyword}' {_fmt_utc(s)[:13]}~{_fmt_utc(e)[:13]} 구간", exc)
+                    status = 'failed'
+                elif not info['more']: status = 'complete'
+                elif e - s >= MIN_SLICE * 2 and info['pages'] >= SLICE_PAGES:
+                    mid = s + (e - s) / 2
+                    queue.extend([(s, mid, depth + 1), (mid, e, depth + 1)])
+                    status = 'split'
+                else: status = 'truncated'
+                slices.append({'after': _fmt_utc(s), 'before': _fmt_utc(e), 'depth': depth, 'pages': info['pages'],
+                               'found': len(got), 'new': new, 'status': status})
+                report(min(len(found), target_count), target_count,
+                       f"기간 분할 검색 중... (구간 {len(slices)}개 / 고유 영상 {len(found):,}개 / 남은 예산 {pages_left * page_cost:,} units)")
+    # 예산/목표 때문에 시작하지 못한 구간도 커버리지에 남긴다
+    for s, e, depth in queue:
+        slices.append({'after': _fmt_utc(s), 'before': _fmt_utc(e), 'depth': depth, 'pages': 0, 'found': 0, 'new': 0, 'status': 'skipped'})
+    slices.sort(key=lambda r: r['after'])
+    return found, slices
+
+def mine_time_sliced(api_key, keyword, target_count, p_after=None, p_before=None, duration_mode="전체",
+                     min_view=0, min_sub=0, unit_budget=5000, max_workers=4, on_progress=None, backend="google",
+                     baseline_uploads=BASELINE_UPLOADS, errors=None):
+    """
+    단일 키워드 딥 채굴: 기간 분할 검색 -> video_id 중복 제거 -> 배치 보강(mine_keywords 와 같은 경로)
+    -> (결과 행, 구간별 커버리지). 검색 units 는 unit_budget 안에서만 쓴다 (보강 호출은 50개당 1 unit 별도).
+    """
+    keyword = (keyword or "").strip()
+    if not api_key or not keyword: return [], []
+    services = _ThreadServices(api_key, backend)
+    report = on_progress or (lambda done, total, msg: None)
+    found, slices = time_sliced_candidates(services, keyword, target_count, p_after, p_before, duration_mode,
+                                           unit_budget, max_workers, report, errors)
+    results = _enrich_candidates(services, {vid: [keyword] for vid in found}, found, target_count, duration_mode,
+                                 min_view, min_sub, max_workers, report, baseline_uploads, errors)
+    report(1, 1, "완료")
+    return results, slices